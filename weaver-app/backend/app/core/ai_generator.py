@@ -6,29 +6,28 @@ import logging
 from pathlib import Path
 
 from app.core.websocket_manager import manager
+from app.core.task_events import Stage
+from app.core.file_sink import file_sink
+from app.core.prompt_context import PromptContext, PromptContextBuilder
+from app.core.component_cache import component_cache
 from app.core.config import settings
 from app.templates.mern.component_templates import (
     PACKAGE_JSON_TEMPLATE,
     BACKEND_PACKAGE_JSON_TEMPLATE,
     TSCONFIG_TEMPLATE
 )
-from app.templates.system_prompts import (
-    MERN_ARCHITECT_PROMPT,
-    MERN_BACKEND_PROMPT,
-    MERN_FRONTEND_PROMPT,
-    QUALITY_CHECK_PROMPT
-)
+from app.templates.system_prompts import QUALITY_CHECK_PROMPT
 
 logger = logging.getLogger(__name__)
 
 class AIProvider:
     """Base class for AI providers"""
-    async def generate(self, prompt: str, max_tokens: int = 4096) -> str:
+    async def generate(self, prompt: str, max_tokens: int = 4096, system_prompt: Optional[str] = None) -> str:
         raise NotImplementedError
 
 class OllamaProvider(AIProvider):
     """Ollama AI provider implementation"""
-    async def generate(self, prompt: str, max_tokens: int = 4096) -> str:
+    async def generate(self, prompt: str, max_tokens: int = 4096, system_prompt: Optional[str] = None) -> str:
         import aiohttp
         
         payload = {
@@ -40,6 +39,8 @@ class OllamaProvider(AIProvider):
                 "num_predict": max_tokens
             }
         }
+        if system_prompt:
+            payload["system"] = system_prompt
         
         async with aiohttp.ClientSession() as session:
             async with session.post(settings.OLLAMA_API_URL, json=payload) as response:
@@ -50,7 +51,7 @@ class OllamaProvider(AIProvider):
 
 class OpenAIProvider(AIProvider):
     """OpenAI provider implementation"""
-    async def generate(self, prompt: str, max_tokens: int = 4096) -> str:
+    async def generate(self, prompt: str, max_tokens: int = 4096, system_prompt: Optional[str] = None) -> str:
         from langchain.chat_models import ChatOpenAI
         from langchain.schema import HumanMessage, SystemMessage
         
@@ -61,10 +62,9 @@ class OpenAIProvider(AIProvider):
             streaming=settings.AI_STREAMING
         )
         
-        messages = [
-            SystemMessage(content=MERN_ARCHITECT_PROMPT),
-            HumanMessage(content=prompt)
-        ]
+        messages = [HumanMessage(content=prompt)]
+        if system_prompt:
+            messages.insert(0, SystemMessage(content=system_prompt))
         
         response = await llm.agenerate([messages])
         return response.generations[0][0].text
@@ -86,34 +86,40 @@ class DigitalArchitectGenerator:
         # Project state
         self.architectural_blueprint = None
         self.generated_files = {}
+        self.prompt_usage: List[Dict] = []
+        self.cache_candidates: Dict[str, tuple] = {}
+        self.stage: Optional[Stage] = None
+        self.component: Optional[str] = None
         
     async def generate_mern_application(self) -> None:
         """Main orchestrator for MERN application generation"""
         try:
-            await self._log("✨ Initializing MERN stack generation...")
+            await self._log("✨ Initializing MERN stack generation...", Stage.INITIALIZING)
             
             # Create project structure
-            os.makedirs(self.project_dir, exist_ok=True)
             await self._create_mern_structure()
             
             # Generate architectural blueprint
-            await self._log("🏗️ Designing application architecture...")
+            await self._log("🏗️ Designing application architecture...", Stage.PLANNING)
             self.architectural_blueprint = await self._generate_architectural_blueprint()
             
             # Generate backend
-            await self._log("🔧 Generating backend components...")
+            await self._log("🔧 Generating backend components...", Stage.GENERATING, "backend")
             await self._generate_backend()
             
             # Generate frontend
-            await self._log("⚛️ Generating frontend components...")
+            await self._log("⚛️ Generating frontend components...", Stage.GENERATING, "frontend")
             await self._generate_frontend()
             
             # Perform quality checks
-            await self._log("🔍 Running quality validation...")
+            await self._log("🔍 Running quality validation...", Stage.QUALITY_REVIEW)
             quality_score = await self._validate_quality()
+            total_tokens = sum(usage["total_tokens"] for usage in self.prompt_usage)
+            logger.info(f"[{self.task_id}] {len(self.prompt_usage)} prompts, {total_tokens} prompt tokens")
             
             if quality_score >= settings.QUALITY_THRESHOLD:
-                await self._log(f"✅ Generation complete! Quality score: {quality_score}")
+                await self._log(f"✅ Generation complete! Quality score: {quality_score}", Stage.COMPLETE, score=quality_score)
+                await self._store_validated_components(quality_score)
                 preview_url = f"/api/preview/{self.task_id}/"
                 download_url = f"/api/download/{self.task_id}"
                 await manager.send_completion(self.task_id, preview_url, download_url)
@@ -122,28 +128,23 @@ class DigitalArchitectGenerator:
                 
         except Exception as e:
             logger.error(f"MERN generation failed: {e}")
-            await self._log(f"❌ Generation failed: {str(e)}")
+            await self._log(f"❌ Generation failed: {str(e)}", Stage.FAILED)
             await manager.send_error(self.task_id, str(e))
             raise
             
     async def _create_mern_structure(self):
         """Create initial MERN project structure"""
-        # Create main directories
         backend_dir = os.path.join(self.project_dir, "backend")
         frontend_dir = os.path.join(self.project_dir, "frontend")
         
-        for dir_path in [backend_dir, frontend_dir]:
-            os.makedirs(dir_path, exist_ok=True)
-            
-        # Create backend structure
+        # Create backend and frontend structure on the file sink thread
         backend_dirs = ["src/models", "src/controllers", "src/routes", "src/middleware", "src/config"]
-        for dir_name in backend_dirs:
-            os.makedirs(os.path.join(backend_dir, dir_name), exist_ok=True)
-            
-        # Create frontend structure
         frontend_dirs = ["src/components", "src/pages", "src/store", "src/api", "src/hooks", "src/types"]
-        for dir_name in frontend_dirs:
-            os.makedirs(os.path.join(frontend_dir, dir_name), exist_ok=True)
+        
+        await file_sink.make_dirs(
+            *[os.path.join(backend_dir, dir_name) for dir_name in backend_dirs],
+            *[os.path.join(frontend_dir, dir_name) for dir_name in frontend_dirs]
+        )
             
         # Create initial configuration files
         await self._create_config_files()
@@ -165,17 +166,14 @@ class DigitalArchitectGenerator:
             "vite.config.ts": self._get_vite_config_template(),
         }
         
-        # Create backend files
+        # Hand both file sets to the file sink in one batch
+        files = {}
         for filename, content in backend_files.items():
-            path = os.path.join(self.project_dir, "backend", filename)
-            with open(path, "w") as f:
-                f.write(content)
-                
-        # Create frontend files
+            files[os.path.join(self.project_dir, "backend", filename)] = content
         for filename, content in frontend_files.items():
-            path = os.path.join(self.project_dir, "frontend", filename)
-            with open(path, "w") as f:
-                f.write(content)
+            files[os.path.join(self.project_dir, "frontend", filename)] = content
+        
+        await file_sink.write_many(files)
                 
     def _get_backend_env_template(self) -> str:
         return """# Server Configuration
@@ -236,7 +234,8 @@ export default defineConfig({
         Provide the blueprint as a JSON object."""
         
         try:
-            response = await self.ai_provider.generate(prompt)
+            context = PromptContextBuilder(None, self.prompt).build_architect_context(prompt)
+            response = await self._generate(context)
             blueprint = json.loads(response)
             return blueprint
         except Exception as e:
@@ -245,42 +244,71 @@ export default defineConfig({
 
     async def _generate_backend(self):
         """Generate backend components"""
-        components = [
-            ("models", MERN_BACKEND_PROMPT),
-            ("controllers", MERN_BACKEND_PROMPT),
-            ("routes", MERN_BACKEND_PROMPT),
-            ("middleware", MERN_BACKEND_PROMPT),
-        ]
+        components = ["models", "controllers", "routes", "middleware"]
         
-        for component_type, prompt_template in components:
-            await self._log(f"Generating backend {component_type}...")
-            await self._generate_backend_component(component_type, prompt_template)
+        for component_type in components:
+            await self._log(f"Generating backend {component_type}...", Stage.GENERATING, f"backend/{component_type}")
+            await self._generate_backend_component(component_type)
 
     async def _generate_frontend(self):
         """Generate frontend components"""
-        components = [
-            ("components", MERN_FRONTEND_PROMPT),
-            ("pages", MERN_FRONTEND_PROMPT),
-            ("store", MERN_FRONTEND_PROMPT),
-            ("api", MERN_FRONTEND_PROMPT),
-        ]
+        components = ["components", "pages", "store", "api"]
         
-        for component_type, prompt_template in components:
-            await self._log(f"Generating frontend {component_type}...")
-            await self._generate_frontend_component(component_type, prompt_template)
+        for component_type in components:
+            await self._log(f"Generating frontend {component_type}...", Stage.GENERATING, f"frontend/{component_type}")
+            await self._generate_frontend_component(component_type)
+
+    async def _generate_backend_component(self, component_type: str):
+        """Generate every backend file of one component type"""
+        await self._generate_blueprint_files("backend", f"{component_type}/")
+
+    async def _generate_frontend_component(self, component_type: str):
+        """Generate every frontend file of one component type"""
+        await self._generate_blueprint_files("frontend", f"src/{component_type}/")
+
+    async def _generate_blueprint_files(self, side: str, prefix: str):
+        """Generate the blueprint files under a prefix, one focused prompt per file"""
+        builder = PromptContextBuilder(self.architectural_blueprint, self.prompt)
+        
+        for file_path in builder.files_for(side, prefix):
+            relative_path = f"{side}/{file_path}"
+            fragment = builder.file_slice(side, file_path)
+            role = f"{side}:{fragment['role']}"
+            
+            content = await component_cache.lookup(role, fragment)
+            if content is not None:
+                await self._log(f"♻️ Reused validated {relative_path} from component library")
+            else:
+                context = builder.build_file_context(side, file_path)
+                content = self._strip_code_fences(await self._generate(context))
+                self.cache_candidates[relative_path] = (role, fragment)
+            
+            await file_sink.write(os.path.join(self.project_dir, side, file_path), content)
+            self.generated_files[relative_path] = content
+
+    async def _store_validated_components(self, quality_score: int):
+        """Offer freshly generated files that passed validation to the component library"""
+        for relative_path, (role, fragment) in self.cache_candidates.items():
+            try:
+                await component_cache.store(
+                    role,
+                    fragment,
+                    relative_path,
+                    self.generated_files[relative_path],
+                    quality_score=quality_score
+                )
+            except Exception as e:
+                logger.warning(f"Could not cache {relative_path}: {e}")
 
     async def _validate_quality(self) -> int:
         """Validate generated code quality"""
-        prompt = f"""Analyze this MERN application:
-        
-        Blueprint: {json.dumps(self.architectural_blueprint, indent=2)}
-        
-        {QUALITY_CHECK_PROMPT}
-        
-        Provide a quality score (0-100) and list any issues found."""
+        builder = PromptContextBuilder(self.architectural_blueprint, self.prompt)
+        context = builder.build_quality_context(
+            f"{QUALITY_CHECK_PROMPT}\nProvide a quality score (0-100) and list any issues found."
+        )
         
         try:
-            response = await self.ai_provider.generate(prompt)
+            response = await self._generate(context)
             # Extract score from response
             import re
             score_match = re.search(r"quality score:\s*(\d+)", response.lower())
@@ -291,6 +319,60 @@ export default defineConfig({
             logger.error(f"Quality validation failed: {e}")
             return settings.QUALITY_THRESHOLD - 1  # Return below threshold on error
 
-    async def _log(self, message: str):
-        """Send log messages"""
-        await manager.send_log(self.task_id, message)
+    async def _generate(self, context: PromptContext, max_tokens: int = settings.AI_MAX_TOKENS) -> str:
+        """Run one generation call and record its prompt size"""
+        usage = context.to_dict()
+        self.prompt_usage.append(usage)
+        logger.info(
+            f"[{self.task_id}] {context.role} prompt"
+            f"{' for ' + context.file_path if context.file_path else ''}: "
+            f"{usage['total_tokens']} tokens (system {usage['system_tokens']})"
+        )
+        return await self.ai_provider.generate(
+            context.prompt,
+            max_tokens=max_tokens,
+            system_prompt=context.system_prompt
+        )
+
+    def _strip_code_fences(self, content: str) -> str:
+        """Remove a surrounding markdown code fence from model output"""
+        stripped = content.strip()
+        if stripped.startswith("```"):
+            stripped = stripped.split("\n", 1)[1] if "\n" in stripped else ""
+            if stripped.rstrip().endswith("```"):
+                stripped = stripped.rstrip()[:-3]
+        return stripped.rstrip() + "\n"
+
+    def _get_fallback_blueprint(self) -> Dict:
+        """Minimal single-entity blueprint used when the architect call fails"""
+        return {
+            "project_name": "mern-application",
+            "project_type": "web_app",
+            "core_entities": ["Item"],
+            "backend": {
+                "server.js": "Express server with MongoDB connection",
+                "models/Item.js": "Item mongoose schema",
+                "controllers/itemController.js": "Item business logic",
+                "routes/items.js": "Item API endpoints"
+            },
+            "frontend": {
+                "src/App.jsx": "Main React application component",
+                "src/main.jsx": "React DOM root",
+                "src/store/itemStore.js": "Zustand item state management",
+                "src/api/itemService.js": "Item API service functions",
+                "src/components/ItemList.jsx": "Item list component"
+            }
+        }
+
+    async def _log(
+        self,
+        message: str,
+        stage: Optional[Stage] = None,
+        component: Optional[str] = None,
+        score: Optional[float] = None
+    ):
+        """Send log messages; stage and component carry over until changed"""
+        if stage is not None:
+            self.stage = stage
+            self.component = component
+        await manager.send_log(self.task_id, message, "info", self.stage, self.component, score)
@@ -0,0 +1,591 @@
+"""
+Project Archives
+Streams ZIP archives of generated projects and caches finished ones
+"""
+
+import os
+import re
+import glob
+import asyncio
+import hashlib
+import logging
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.http_cache import make_etag
+
+logger = logging.getLogger(__name__)
+
+# Members that are already compressed gain nothing from deflate
+STORED_EXTENSIONS = (
+    ".gz", ".br", ".zip", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif",
+    ".woff", ".woff2", ".mp4", ".webm", ".mp3", ".pdf"
+)
+
+# Archive profiles: which files go in and how each is compressed.
+# Globs without a "/" match the file name at any depth; "**" spans directories.
+ARCHIVE_PROFILES = {
+    "full": {
+        "include": ["**"],
+        "exclude": ["*.tmp"],
+        "stored_extensions": STORED_EXTENSIONS,
+        "compresslevel": settings.ARCHIVE_COMPRESSION_LEVEL
+    },
+    "source-only": {
+        "include": ["**"],
+        "exclude": [
+            "**/node_modules/**", "**/build/**", "**/dist/**", "**/.cache/**",
+            "package-lock.json", "yarn.lock", "*.gz", "*.br", "*.zip", "*.log", "*.tmp",
+            "bundle.html"
+        ],
+        "stored_extensions": STORED_EXTENSIONS,
+        "compresslevel": 9
+    },
+    "static-build": {
+        "include": [
+            "*.html", "*.html.gz", "*.html.br", "css/**", "js/**", "assets/**",
+            "**/build/**", "**/dist/**", "*.ico", "robots.txt", "sitemap.xml", "asset-manifest.json"
+        ],
+        "exclude": ["**/node_modules/**", "*.map", "*.tmp"],
+        "stored_extensions": STORED_EXTENSIONS,
+        "compresslevel": 9
+    },
+}
+
+
+def _glob_to_regex(pattern: str) -> str:
+    if "/" not in pattern:
+        pattern = "**/" + pattern
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts)
+
+
+def _compile_globs(patterns: List[str]):
+    if not patterns:
+        return None
+    return re.compile("(?:" + "|".join(_glob_to_regex(p) for p in patterns) + r")\Z")
+
+
+class ArchiveProfile:
+    """Include/exclude globs and compression policy for one kind of download"""
+
+    def __init__(
+        self,
+        name: str,
+        include: List[str],
+        exclude: List[str],
+        stored_extensions: Tuple[str, ...] = STORED_EXTENSIONS,
+        compresslevel: int = 6
+    ):
+        self.name = name
+        self.include = include
+        self.exclude = exclude
+        self.stored_extensions = tuple(ext.lower() for ext in stored_extensions)
+        self.compresslevel = compresslevel
+        self._include = _compile_globs(include)
+        self._exclude = _compile_globs(exclude)
+        # "dir/**" excludes let the walk skip whole subtrees such as node_modules
+        self._exclude_dirs = _compile_globs([p[:-3] for p in exclude if p.endswith("/**")])
+
+    def includes(self, arc_name: str) -> bool:
+        if self._exclude and self._exclude.match(arc_name):
+            return False
+        return bool(self._include and self._include.match(arc_name))
+
+    def prunes(self, arc_dir: str) -> bool:
+        return bool(self._exclude_dirs and self._exclude_dirs.match(arc_dir))
+
+    def compress_type(self, arc_name: str) -> int:
+        if arc_name.lower().endswith(self.stored_extensions):
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+    @property
+    def fingerprint(self) -> str:
+        return repr((self.name, self.include, self.exclude, self.stored_extensions, self.compresslevel))
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "include": self.include,
+            "exclude": self.exclude,
+            "stored_extensions": list(self.stored_extensions),
+            "compresslevel": self.compresslevel
+        }
+
+
+profiles: Dict[str, ArchiveProfile] = {
+    name: ArchiveProfile(name, **options) for name, options in ARCHIVE_PROFILES.items()
+}
+
+
+def get_profile(name: Optional[str] = None) -> ArchiveProfile:
+    """Look up an archive profile; raises KeyError for unknown names"""
+    return profiles[name or settings.ARCHIVE_DEFAULT_PROFILE]
+
+
+class _ChunkBuffer:
+    """Write-only, unseekable sink that hands out what has been written so far"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def iter_project_files(project_dir: str, profile: Optional[ArchiveProfile] = None) -> Iterator[Tuple[str, str]]:
+    """Yield (path, archive name) for every file the profile selects, in a stable order"""
+    for root, dirs, names in os.walk(project_dir):
+        arc_root = os.path.relpath(root, project_dir).replace(os.sep, "/")
+        arc_root = "" if arc_root == "." else arc_root + "/"
+        if profile is not None:
+            dirs[:] = [d for d in dirs if not profile.prunes(arc_root + d)]
+        dirs.sort()
+        for name in sorted(names):
+            arc_name = arc_root + name
+            if profile is None or profile.includes(arc_name):
+                yield os.path.join(root, name), arc_name
+
+
+def _member_info(path: str, arc_name: str, profile: ArchiveProfile) -> zipfile.ZipInfo:
+    stat = os.stat(path)
+    info = zipfile.ZipInfo(arc_name, datetime.fromtimestamp(stat.st_mtime).timetuple()[:6])
+    info.external_attr = (stat.st_mode & 0xFFFF) << 16
+    info.file_size = stat.st_size
+    info.compress_type = profile.compress_type(arc_name)
+    if info.compress_type == zipfile.ZIP_DEFLATED:
+        info._compresslevel = profile.compresslevel
+    return info
+
+
+def archive_workers() -> int:
+    return settings.ARCHIVE_WORKERS or os.cpu_count() or 1
+
+
+def iter_zip_stream(
+    project_dir: str,
+    profile: Optional[ArchiveProfile] = None,
+    chunk_size: int = None,
+    workers: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of project_dir chunk by chunk (blocking).
+
+    Members are read and deflated incrementally, so memory stays bounded by
+    chunk_size however large the project is. With more than one worker,
+    members are compressed in parallel (see _iter_zip_parallel).
+    """
+    profile = profile or get_profile()
+    chunk_size = chunk_size or settings.ARCHIVE_CHUNK_SIZE
+    workers = archive_workers() if workers is None else workers
+    if workers > 1:
+        yield from _iter_zip_parallel(project_dir, profile, chunk_size, workers)
+        return
+
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=profile.compresslevel) as archive:
+        for path, arc_name in iter_project_files(project_dir, profile):
+            try:
+                info = _member_info(path, arc_name, profile)
+                with open(path, "rb") as source, archive.open(info, "w", force_zip64=info.file_size > 0x7FFFFFFF) as member:
+                    while True:
+                        data = source.read(chunk_size)
+                        if not data:
+                            break
+                        member.write(data)
+                        if buffer.size >= chunk_size:
+                            yield buffer.take()
+            except OSError as e:
+                # Files can vanish while a generation is still writing
+                logger.warning(f"Skipping {arc_name} in archive: {e}")
+
+            if buffer.size >= chunk_size:
+                yield buffer.take()
+
+    # Central directory
+    if buffer.size:
+        yield buffer.take()
+
+
+def _compress_member(path: str, arc_name: str, profile: ArchiveProfile, chunk_size: int):
+    """Compress one member into its own raw deflate stream (runs on a worker thread)"""
+    info = _member_info(path, arc_name, profile)
+    compressor = None
+    if info.compress_type == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(profile.compresslevel, zlib.DEFLATED, -15)
+
+    # Small members stay in memory, large ones spill to disk
+    output = tempfile.SpooledTemporaryFile(max_size=settings.ARCHIVE_SPOOL_SIZE)
+    crc = 0
+    size = 0
+    try:
+        with open(path, "rb") as source:
+            while True:
+                data = source.read(chunk_size)
+                if not data:
+                    break
+                crc = zlib.crc32(data, crc)
+                size += len(data)
+                output.write(compressor.compress(data) if compressor else data)
+        if compressor:
+            output.write(compressor.flush())
+    except BaseException:
+        output.close()
+        raise
+
+    info.CRC = crc
+    info.file_size = size
+    info.compress_size = output.tell()
+    output.seek(0)
+    return info, output
+
+
+def _iter_zip_parallel(project_dir: str, profile: ArchiveProfile, chunk_size: int, workers: int) -> Iterator[bytes]:
+    """
+    Compress members on a thread pool and write them in walk order.
+
+    zlib releases the GIL, so members deflate on every core. Each becomes an
+    independent deflate stream whose CRC and sizes are known before its local
+    header is written; zipfile then emits the standard central directory.
+    """
+    buffer = _ChunkBuffer()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="archive")
+    pending = deque()
+    members = iter_project_files(project_dir, profile)
+
+    def refill():
+        # Bounded lookahead keeps at most a few members per worker in flight
+        while len(pending) < workers * 2:
+            member = next(members, None)
+            if member is None:
+                return
+            path, arc_name = member
+            pending.append((arc_name, pool.submit(_compress_member, path, arc_name, profile, chunk_size)))
+
+    try:
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            refill()
+            while pending:
+                arc_name, future = pending.popleft()
+                refill()
+                try:
+                    info, data = future.result()
+                except OSError as e:
+                    logger.warning(f"Skipping {arc_name} in archive: {e}")
+                    continue
+
+                with data:
+                    info.header_offset = archive.fp.tell()
+                    archive.fp.write(info.FileHeader())
+                    while True:
+                        block = data.read(chunk_size)
+                        if not block:
+                            break
+                        archive.fp.write(block)
+                        if buffer.size >= chunk_size:
+                            yield buffer.take()
+
+                archive.filelist.append(info)
+                archive.NameToInfo[info.filename] = info
+                archive.start_dir = archive.fp.tell()
+
+        # Central directory
+        if buffer.size:
+            yield buffer.take()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        for _, future in pending:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                future.result()[1].close()
+
+
+async def iterate_blocking(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Drive a blocking chunk iterator from the default executor"""
+    loop = asyncio.get_running_loop()
+    done = object()
+    in_flight: Optional[asyncio.Future] = None
+    try:
+        while True:
+            # Shielded: a cancelled consumer must not abandon next() mid-run
+            in_flight = loop.run_in_executor(None, next, chunks, done)
+            chunk = await asyncio.shield(in_flight)
+            in_flight = None
+            if chunk is done:
+                break
+            yield chunk
+    finally:
+        if in_flight is not None:
+            # Closing while next() still runs fails with "generator already executing"
+            # and skips the generator's own cleanup
+            await asyncio.wait([in_flight])
+            if not in_flight.cancelled():
+                in_flight.exception()
+        await loop.run_in_executor(None, chunks.close)
+
+
+async def stream_zip(project_dir: str, profile: Optional[ArchiveProfile] = None) -> AsyncIterator[bytes]:
+    """Async iterator over iter_zip_stream with reading and compression run off the event loop"""
+    async for chunk in iterate_blocking(iter_zip_stream(project_dir, profile)):
+        yield chunk
+
+
+def write_zip_archive(project_dir: str, zip_path: str, profile: Optional[ArchiveProfile] = None) -> str:
+    """Write the archive of project_dir to zip_path atomically (blocking)"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(zip_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter_zip_stream(project_dir, profile):
+                f.write(chunk)
+        os.replace(temp_path, zip_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return zip_path
+
+
+class ArchiveManifest:
+    """Hash of the profile and every archived path, size and mtime; identifies one archive build"""
+
+    __slots__ = ("profile", "digest", "last_modified", "file_count", "total_bytes")
+
+    def __init__(self, profile: ArchiveProfile, digest: str, last_modified: float, file_count: int, total_bytes: int):
+        self.profile = profile
+        self.digest = digest
+        self.last_modified = last_modified
+        self.file_count = file_count
+        self.total_bytes = total_bytes
+
+    @property
+    def etag(self) -> str:
+        return make_etag(self.digest)
+
+
+def scan_project(project_dir: str, profile: Optional[ArchiveProfile] = None) -> ArchiveManifest:
+    """Stat the files a profile selects into an ArchiveManifest (blocking)"""
+    profile = profile or get_profile()
+    digest = hashlib.sha256(profile.fingerprint.encode("utf-8"))
+    last_modified = 0.0
+    file_count = 0
+    total_bytes = 0
+    for path, arc_name in iter_project_files(project_dir, profile):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f"{arc_name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+        last_modified = max(last_modified, stat.st_mtime)
+        file_count += 1
+        total_bytes += stat.st_size
+    return ArchiveManifest(profile, digest.hexdigest(), last_modified, file_count, total_bytes)
+
+
+# Cached archive file name: <task_id>-<profile>-<digest prefix>.zip
+_CACHED_ARCHIVE = re.compile(
+    rf"^(?P<task_id>.+)-(?:{'|'.join(re.escape(name) for name in ARCHIVE_PROFILES)})-[0-9a-f]{{16}}\.zip$"
+)
+
+
+class ArchiveCache:
+    """
+    Per-task ZIP archives on disk, rebuilt only when the project manifest
+    changes. prune() bounds the directory as a whole: archives of deleted
+    projects, archives older than max_age and, oldest first, whatever is
+    over max_bytes are removed.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        sites_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None
+    ):
+        self.cache_dir = cache_dir
+        self.sites_dir = sites_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._building: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._pending: Set[asyncio.Task] = set()
+
+    def archive_path(self, task_id: str, manifest: ArchiveManifest) -> str:
+        return os.path.join(self.cache_dir, f"{task_id}-{manifest.profile.name}-{manifest.digest[:16]}.zip")
+
+    async def inspect(self, project_dir: str, profile: Optional[ArchiveProfile] = None) -> ArchiveManifest:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, scan_project, project_dir, profile)
+
+    def cached_path(self, task_id: str, manifest: ArchiveManifest) -> Optional[str]:
+        path = self.archive_path(task_id, manifest)
+        return path if os.path.exists(path) else None
+
+    async def build(self, task_id: str, project_dir: str, profile: Optional[ArchiveProfile] = None) -> Optional[str]:
+        """Build the archive for the current manifest unless it is already cached"""
+        profile = profile or get_profile()
+        # Concurrent callers share one build per task and profile
+        key = (task_id, profile.name)
+        running = self._building.get(key)
+        if running is None:
+            running = asyncio.ensure_future(self._build(task_id, project_dir, profile))
+            self._building[key] = running
+            running.add_done_callback(lambda _: self._building.pop(key, None))
+        return await asyncio.shield(running)
+
+    async def _build(self, task_id: str, project_dir: str, profile: ArchiveProfile) -> Optional[str]:
+        manifest = await self.inspect(project_dir, profile)
+        cached = self.cached_path(task_id, manifest)
+        if cached:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._build_sync, task_id, project_dir, manifest)
+
+    def schedule_build(self, task_id: str, project_dir: str, profile: Optional[ArchiveProfile] = None) -> None:
+        """Build the archive in the background once a generation completes"""
+        task = asyncio.create_task(self.build(task_id, project_dir, profile))
+        self._pending.add(task)
+        task.add_done_callback(self._build_done)
+
+    def _build_done(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Archive build failed: {task.exception()}")
+
+    async def stream(self, task_id: str, project_dir: str, manifest: ArchiveManifest) -> AsyncIterator[bytes]:
+        """Stream a fresh archive and keep it in the cache once fully sent"""
+        async for chunk in iterate_blocking(self._iter_and_store(task_id, project_dir, manifest)):
+            yield chunk
+
+    def shutdown(self) -> None:
+        for task in list(self._pending) + list(self._building.values()):
+            task.cancel()
+
+    def _build_sync(self, task_id: str, project_dir: str, manifest: ArchiveManifest) -> Optional[str]:
+        for _ in self._iter_and_store(task_id, project_dir, manifest):
+            pass
+        return self.cached_path(task_id, manifest)
+
+    def _iter_and_store(self, task_id: str, project_dir: str, manifest: ArchiveManifest) -> Iterator[bytes]:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        complete = False
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter_zip_stream(project_dir, manifest.profile):
+                    f.write(chunk)
+                    yield chunk
+            complete = True
+        finally:
+            # Only an archive of an unchanged tree may be served under this manifest's ETag
+            if complete and scan_project(project_dir, manifest.profile).digest == manifest.digest:
+                os.replace(temp_path, self.archive_path(task_id, manifest))
+                self._prune(task_id, manifest)
+                logger.info(f"Cached {manifest.profile.name} archive for task {task_id} ({manifest.file_count} files)")
+            else:
+                os.remove(temp_path)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Remove orphaned, expired and over-budget archives (blocking); returns how many were removed"""
+        now = time.time() if now is None else now
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return 0
+
+        kept: List[Tuple[float, int, str]] = []
+        removed = 0
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            match = _CACHED_ARCHIVE.match(name)
+            expired = self.max_age is not None and now - stat.st_mtime > self.max_age
+            if match is None:
+                # Only temp files of builds that died are ours to remove
+                if name.endswith(".tmp") and expired:
+                    removed += self._remove(path)
+                continue
+            orphaned = self.sites_dir is not None and not os.path.isdir(
+                os.path.join(self.sites_dir, match.group("task_id"))
+            )
+            if orphaned or expired:
+                removed += self._remove(path)
+            else:
+                kept.append((stat.st_mtime, stat.st_size, path))
+
+        if self.max_bytes is not None:
+            total = sum(size for _, size, _ in kept)
+            for _, size, path in sorted(kept):
+                if total <= self.max_bytes:
+                    break
+                removed += self._remove(path)
+                total -= size
+
+        if removed:
+            logger.info(f"Pruned {removed} cached archives")
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+    def _prune(self, task_id: str, keep: ArchiveManifest) -> None:
+        keep_path = self.archive_path(task_id, keep)
+        pattern = f"{glob.escape(task_id)}-{glob.escape(keep.profile.name)}-*.zip"
+        for path in glob.glob(os.path.join(self.cache_dir, pattern)):
+            if path != keep_path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+# Global archive cache instance
+archive_cache = ArchiveCache(
+    settings.ARCHIVE_CACHE_DIR,
+    sites_dir=settings.GENERATED_SITES_DIR,
+    max_bytes=settings.ARCHIVE_CACHE_MAX_BYTES,
+    max_age=settings.ARCHIVE_CACHE_MAX_AGE
+)
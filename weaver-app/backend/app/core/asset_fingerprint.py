@@ -0,0 +1,197 @@
+"""
+Asset Fingerprinting
+Renames static assets to content-hashed names and rewrites the references to them
+"""
+
+import os
+import re
+import json
+import hashlib
+import posixpath
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Tuple
+
+from starlette.staticfiles import StaticFiles
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_EXTENSIONS = (
+    ".css", ".js", ".svg", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".ico",
+    ".woff", ".woff2", ".ttf"
+)
+
+ASSET_MANIFEST_FILENAME = "asset-manifest.json"
+
+# name.<hash>.ext as fingerprint_assets names it, optionally followed by a precompressed sibling suffix
+_FINGERPRINT = re.compile(rf"\.([0-9a-f]{{{settings.FINGERPRINT_HASH_LENGTH}}})(\.[A-Za-z0-9]+)(\.gz|\.br)?$")
+_HTML_REFERENCE = re.compile(r"(\b(?:href|src)=)([\"'])([^\"']+)\2", re.IGNORECASE)
+_CSS_URL = re.compile(r"(url\(\s*)([\"']?)([^\"')\s]+)\2(\s*\))", re.IGNORECASE)
+_CSS_IMPORT = re.compile(r"(@import\s+)([\"'])([^\"']+)\2", re.IGNORECASE)
+_URL_PARTS = re.compile(r"([^?#]*)(.*)", re.DOTALL)
+_UNRESOLVABLE = ("http://", "https://", "//", "data:", "#", "mailto:", "tel:", "javascript:")
+
+
+def immutable_cache_control() -> str:
+    return f"public, max-age={settings.FINGERPRINT_MAX_AGE}, immutable"
+
+
+class ManifestIndex:
+    """
+    LRU of the fingerprinted paths listed in each project's asset manifest,
+    reloaded when the manifest changes. Lookups stat the manifest, so call
+    them off the event loop.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, FrozenSet[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hashed_paths(self, project_dir: str) -> FrozenSet[str]:
+        manifest_path = os.path.join(project_dir, ASSET_MANIFEST_FILENAME)
+        try:
+            mtime = os.stat(manifest_path).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._entries.pop(project_dir, None)
+            return frozenset()
+        with self._lock:
+            cached = self._entries.get(project_dir)
+            if cached is not None and cached[0] == mtime:
+                self._entries.move_to_end(project_dir)
+                return cached[1]
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                paths = frozenset(json.load(f).values())
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Unreadable asset manifest {manifest_path}: {e}")
+            paths = frozenset()
+        with self._lock:
+            self._entries[project_dir] = (mtime, paths)
+            self._entries.move_to_end(project_dir)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return paths
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def is_fingerprinted(path: str) -> bool:
+    """
+    Whether a file under the sites dir is a fingerprinted asset: its name
+    carries a hash of the emitted length and the project's asset manifest
+    lists it. Names that merely contain hex digits never qualify.
+    """
+    match = _FINGERPRINT.search(path)
+    if match is None:
+        return False
+    sites_dir = os.path.join(os.path.realpath(settings.GENERATED_SITES_DIR), "")
+    path = os.path.abspath(path)
+    if not path.startswith(sites_dir):
+        return False
+    task_id, _, relative_path = path[len(sites_dir):].partition(os.sep)
+    if match.group(3):
+        relative_path = relative_path[:-len(match.group(3))]
+    hashed_paths = manifest_index.hashed_paths(os.path.join(sites_dir, task_id))
+    return relative_path.replace(os.sep, "/") in hashed_paths
+
+
+def strip_fingerprint(path: str) -> str:
+    """css/style.1a2b3c4d5e.css -> css/style.css"""
+    return _FINGERPRINT.sub(lambda match: match.group(2) + (match.group(3) or ""), path)
+
+
+def fingerprinted_path(path: str, content: bytes) -> str:
+    root, extension = posixpath.splitext(path)
+    digest = hashlib.sha256(content).hexdigest()[:settings.FINGERPRINT_HASH_LENGTH]
+    return f"{root}.{digest}{extension}"
+
+
+def _rewrite_url(url: str, base: str, renamed: Dict[str, str]) -> str:
+    if url.startswith(_UNRESOLVABLE):
+        return url
+    path, suffix = _URL_PARTS.match(url).groups()
+    if not path:
+        return url
+    if path.startswith("/"):
+        target = posixpath.normpath(path.lstrip("/"))
+    else:
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(base), path))
+    new_path = renamed.get(target)
+    if new_path is None:
+        return url
+    # Only the file name changes, so the reference keeps its relative or absolute form
+    return path[:len(path) - len(posixpath.basename(path))] + posixpath.basename(new_path) + suffix
+
+
+def _rewrite_css_references(source: str, base: str, renamed: Dict[str, str]) -> str:
+    def replace(match: re.Match) -> str:
+        return match.group(1) + match.group(2) + _rewrite_url(match.group(3), base, renamed) + match.group(2) + match.group(4)
+
+    def replace_import(match: re.Match) -> str:
+        return match.group(1) + match.group(2) + _rewrite_url(match.group(3), base, renamed) + match.group(2)
+
+    return _CSS_IMPORT.sub(replace_import, _CSS_URL.sub(replace, source))
+
+
+def _rewrite_html_references(source: str, base: str, renamed: Dict[str, str]) -> str:
+    def replace(match: re.Match) -> str:
+        return match.group(1) + match.group(2) + _rewrite_url(match.group(3), base, renamed) + match.group(2)
+
+    # Inline styles may point at fingerprinted images and fonts too
+    return _rewrite_css_references(_HTML_REFERENCE.sub(replace, source), base, renamed)
+
+
+def fingerprint_assets(files: Dict[str, bytes]) -> Tuple[Dict[str, bytes], Dict[str, str]]:
+    """
+    Rename assets to name.<hash>.ext and rewrite HTML and CSS references.
+
+    Returns the rewritten files and the asset manifest (original path ->
+    fingerprinted path). Stylesheets are hashed after their own url()
+    references are rewritten, so a changed image also changes the CSS name.
+    """
+    output: Dict[str, bytes] = {}
+    renamed: Dict[str, str] = {}
+
+    # Leaf assets first, then the stylesheets that may reference them
+    assets = [path for path in files if path.lower().endswith(FINGERPRINT_EXTENSIONS)]
+    for path in sorted(assets, key=lambda asset: asset.lower().endswith(".css")):
+        content = files[path]
+        if path.lower().endswith(".css"):
+            try:
+                content = _rewrite_css_references(content.decode("utf-8"), path, renamed).encode("utf-8")
+            except UnicodeDecodeError:
+                logger.warning(f"Could not rewrite references in {path}")
+        renamed[path] = fingerprinted_path(path, content)
+        output[renamed[path]] = content
+
+    for path, content in files.items():
+        if path in renamed:
+            continue
+        if path.lower().endswith((".html", ".htm")):
+            try:
+                content = _rewrite_html_references(content.decode("utf-8"), path, renamed).encode("utf-8")
+            except UnicodeDecodeError:
+                logger.warning(f"Could not rewrite references in {path}")
+        output[path] = content
+
+    return output, dict(sorted(renamed.items()))
+
+
+class SiteStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers keep fingerprinted assets without revalidating"""
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if is_fingerprinted(str(full_path)):
+            response.headers["Cache-Control"] = immutable_cache_control()
+        return response
+
+
+# Global asset manifest index
+manifest_index = ManifestIndex(settings.FINGERPRINT_MANIFEST_INDEX_SIZE)
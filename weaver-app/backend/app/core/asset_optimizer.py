@@ -0,0 +1,336 @@
+"""
+Asset Optimizer
+Minifies and fingerprints generated static assets and writes precompressed siblings
+"""
+
+import re
+import gzip
+import logging
+from typing import Dict, Optional, Tuple
+
+from app.core.asset_fingerprint import fingerprint_assets
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".html", ".json", ".svg", ".txt", ".xml")
+
+# Comments, and the literals whose content must survive minification verbatim
+_CSS_TOKEN = re.compile(
+    r"/\*.*?\*/"
+    r"|\"(?:[^\"\\]|\\.)*\""
+    r"|'(?:[^'\\]|\\.)*'"
+    r"|\burl\([^)\"']*\)",
+    re.DOTALL | re.IGNORECASE
+)
+_CSS_WHITESPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+_CSS_COLON = re.compile(r":\s+")
+_CSS_TRAILING_SEMICOLON = re.compile(r";}")
+_HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_HTML_RAW_BLOCK = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2>)", re.DOTALL | re.IGNORECASE)
+_HTML_BREAKS = re.compile(r"\s*\n\s*")
+_HTML_SPACES = re.compile(r"[ \t]{2,}")
+_JS_REGEX_PRECEDERS = frozenset("(,=:[!&|?{};+-*%<>~^")
+_JS_REGEX_KEYWORDS = frozenset((
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+    "throw", "case", "do", "else", "yield", "await"
+))
+
+
+def _import_brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+_BROTLI = _import_brotli()
+
+
+def load_brotli():
+    """The brotli module, or None when it is not installed; imported once"""
+    return _BROTLI
+
+
+def _minify_css_code(css: str) -> str:
+    css = _CSS_WHITESPACE.sub(" ", css)
+    css = _CSS_PUNCTUATION.sub(r"\1", css)
+    # Only the space after a colon is safe to drop: "a :hover" and "a:hover" differ
+    css = _CSS_COLON.sub(":", css)
+    return _CSS_TRAILING_SEMICOLON.sub("}", css)
+
+
+def minify_css(source: str) -> str:
+    """
+    Strip comments and insignificant whitespace from a stylesheet.
+
+    Strings and unquoted url() values are copied verbatim; comments inside
+    them are content, not comments.
+    """
+    output = []
+    code = []
+    position = 0
+    for token in _CSS_TOKEN.finditer(source):
+        code.append(source[position:token.start()])
+        position = token.end()
+        if token.group().startswith("/*"):
+            continue
+        output.append(_minify_css_code("".join(code)))
+        output.append(token.group())
+        code = []
+    code.append(source[position:])
+    output.append(_minify_css_code("".join(code)))
+    return "".join(output).strip()
+
+
+def _string_end(source: str, start: int) -> int:
+    """Index just past the quoted string opening at start"""
+    quote = source[start]
+    i = start + 1
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+        elif char == quote:
+            return i + 1
+        elif char == "\n":
+            # Unterminated: leave the rest of the line to the caller
+            return i
+        else:
+            i += 1
+    return len(source)
+
+
+def _regex_end(source: str, start: int) -> int:
+    """Index just past the body of the regex literal opening at start (flags are plain code)"""
+    i = start + 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "\n":
+            return i
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "/":
+            return i + 1
+        i += 1
+    return len(source)
+
+
+def _regex_allowed(previous: str, word: str) -> bool:
+    """Whether a "/" after this code starts a regex literal rather than a division"""
+    if word:
+        return word in _JS_REGEX_KEYWORDS
+    return previous == "" or previous in _JS_REGEX_PRECEDERS
+
+
+def minify_js(source: str) -> str:
+    """
+    Remove comments, indentation and blank lines from a script.
+
+    Strings, template literals and regex literals are copied verbatim. Line
+    breaks are kept so automatic semicolon insertion still applies.
+    """
+    output = []
+    i = 0
+    length = len(source)
+    # Open "${" expressions of enclosing template literals, by brace depth
+    template_depths = []
+    in_template = False
+    line_start = True
+    # Last significant code character, and the identifier it ends (for regex detection)
+    previous = ""
+    word = ""
+    word_open = False
+
+    while i < length:
+        char = source[i]
+        if in_template:
+            if char == "\\":
+                output.append(source[i:i + 2])
+                i += 2
+            elif char == "`":
+                output.append(char)
+                in_template = False
+                previous, word, word_open = char, "", False
+                i += 1
+            elif source.startswith("${", i):
+                output.append("${")
+                template_depths.append(0)
+                in_template = False
+                previous, word, word_open = "{", "", False
+                i += 2
+            else:
+                output.append(char)
+                i += 1
+            continue
+
+        if char in "'\"":
+            end = _string_end(source, i)
+            output.append(source[i:end])
+            previous, word, word_open, line_start = char, "", False, False
+            i = end
+            continue
+        if char == "`":
+            output.append(char)
+            in_template, line_start = True, False
+            i += 1
+            continue
+        if char == "}" and template_depths:
+            if template_depths[-1] == 0:
+                template_depths.pop()
+                output.append(char)
+                in_template = True
+                i += 1
+                continue
+            template_depths[-1] -= 1
+        elif char == "{" and template_depths:
+            template_depths[-1] += 1
+
+        if source.startswith("//", i):
+            newline = source.find("\n", i)
+            i = length if newline == -1 else newline
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            # Keep the tokens on either side apart
+            if not line_start:
+                output.append(" ")
+            continue
+        if char == "/" and _regex_allowed(previous, word):
+            end = _regex_end(source, i)
+            output.append(source[i:end])
+            previous, word, word_open, line_start = "/", "", False, False
+            i = end
+            continue
+
+        if char == "\n":
+            while output and output[-1] in (" ", "\t", "\r"):
+                output.pop()
+            if output and output[-1] != "\n":
+                output.append("\n")
+            line_start, word_open = True, False
+        elif char in " \t\r":
+            if not line_start:
+                output.append(char)
+            word_open = False
+        elif char.isalnum() or char in "_$":
+            output.append(char)
+            word = word + char if word_open else char
+            previous, word_open, line_start = char, True, False
+        else:
+            output.append(char)
+            # "a++ / b" divides: a doubled + or - closes an operand
+            operand_end = char in "+-" and previous == char
+            previous = ")" if operand_end else char
+            word, word_open, line_start = "", False, False
+        i += 1
+
+    while output and output[-1] in (" ", "\t", "\r", "\n"):
+        output.pop()
+    return "".join(output)
+
+
+def minify_html(source: str) -> str:
+    """Remove comments and collapse whitespace outside raw text elements"""
+    parts = _HTML_RAW_BLOCK.split(source)
+    output = []
+    # split() yields text, block, tag name, text, block, tag name, ...
+    for index in range(0, len(parts), 3):
+        text = _HTML_COMMENT.sub("", parts[index])
+        text = _HTML_BREAKS.sub("\n", text)
+        output.append(_HTML_SPACES.sub(" ", text))
+        if index + 1 < len(parts):
+            output.append(parts[index + 1])
+    return "".join(output).strip()
+
+
+_MINIFIERS = {
+    ".css": minify_css,
+    ".js": minify_js,
+    ".html": minify_html,
+}
+
+
+def precompress(content: bytes) -> Dict[str, bytes]:
+    """Return the gzip and (when available) brotli encodings of content"""
+    encoded = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    brotli = load_brotli()
+    if brotli is not None:
+        encoded[".br"] = brotli.compress(content, quality=11)
+    return encoded
+
+
+def _extension(path: str) -> str:
+    dot = path.rfind(".")
+    return path[dot:].lower() if dot != -1 else ""
+
+
+def optimize_site(
+    files: Dict[str, bytes],
+    minify: Optional[bool] = None,
+    compress: Optional[bool] = None,
+    fingerprint: Optional[bool] = None
+) -> Tuple[Dict[str, bytes], Dict]:
+    """
+    Minify, fingerprint and precompress a site held in memory.
+
+    Returns the output files (optimized assets plus .gz/.br siblings) and a
+    size report keyed by output path, with the asset manifest when assets
+    were fingerprinted.
+    """
+    minify = settings.OPTIMIZE_ASSETS if minify is None else minify
+    compress = settings.PRECOMPRESS_ASSETS if compress is None else compress
+    fingerprint = settings.FINGERPRINT_ASSETS if fingerprint is None else fingerprint
+
+    minified: Dict[str, bytes] = {}
+    for path, content in files.items():
+        extension = _extension(path)
+        optimized = content
+
+        if minify and extension in _MINIFIERS:
+            try:
+                optimized = _MINIFIERS[extension](content.decode("utf-8")).encode("utf-8")
+            except Exception as e:
+                logger.warning(f"Could not minify {path}: {e}")
+                optimized = content
+        minified[path] = optimized
+
+    # Hash the minified bytes so the name changes exactly when the served file does
+    asset_manifest: Dict[str, str] = {}
+    if fingerprint:
+        minified, asset_manifest = fingerprint_assets(minified)
+    sources = {asset_manifest.get(path, path): path for path in files}
+
+    output: Dict[str, bytes] = {}
+    assets: Dict[str, Dict] = {}
+    totals = {"original": 0, "optimized": 0, "gzip": 0, "brotli": 0}
+
+    for path, optimized in minified.items():
+        output[path] = optimized
+        if _extension(path) not in COMPRESSIBLE_EXTENSIONS:
+            continue
+
+        entry = {"original": len(files[sources[path]]), "optimized": len(optimized)}
+        if compress and len(optimized) >= settings.PRECOMPRESS_MIN_SIZE:
+            for suffix, encoded in precompress(optimized).items():
+                if len(encoded) < len(optimized):
+                    output[path + suffix] = encoded
+                    entry["gzip" if suffix == ".gz" else "brotli"] = len(encoded)
+
+        assets[path] = entry
+        for key in totals:
+            totals[key] += entry.get(key, 0)
+
+    report = {"assets": assets, "totals": totals}
+    if fingerprint:
+        report["manifest"] = asset_manifest
+    return output, report
@@ -0,0 +1,266 @@
+"""
+Batch Site Generator
+Renders template-based static sites in bulk on a process pool
+"""
+
+import os
+import json
+import uuid
+import asyncio
+import logging
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.archive import archive_cache
+from app.core.config import settings
+from app.core.file_sink import file_sink
+from app.core.websocket_manager import manager
+from app.core.task_events import Stage
+from app.core.task_store import GenerationStatus, task_store
+from app.core.website_generator import render_static_site, site_preview_url
+
+logger = logging.getLogger(__name__)
+
+
+def render_site_chunk(items: List[Tuple[str, str]]) -> List[Dict]:
+    """Render a chunk of (task_id, prompt) pairs inside a worker process"""
+    results = []
+    for task_id, prompt in items:
+        try:
+            results.append({"task_id": task_id, "files": render_static_site(task_id, prompt)})
+        except Exception as e:
+            results.append({"task_id": task_id, "error": str(e)})
+    return results
+
+
+class BatchJob:
+    """State of one batch: its items, finished results and a change signal"""
+
+    def __init__(self, batch_id: str, prompts: List[str]):
+        self.batch_id = batch_id
+        self.items: List[Tuple[str, str]] = [(str(uuid.uuid4()), prompt) for prompt in prompts]
+        self.results: List[Dict] = []
+        self.status = "queued"
+        self.created_at = datetime.now()
+        self.completed_at: Optional[datetime] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def task_ids(self) -> List[str]:
+        return [task_id for task_id, _ in self.items]
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def add_result(self, result: Dict) -> None:
+        self.results.append(result)
+        self._notify()
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self.completed_at = datetime.now()
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    @property
+    def changed(self) -> asyncio.Event:
+        """Event set on the next result or status change"""
+        return self._changed
+
+    def summary(self) -> Dict:
+        succeeded = sum(1 for r in self.results if r["status"] == "completed")
+        return {
+            "batch_id": self.batch_id,
+            "status": self.status,
+            "total": len(self.items),
+            "finished": len(self.results),
+            "succeeded": succeeded,
+            "failed": len(self.results) - succeeded,
+            "created_at": self.created_at.isoformat(),
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None
+        }
+
+
+class BatchGenerator:
+    """Schedules batch jobs onto a shared process pool in fixed-size chunks"""
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 16, history_limit: int = 100):
+        self.max_workers = max_workers
+        self.chunk_size = max(1, chunk_size)
+        self.history_limit = history_limit
+        self.jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._running = set()
+
+    @property
+    def workers(self) -> int:
+        return self.max_workers or os.cpu_count() or 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Never fork this process: locks held by its threads (file sink, logging) would be copied held
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver")
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def submit(self, prompts: List[str]) -> BatchJob:
+        """Create a batch job and start rendering it in the background"""
+        job = BatchJob(str(uuid.uuid4()), prompts)
+        self.jobs[job.batch_id] = job
+        self._trim_history()
+        # Every item answers /api/status/{task_id} like a single generation
+        for task_id, prompt in job.items:
+            task_store.create(task_id, prompt, batch_id=job.batch_id)
+
+        await manager.initialize_task(job.batch_id)
+        runner = asyncio.create_task(self._run(job))
+        self._running.add(runner)
+        runner.add_done_callback(self._running.discard)
+        logger.info(f"Batch {job.batch_id} queued with {len(job.items)} sites")
+        return job
+
+    def get_job(self, batch_id: str) -> Optional[BatchJob]:
+        return self.jobs.get(batch_id)
+
+    async def stream_results(self, job: BatchJob) -> AsyncIterator[bytes]:
+        """Yield one NDJSON line per finished item, then a final summary line"""
+        sent = 0
+        while True:
+            changed = job.changed
+            while sent < len(job.results):
+                yield (json.dumps(job.results[sent]) + "\n").encode("utf-8")
+                sent += 1
+            if job.done:
+                yield (json.dumps({"type": "summary", **job.summary()}) + "\n").encode("utf-8")
+                return
+            await changed.wait()
+
+    async def _run(self, job: BatchJob) -> None:
+        loop = asyncio.get_running_loop()
+        job.status = "in_progress"
+        task_store.update(job.batch_id, GenerationStatus.GENERATING_FRONTEND.value, current_phase="rendering")
+        total = len(job.items)
+        chunks = [job.items[i:i + self.chunk_size] for i in range(0, total, self.chunk_size)]
+
+        try:
+            executor = self._get_executor()
+            waiting = deque(chunks)
+            in_flight = set()
+
+            def submit_next() -> None:
+                # Hand chunks to the pool only as workers free up, so an item
+                # is marked in progress (and timed) only once it is rendering
+                chunk = waiting.popleft()
+                for task_id, _ in chunk:
+                    task_store.update(task_id, GenerationStatus.GENERATING_FRONTEND.value, current_phase="rendering")
+                in_flight.add(loop.run_in_executor(executor, render_site_chunk, chunk))
+
+            while waiting and len(in_flight) < self.workers:
+                submit_next()
+
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    for rendered in future.result():
+                        result = await self._write_site(rendered)
+                        self._record_item(result)
+                        job.add_result(result)
+                    if waiting:
+                        submit_next()
+
+                progress = int(len(job.results) / total * 100)
+                await manager.send_progress(
+                    job.batch_id,
+                    f"Rendered {len(job.results)}/{total} sites",
+                    progress,
+                    Stage.GENERATING
+                )
+
+            job.finish("completed")
+            summary = job.summary()
+            await manager.send_log(
+                job.batch_id,
+                f"Batch complete: {summary['succeeded']} succeeded, {summary['failed']} failed",
+                stage=Stage.COMPLETE
+            )
+            # The terminal event ends the batch's replay log and its watchers
+            await manager.send_completion(
+                job.batch_id,
+                f"/api/generate/batch/{job.batch_id}",
+                f"/api/generate/batch/{job.batch_id}/results"
+            )
+            task_store.update(job.batch_id, GenerationStatus.COMPLETED.value, progress=100)
+        except Exception as e:
+            logger.error(f"Batch {job.batch_id} failed: {e}")
+            job.finish("failed")
+            finished = {result["task_id"] for result in job.results}
+            for task_id, _ in job.items:
+                if task_id not in finished:
+                    task_store.update(task_id, GenerationStatus.FAILED.value, error="Batch generation failed")
+            await manager.send_error(job.batch_id, f"Batch generation failed: {str(e)}")
+
+    def _record_item(self, result: Dict) -> None:
+        if result["status"] == "completed":
+            task_store.update(
+                result["task_id"],
+                GenerationStatus.COMPLETED.value,
+                progress=100,
+                current_phase="completed",
+                files_generated=result["files"],
+                total_files=result["files"]
+            )
+        else:
+            task_store.update(result["task_id"], GenerationStatus.FAILED.value, error=result["error"])
+
+    async def _write_site(self, rendered: Dict) -> Dict:
+        task_id = rendered["task_id"]
+        if "error" in rendered:
+            return {"task_id": task_id, "status": "failed", "error": rendered["error"]}
+
+        project_dir = os.path.join(settings.GENERATED_SITES_DIR, task_id)
+        try:
+            await file_sink.write_many({
+                os.path.join(project_dir, relative_path): content
+                for relative_path, content in rendered["files"].items()
+            })
+        except Exception as e:
+            return {"task_id": task_id, "status": "failed", "error": str(e)}
+
+        # Have the download ready before anyone asks for it
+        archive_cache.schedule_build(task_id, project_dir)
+        return {
+            "task_id": task_id,
+            "status": "completed",
+            "files": len(rendered["files"]),
+            "bytes": sum(len(content) for content in rendered["files"].values()),
+            "preview_url": site_preview_url(task_id),
+            "download_url": f"/api/download/{task_id}"
+        }
+
+    def _trim_history(self) -> None:
+        while len(self.jobs) > self.history_limit:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if not oldest.done:
+                break
+            del self.jobs[oldest_id]
+
+
+# Global batch generator instance
+batch_generator = BatchGenerator(
+    max_workers=settings.BATCH_MAX_WORKERS or None,
+    chunk_size=settings.BATCH_CHUNK_SIZE
+)
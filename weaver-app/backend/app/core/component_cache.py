@@ -0,0 +1,140 @@
+"""
+Component Library Cache
+Reuses validated generated files across projects with the same blueprint fragment
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.file_sink import file_sink
+from app.templates import system_prompts
+from app.templates.mern import component_templates
+
+logger = logging.getLogger(__name__)
+
+POLICY_OFF = "off"      # Neither store nor reuse
+POLICY_STORE = "store"  # Store validated files, always call the LLM
+POLICY_REUSE = "reuse"  # Store validated files and offer them before the LLM call
+
+# Fragment keys that vary between projects without changing the generated file
+_VOLATILE_KEYS = ("project", "purpose")
+
+
+def _template_fingerprint() -> str:
+    """Hash of everything that shapes generated code besides the blueprint"""
+    digest = hashlib.sha256()
+    for module in (system_prompts, component_templates):
+        for name in sorted(vars(module)):
+            if name.isupper():
+                digest.update(name.encode("utf-8"))
+                digest.update(repr(getattr(module, name)).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+TEMPLATE_VERSION = _template_fingerprint()
+
+
+def normalize_fragment(fragment: Dict) -> str:
+    """Canonical serialization of a blueprint fragment"""
+    normalized = {k: v for k, v in fragment.items() if k not in _VOLATILE_KEYS}
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+
+
+class ComponentLibraryCache:
+    """On-disk library of validated files keyed by (role, fragment hash, stack version)"""
+
+    def __init__(self, cache_dir: str, policy: str = POLICY_REUSE, stack_version: Optional[str] = None):
+        if policy not in (POLICY_OFF, POLICY_STORE, POLICY_REUSE):
+            raise ValueError(f"Unknown component cache policy: {policy}")
+        self.cache_dir = cache_dir
+        self.policy = policy
+        self.stack_version = stack_version or f"{settings.DEFAULT_MERN_VERSION}+{TEMPLATE_VERSION}"
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, role: str, fragment: Dict) -> str:
+        """Cache key for a file role and blueprint fragment"""
+        fragment_hash = hashlib.sha256(normalize_fragment(fragment).encode("utf-8")).hexdigest()
+        raw = f"{role}|{fragment_hash}|{self.stack_version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    async def lookup(self, role: str, fragment: Dict) -> Optional[str]:
+        """Return cached file content when the reuse policy allows it"""
+        if self.policy != POLICY_REUSE:
+            return None
+
+        path = self._entry_path(self.make_key(role, fragment))
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(None, self._read_entry, path)
+        if entry is None or entry.get("stack_version") != self.stack_version:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info(f"Component cache hit: {role} {entry.get('file_path')}")
+        return entry["content"]
+
+    async def store(self, role: str, fragment: Dict, file_path: str, content: str, quality_score: Optional[int] = None) -> None:
+        """Store a validated file in the library"""
+        if self.policy == POLICY_OFF:
+            return
+
+        entry = {
+            "role": role,
+            "file_path": file_path,
+            "stack_version": self.stack_version,
+            "fragment": json.loads(normalize_fragment(fragment)),
+            "quality_score": quality_score,
+            "created_at": datetime.now().isoformat(),
+            "content": content
+        }
+        await file_sink.write(self._entry_path(self.make_key(role, fragment)), json.dumps(entry))
+
+    def invalidate(self, role: Optional[str] = None, stale_only: bool = False) -> int:
+        """Remove entries, optionally only for one role or only those from older templates"""
+        removed = 0
+        if not os.path.isdir(self.cache_dir):
+            return removed
+
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                entry = self._read_entry(path)
+                if entry is not None:
+                    if role is not None and entry.get("role") != role:
+                        continue
+                    if stale_only and entry.get("stack_version") == self.stack_version:
+                        continue
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+
+        logger.info(f"Component cache invalidated {removed} entries")
+        return removed
+
+    def _read_entry(self, path: str) -> Optional[Dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+# Global component cache instance
+component_cache = ComponentLibraryCache(
+    settings.COMPONENT_CACHE_DIR,
+    policy=settings.COMPONENT_CACHE_POLICY
+)
@@ -0,0 +1,321 @@
+"""
+Response Compression
+Pure ASGI content negotiation for generated-site routes: precompressed siblings first, on-the-fly otherwise
+"""
+
+import os
+import gzip
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.asset_optimizer import load_brotli
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Encoding -> file suffix of its precompressed sibling
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/javascript", "application/json", "application/xml",
+    "application/manifest+json", "image/svg+xml", "application/wasm"
+)
+
+# Bodies above this size are compressed off the event loop
+_EXECUTOR_THRESHOLD = 64 * 1024
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    codings = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[name] = quality
+    return codings
+
+
+def negotiate_encodings(header: Optional[str], available: List[str]) -> List[str]:
+    """Acceptable codings from available, best first (ties keep the order of available)"""
+    if not header:
+        return []
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get("*", 0.0)
+    ranked = [(codings.get(name, wildcard), -index, name) for index, name in enumerate(available)]
+    return [name for quality, _, name in sorted(ranked, reverse=True) if quality > 0]
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def encode_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return load_brotli().compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _tag_etag(etag: str, encoding: str) -> str:
+    """'"abc"' -> '"abc-br"': each encoded representation needs its own validator"""
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return f"{etag}-{encoding}"
+
+
+def _untag_if_none_match(header: str, encodings: List[str]) -> Tuple[str, Optional[str]]:
+    """Strip encoding suffixes from If-None-Match so the route compares its own tags"""
+    found = None
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        quote = '"' if tag.endswith('"') else ""
+        for encoding in encodings:
+            suffix = f"-{encoding}{quote}"
+            if tag.endswith(suffix):
+                tag = tag[:-len(suffix)] + quote
+                found = encoding
+                break
+        tags.append(tag)
+    return ", ".join(tags), found
+
+
+def resolve_site_file(path: str) -> Optional[str]:
+    """Map a preview or /sites URL path to the file it serves, if it stays inside the sites dir"""
+    sites_dir = os.path.realpath(settings.GENERATED_SITES_DIR)
+    if path.startswith("/api/preview/"):
+        task_id, _, file_path = path[len("/api/preview/"):].partition("/")
+        if not file_path:
+            file_path = "index.html"
+        elif file_path == "bundle":
+            file_path = settings.BUNDLE_FILENAME
+        relative = f"{task_id}/{file_path}"
+    elif path.startswith("/sites/"):
+        relative = path[len("/sites/"):]
+    else:
+        return None
+
+    full_path = os.path.realpath(os.path.join(sites_dir, relative))
+    if os.path.commonpath([sites_dir, full_path]) != sites_dir:
+        return None
+    return full_path
+
+
+class _EncodedCache:
+    """Small LRU of on-the-fly encoded bodies keyed by (ETag, encoding)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: Tuple[str, str], body: bytes) -> None:
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    """
+    Negotiates Content-Encoding for GET requests under the given path prefixes.
+
+    A fresh .br/.gz sibling of the served file is sent as-is; otherwise
+    compressible bodies are encoded on the fly and kept in a small LRU keyed by
+    ETag. Range requests, non-200 responses and already-encoded or
+    incompressible media types pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app,
+        prefixes: Tuple[str, ...] = ("/api/preview/", "/sites/"),
+        resolver: Callable[[str], Optional[str]] = resolve_site_file,
+        minimum_size: Optional[int] = None,
+        max_buffer_size: Optional[int] = None,
+        cache_entries: Optional[int] = None
+    ):
+        self.app = app
+        self.prefixes = prefixes
+        self.resolver = resolver
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.max_buffer_size = settings.COMPRESSION_MAX_BUFFER_SIZE if max_buffer_size is None else max_buffer_size
+        self.cache = _EncodedCache(settings.COMPRESSION_CACHE_ENTRIES if cache_entries is None else cache_entries)
+        # Precompressed siblings can be sent in either coding; on-the-fly brotli needs the module
+        self.sibling_encodings = ["br", "gzip"]
+        self.dynamic_encodings = ["br", "gzip"] if load_brotli() is not None else ["gzip"]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        accepted = negotiate_encodings(headers.get("accept-encoding"), self.sibling_encodings)
+        if scope["method"] != "GET" or not accepted or "range" in headers:
+            await self.app(scope, receive, _VaryResponder(send).send)
+            return
+
+        matched_encoding = None
+        if "if-none-match" in headers:
+            scope = dict(scope)
+            request_headers = MutableHeaders(raw=list(scope["headers"]))
+            request_headers["if-none-match"], matched_encoding = _untag_if_none_match(
+                headers["if-none-match"], self.sibling_encodings
+            )
+            scope["headers"] = request_headers.raw
+
+        responder = _CompressionResponder(self, scope, accepted, matched_encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _VaryResponder:
+    def __init__(self, send):
+        self._send = send
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            response_headers = MutableHeaders(raw=message["headers"])
+            if is_compressible(response_headers.get("content-type", "")):
+                response_headers.add_vary_header("Accept-Encoding")
+        await self._send(message)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, scope, accepted: List[str], matched_encoding: Optional[str], send):
+        self.middleware = middleware
+        self.scope = scope
+        self.accepted = accepted
+        self.matched_encoding = matched_encoding
+        self._send = send
+        self.start_message = None
+        self.chunks: List[bytes] = []
+        self.buffered = 0
+        self.passthrough = False
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            await self._start(message)
+        elif message["type"] == "http.response.body":
+            await self._body(message)
+        else:
+            await self._send(message)
+
+    async def _start(self, message):
+        response_headers = MutableHeaders(raw=message["headers"])
+        compressible = is_compressible(response_headers.get("content-type", ""))
+        if compressible or message["status"] == 304:
+            response_headers.add_vary_header("Accept-Encoding")
+
+        if message["status"] == 304 and self.matched_encoding and "etag" in response_headers:
+            # Echo the validator the client holds for its encoded copy
+            response_headers["etag"] = _tag_etag(response_headers["etag"], self.matched_encoding)
+
+        if message["status"] != 200 or not compressible or "content-encoding" in response_headers:
+            self.passthrough = True
+            await self._send(message)
+            return
+        self.start_message = message
+
+    async def _body(self, message):
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        self.chunks.append(body)
+        self.buffered += len(body)
+        if self.buffered > self.middleware.max_buffer_size:
+            # Too large to hold in memory: send it unencoded as it arrives
+            self.passthrough = True
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": b"".join(self.chunks), "more_body": message.get("more_body", False)})
+            return
+        if message.get("more_body", False):
+            return
+
+        await self._finish(b"".join(self.chunks))
+
+    async def _finish(self, body: bytes):
+        response_headers = MutableHeaders(raw=self.start_message["headers"])
+        encoding, encoded = await self._encode(body, response_headers.get("etag"))
+
+        if encoding is None:
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        response_headers["content-encoding"] = encoding
+        response_headers["content-length"] = str(len(encoded))
+        if "etag" in response_headers:
+            response_headers["etag"] = _tag_etag(response_headers["etag"], encoding)
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": encoded})
+
+    async def _encode(self, body: bytes, etag: Optional[str]) -> Tuple[Optional[str], Optional[bytes]]:
+        loop = asyncio.get_running_loop()
+
+        # Prefer a precompressed sibling written at build time
+        file_path = self.middleware.resolver(self.scope["path"])
+        if file_path:
+            sibling = await loop.run_in_executor(None, self._read_sibling, file_path, len(body))
+            if sibling:
+                return sibling
+
+        if len(body) < self.middleware.minimum_size:
+            return None, None
+        for encoding in self.accepted:
+            if encoding not in self.middleware.dynamic_encodings:
+                continue
+            key = (etag, encoding)
+            if etag:
+                cached = self.middleware.cache.get(key)
+                if cached is not None:
+                    return encoding, cached
+            if len(body) > _EXECUTOR_THRESHOLD:
+                encoded = await loop.run_in_executor(None, encode_body, body, encoding)
+            else:
+                encoded = encode_body(body, encoding)
+            if len(encoded) >= len(body):
+                return None, None
+            if etag:
+                self.middleware.cache.put(key, encoded)
+            return encoding, encoded
+        return None, None
+
+    def _read_sibling(self, file_path: str, body_size: int) -> Optional[Tuple[str, bytes]]:
+        try:
+            source = os.stat(file_path)
+        except OSError:
+            return None
+        # Only trust a sibling of the file this response actually carries
+        if source.st_size != body_size:
+            return None
+        for encoding in self.accepted:
+            sibling_path = file_path + ENCODING_SUFFIXES[encoding]
+            try:
+                if os.stat(sibling_path).st_mtime_ns < source.st_mtime_ns:
+                    continue
+                with open(sibling_path, "rb") as f:
+                    return encoding, f.read()
+            except OSError:
+                continue
+        return None
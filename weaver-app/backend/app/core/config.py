@@ -1,6 +1,6 @@
 import os
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # API Configuration
@@ -20,13 +20,44 @@ class Settings(BaseSettings):
     BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     GENERATED_SITES_DIR: str = os.path.join(BASE_DIR, "generated_sites")
     MAX_CONCURRENT_JOBS: int = 5
+    FILE_SINK_FSYNC_POLICY: str = "batch"  # Options: "never", "batch" or "always"
+    FILE_SINK_MAX_BATCH_SIZE: int = 64
     
     # WebSocket Configuration
-    WS_HEARTBEAT_INTERVAL: int = 30
+    WS_HEARTBEAT_INTERVAL: int = 30  # Seconds between server pings
+    WS_MAX_MISSED_PONGS: int = 2  # Close a connection silent through this many pings
+    WS_TERMINAL_GRACE: int = 120  # Seconds a finished task's connections may stay open
+    WS_SEND_QUEUE_SIZE: int = 256  # Outbound frames buffered per subscriber
+    WS_DEFAULT_QUEUE_POLICY: str = "drop_oldest"  # Options: "drop_oldest", "never_drop"
+    WS_QUEUE_POLICIES: Dict[str, str] = {"completion": "never_drop", "error": "never_drop"}
+    WS_BATCH_WINDOW_MS: int = 50  # Events queued within this window share one frame (0 disables)
+    WS_REPLAY_BUFFER_SIZE: int = 1000  # Recent events kept per task for ?since= replay
+    WS_REPLAY_RETENTION: int = 300  # Seconds a finished task's events stay replayable
+    WS_REPLAY_IDLE_TTL: int = 3600  # Seconds an unfinished task's events stay replayable without new ones
+
+    # Server-Sent Events
+    SSE_KEEPALIVE_INTERVAL: int = 15  # Seconds of silence before a keep-alive comment
+    SSE_RETRY_MS: int = 3000  # Reconnect delay suggested to EventSource clients
+
+    # Event Bus (task events and state shared between workers)
+    EVENT_BUS_BACKEND: str = "memory"  # Options: "memory" (single worker), "unix", "redis"
+    EVENT_BUS_SOCKET_PATH: str = "/tmp/weaver-event-bus.sock"
+    EVENT_BUS_REDIS_URL: str = "redis://localhost:6379/0"
+    EVENT_BUS_CHANNEL: str = "weaver:tasks"
+    EVENT_BUS_OUTBOX_SIZE: int = 10000  # Messages buffered while the broker is unreachable
+    EVENT_BUS_MAX_MESSAGE_SIZE: int = 16 * 1024 * 1024  # Longer messages are dropped, not relayed
+    
+    # Batch Generation
+    BATCH_MAX_WORKERS: int = 0  # 0 uses one worker process per CPU
+    BATCH_CHUNK_SIZE: int = 16
+    BATCH_MAX_PROMPTS: int = 1000
     
     # Task Configuration
     TASK_TIMEOUT_SECONDS: int = 600  # 10 minutes for large generations
+    TASK_STALL_SECONDS: int = 120  # A running task with no update for this long has stalled
     CLEANUP_INTERVAL_HOURS: int = 24
+    TASK_STATE_TTL: int = 3600  # Seconds a finished task's state stays queryable
+    TASK_PROMPT_PREVIEW_CHARS: int = 200  # Prompt characters kept in task state
     
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
@@ -40,12 +71,58 @@ class Settings(BaseSettings):
     AI_MAX_TOKENS: int = 4096
     AI_STREAMING: bool = True
     
+    # Static Site Template Settings
+    TEMPLATE_FRAGMENT_CACHE_SIZE: int = 512
+    OPTIMIZE_ASSETS: bool = True
+    PRECOMPRESS_ASSETS: bool = True
+    PRECOMPRESS_MIN_SIZE: int = 256
+    FINGERPRINT_ASSETS: bool = True  # Rename CSS/JS/images to name.<hash>.ext
+    FINGERPRINT_HASH_LENGTH: int = 10
+    FINGERPRINT_MAX_AGE: int = 31536000  # Fingerprinted URLs never change content
+    FINGERPRINT_MANIFEST_INDEX_SIZE: int = 256  # Projects whose asset manifests stay loaded
+    SITE_OUTPUT_MODE: str = "both"  # Options: "files", "bundle" (index.html is self-contained) or "both"
+    BUNDLE_FILENAME: str = "bundle.html"
+    BUNDLE_DEFERRED_STYLESHEETS: List[str] = ["animations.css"]
+    
+    # Project Archives
+    ARCHIVE_CACHE_DIR: str = os.path.join(BASE_DIR, "archive_cache")
+    ARCHIVE_DEFAULT_PROFILE: str = "source-only"  # Options: "full" (adds node_modules, builds and lockfiles), "source-only" or "static-build"
+    ARCHIVE_COMPRESSION_LEVEL: int = 6  # Deflate level of the "full" profile
+    ARCHIVE_CHUNK_SIZE: int = 64 * 1024
+    ARCHIVE_WORKERS: int = 0  # Compression threads; 0 uses one per CPU, 1 compresses sequentially
+    ARCHIVE_SPOOL_SIZE: int = 8 * 1024 * 1024  # Compressed members larger than this spill to disk
+    ARCHIVE_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024  # Oldest cached archives go first past this total
+    ARCHIVE_CACHE_MAX_AGE: int = 7 * 24 * 3600  # Seconds a cached archive is kept
+    
+    # Preview Serving
+    PREVIEW_CACHE_MAX_ENTRIES: int = 512
+    PREVIEW_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    PREVIEW_CACHE_MAX_FILE_SIZE: int = 512 * 1024
+    PREVIEW_MAX_AGE: int = 300  # Seconds completed previews may be reused before revalidating
+    LIVE_PREVIEW_ENABLED: bool = True  # ?live=1 previews update as files are written
+    COMPRESSION_MIN_SIZE: int = 512
+    COMPRESSION_MAX_BUFFER_SIZE: int = 4 * 1024 * 1024
+    COMPRESSION_CACHE_ENTRIES: int = 256
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    
+    # Page Weight Audit
+    AUDIT_ENFORCE_BUDGET: bool = True
+    AUDIT_MAX_TRANSFER_BYTES: int = 250 * 1024
+    AUDIT_MAX_REQUESTS: int = 25
+    AUDIT_MAX_RENDER_BLOCKING: int = 6
+    AUDIT_MAX_INLINE_BYTES: int = 64 * 1024
+    
     # MERN Generation Settings
     MERN_TEMPLATES_DIR: str = os.path.join(BASE_DIR, "app", "templates", "mern")
     DEFAULT_MERN_VERSION: str = "18.0.0"
     ENABLE_TYPESCRIPT: bool = True
     USE_YARN: bool = True
     
+    # Component Library Cache
+    COMPONENT_CACHE_DIR: str = os.path.join(BASE_DIR, "component_cache")
+    COMPONENT_CACHE_POLICY: str = "reuse"  # Options: "off", "store" or "reuse"
+    
     # Quality Validation Settings
     QUALITY_THRESHOLD: int = 80
     ENABLE_GOLDEN_PROMPT_VALIDATION: bool = True
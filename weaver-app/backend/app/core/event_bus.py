@@ -0,0 +1,369 @@
+"""
+Task Event Bus
+Pluggable pub/sub that carries task events and state between uvicorn workers
+"""
+
+import os
+import json
+import uuid
+import fcntl
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KIND_EVENT = "event"
+KIND_STATE = "state"
+
+# Broker clients whose unsent backlog grows past this are disconnected
+_MAX_CLIENT_BACKLOG = 4 * 1024 * 1024
+
+
+def load_redis():
+    try:
+        import redis.asyncio as redis
+        return redis
+    except ImportError:
+        return None
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class EventBus:
+    """
+    In-process bus: everything is already delivered locally, so publishing
+    is a no-op. Cross-process backends override start/stop and drain the
+    outbox; publish never waits on I/O.
+    """
+
+    def __init__(self, outbox_size: int = 10000, max_message_size: int = 16 * 1024 * 1024):
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.outbox_size = outbox_size
+        self.max_message_size = max_message_size
+        self.dropped = 0
+        # Cross-process backends: whether the link to the broker is up, and how often it was re-established
+        self.connected = False
+        self.reconnects = 0
+        self._handlers: Dict[str, List[Callable[[str, Dict], None]]] = {}
+        self._outbox: Optional[asyncio.Queue] = None
+
+    @property
+    def shared(self) -> bool:
+        """Whether other processes see what this one publishes"""
+        return False
+
+    def health(self) -> Dict:
+        report = {"backend": type(self).__name__, "shared": self.shared, "dropped": self.dropped}
+        if self.shared:
+            report.update(connected=self.connected, reconnects=self.reconnects)
+        return report
+
+    def subscribe(self, kind: str, handler: Callable[[str, Dict], None]) -> None:
+        """Call handler(task_id, payload) for every message of kind published by another process"""
+        self._handlers.setdefault(kind, []).append(handler)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def publish(self, kind: str, task_id: str, payload: Dict) -> None:
+        if self._outbox is None:
+            return
+        # Serialized now, so later changes to payload are not picked up
+        line = json.dumps(
+            {"origin": self.origin, "kind": kind, "task_id": task_id, "payload": payload},
+            default=_json_default,
+            separators=(",", ":")
+        ).encode("utf-8") + b"\n"
+        if len(line) > self.max_message_size:
+            self._drop_oversized(len(line))
+            return
+        try:
+            self._outbox.put_nowait(line)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _dispatch(self, line: bytes) -> None:
+        try:
+            message = json.loads(line)
+        except ValueError:
+            logger.warning("Event bus: ignoring malformed message")
+            return
+        if message.get("origin") == self.origin:
+            return
+        for handler in self._handlers.get(message.get("kind"), []):
+            try:
+                handler(message["task_id"], message["payload"])
+            except Exception as e:
+                logger.error(f"Event bus handler failed for {message.get('task_id')}: {e}")
+
+    def _drop_oversized(self, size: int) -> None:
+        self.dropped += 1
+        logger.warning(f"Event bus: dropped a {size}-byte message (limit {self.max_message_size})")
+
+    async def _cancel(self, tasks: List[asyncio.Task]) -> None:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class UnixSocketEventBus(EventBus):
+    """
+    Workers share one broker on a UNIX-domain socket.
+
+    Whichever worker holds the lock file hosts the broker and every worker,
+    the host included, connects to it as a client. When the host exits the
+    others reconnect and one of them takes the lock over.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        outbox_size: int = 10000,
+        max_message_size: int = 16 * 1024 * 1024,
+        retry_interval: float = 1.0
+    ):
+        super().__init__(outbox_size, max_message_size)
+        self.path = path
+        self.retry_interval = retry_interval
+        self._lock_fd: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._connected_once = False
+
+    @property
+    def shared(self) -> bool:
+        return True
+
+    async def start(self) -> None:
+        self._outbox = asyncio.Queue(maxsize=self.outbox_size)
+        self._tasks = [asyncio.create_task(self._client_loop())]
+        logger.info(f"Event bus using UNIX socket {self.path}")
+
+    async def stop(self) -> None:
+        await self._cancel(self._tasks)
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self._server = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _acquire_broker_lock(self) -> bool:
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _client_loop(self) -> None:
+        while True:
+            try:
+                if self._server is None and self._acquire_broker_lock():
+                    # The lock holder owns the path: a leftover socket file is stale
+                    try:
+                        os.unlink(self.path)
+                    except FileNotFoundError:
+                        pass
+                    self._server = await asyncio.start_unix_server(
+                        self._serve_client, path=self.path, limit=self.max_message_size
+                    )
+                    logger.info(f"Event bus broker listening on {self.path} (pid {os.getpid()})")
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=self.max_message_size)
+            except OSError as e:
+                logger.debug(f"Event bus broker unavailable: {e}")
+                await asyncio.sleep(self.retry_interval)
+                continue
+
+            if self._connected_once:
+                self.reconnects += 1
+            self.connected = self._connected_once = True
+            sender = asyncio.create_task(self._send_outbox(writer))
+            try:
+                while True:
+                    line = await self._read_message(reader)
+                    if not line:
+                        break
+                    self._dispatch(line)
+                logger.warning("Event bus broker closed the connection")
+            except (ConnectionError, OSError) as e:
+                logger.warning(f"Event bus connection lost: {e}")
+            finally:
+                self.connected = False
+                await self._cancel([sender])
+                writer.close()
+            await asyncio.sleep(self.retry_interval)
+
+    async def _send_outbox(self, writer: asyncio.StreamWriter) -> None:
+        while True:
+            line = await self._outbox.get()
+            writer.write(line)
+            await writer.drain()
+
+    async def _read_message(self, reader: asyncio.StreamReader) -> bytes:
+        """
+        Next newline-terminated message, or b"" once the peer is gone.
+
+        A message longer than the stream limit is read past in pieces and
+        dropped; readline() would raise and leave its tail in the stream.
+        """
+        oversized = 0
+        while True:
+            try:
+                line = await reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError:
+                return b""
+            except asyncio.LimitOverrunError as e:
+                oversized += len(await reader.readexactly(e.consumed))
+                continue
+            if not oversized:
+                return line
+            self._drop_oversized(oversized + len(line))
+            oversized = 0
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Broker side: relay every line to all other connected workers"""
+        self._clients.add(writer)
+        try:
+            while True:
+                line = await self._read_message(reader)
+                if not line:
+                    break
+                for client in list(self._clients):
+                    if client is writer:
+                        continue
+                    if client.transport.get_write_buffer_size() > _MAX_CLIENT_BACKLOG:
+                        logger.warning("Event bus broker: dropping a client that stopped reading")
+                        self._clients.discard(client)
+                        client.close()
+                        continue
+                    client.write(line)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+
+class RedisEventBus(EventBus):
+    """Stand-in backend over Redis PUBLISH/SUBSCRIBE (needs the optional redis package)"""
+
+    def __init__(
+        self,
+        url: str,
+        channel: str,
+        outbox_size: int = 10000,
+        max_message_size: int = 16 * 1024 * 1024,
+        retry_interval: float = 1.0
+    ):
+        super().__init__(outbox_size, max_message_size)
+        self.url = url
+        self.channel = channel
+        self.retry_interval = retry_interval
+        self._client = None
+        self._pubsub = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def shared(self) -> bool:
+        return True
+
+    async def start(self) -> None:
+        redis = load_redis()
+        if redis is None:
+            raise RuntimeError("EVENT_BUS_BACKEND=redis requires the redis package")
+        self._outbox = asyncio.Queue(maxsize=self.outbox_size)
+        self._client = redis.from_url(self.url)
+        await self._subscribe()
+        self._tasks = [
+            asyncio.create_task(self._receive()),
+            asyncio.create_task(self._send_outbox())
+        ]
+        logger.info(f"Event bus using Redis channel {self.channel}")
+
+    async def stop(self) -> None:
+        await self._cancel(self._tasks)
+        if self._pubsub is not None:
+            await self._pubsub.close()
+        if self._client is not None:
+            await self._client.close()
+
+    async def _subscribe(self) -> None:
+        self._pubsub = self._client.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self.connected = True
+
+    async def _receive(self) -> None:
+        """Dispatch channel messages, resubscribing whenever the connection drops"""
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._subscribe()
+                    self.reconnects += 1
+                    logger.info(f"Event bus resubscribed to Redis channel {self.channel}")
+                async for message in self._pubsub.listen():
+                    if message.get("type") == "message":
+                        self._dispatch(message["data"])
+                logger.warning("Event bus Redis subscription ended")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event bus Redis subscription lost: {e}")
+            self.connected = False
+            if self._pubsub is not None:
+                try:
+                    await self._pubsub.close()
+                except Exception:
+                    pass
+                self._pubsub = None
+            await asyncio.sleep(self.retry_interval)
+
+    async def _send_outbox(self) -> None:
+        while True:
+            line = await self._outbox.get()
+            try:
+                await self._client.publish(self.channel, line)
+            except Exception as e:
+                logger.warning(f"Event bus publish failed: {e}")
+
+
+def create_event_bus(backend: Optional[str] = None) -> EventBus:
+    backend = backend or settings.EVENT_BUS_BACKEND
+    if backend == "unix":
+        return UnixSocketEventBus(
+            settings.EVENT_BUS_SOCKET_PATH, settings.EVENT_BUS_OUTBOX_SIZE, settings.EVENT_BUS_MAX_MESSAGE_SIZE
+        )
+    if backend == "redis":
+        return RedisEventBus(
+            settings.EVENT_BUS_REDIS_URL,
+            settings.EVENT_BUS_CHANNEL,
+            settings.EVENT_BUS_OUTBOX_SIZE,
+            settings.EVENT_BUS_MAX_MESSAGE_SIZE
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown event bus backend: {backend}")
+    return EventBus(settings.EVENT_BUS_OUTBOX_SIZE, settings.EVENT_BUS_MAX_MESSAGE_SIZE)
+
+
+# Global event bus instance
+event_bus = create_event_bus()
@@ -0,0 +1,118 @@
+"""
+Task Event Log
+Bounded per-task replay buffers so late or reconnecting clients can catch up
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.core.task_events import TaskEvent
+
+logger = logging.getLogger(__name__)
+
+
+class TaskEventLog:
+    """Ring buffer of one task's most recent events, numbered from 1"""
+
+    __slots__ = ("events", "last_seq", "finished_at", "updated_at")
+
+    def __init__(self, max_events: int):
+        self.events: Deque[TaskEvent] = deque(maxlen=max_events)
+        self.last_seq = 0
+        self.finished_at: Optional[float] = None
+        self.updated_at = time.monotonic()
+
+    def append(self, event: TaskEvent) -> int:
+        if event.seq is None:
+            self.last_seq += 1
+            event.seq = self.last_seq
+        else:
+            # Numbered by the worker running the task: keep its numbering
+            self.last_seq = max(self.last_seq, event.seq)
+        self.events.append(event)
+        self.updated_at = time.monotonic()
+        return event.seq
+
+    def since(self, seq: int) -> Tuple[List[TaskEvent], int]:
+        """Events after seq, and how many of those were already evicted"""
+        if not self.events:
+            return [], max(self.last_seq - seq, 0)
+        first = self.events[0].seq
+        missed = max(first - seq - 1, 0)
+        if seq < first:
+            return list(self.events), missed
+        return [event for event in self.events if event.seq > seq], missed
+
+    def expired(self, finished_cutoff: float, idle_cutoff: float) -> bool:
+        if self.finished_at is not None:
+            return self.finished_at <= finished_cutoff
+        return self.updated_at <= idle_cutoff
+
+
+class EventLogStore:
+    """
+    Replay logs for every task that published an event.
+
+    A log is kept while its task runs and for `retention` seconds after it
+    finishes; evict_expired() drops the rest. A log that never sees a
+    terminal event is dropped once it has been idle for `idle_ttl` seconds.
+    """
+
+    def __init__(self, max_events: int = 1000, retention: float = 300, idle_ttl: float = 3600):
+        self.max_events = max_events
+        self.retention = retention
+        self.idle_ttl = idle_ttl
+        self._logs: Dict[str, TaskEventLog] = {}
+
+    def record(self, task_id: str, event: TaskEvent) -> int:
+        """Number the event and keep it for replay"""
+        log = self._logs.get(task_id)
+        if log is None:
+            log = self._logs[task_id] = TaskEventLog(self.max_events)
+        return log.append(event)
+
+    def replay(self, task_id: str, since: int = 0) -> Tuple[List[TaskEvent], int]:
+        log = self._logs.get(task_id)
+        if log is None:
+            return [], 0
+        return log.since(since)
+
+    def last_seq(self, task_id: str) -> int:
+        log = self._logs.get(task_id)
+        return log.last_seq if log else 0
+
+    def finish(self, task_id: str) -> None:
+        """Start the retention window of a completed or failed task"""
+        log = self._logs.get(task_id)
+        if log is not None and log.finished_at is None:
+            log.finished_at = time.monotonic()
+
+    def finished_at(self, task_id: str) -> Optional[float]:
+        """Monotonic time the task finished, or None while it runs (or is unknown)"""
+        log = self._logs.get(task_id)
+        return log.finished_at if log else None
+
+    def drop(self, task_id: str) -> None:
+        self._logs.pop(task_id, None)
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        finished_cutoff = now - self.retention
+        idle_cutoff = now - self.idle_ttl
+        expired = [
+            task_id for task_id, log in self._logs.items()
+            if log.expired(finished_cutoff, idle_cutoff)
+        ]
+        for task_id in expired:
+            del self._logs[task_id]
+        if expired:
+            logger.info(f"Evicted event logs of {len(expired)} finished or idle tasks")
+        return len(expired)
+
+    def stats(self) -> Dict:
+        return {
+            "tasks": len(self._logs),
+            "events": sum(len(log.events) for log in self._logs.values())
+        }
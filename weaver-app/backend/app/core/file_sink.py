@@ -0,0 +1,261 @@
+"""
+Project File Sink
+Write-behind persistence for generated project files
+"""
+
+import os
+import queue
+import asyncio
+import logging
+import tempfile
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FSYNC_NEVER = "never"
+FSYNC_BATCH = "batch"
+FSYNC_ALWAYS = "always"
+
+_STOP = object()
+
+
+class _PendingWrite:
+    __slots__ = ("path", "data", "future")
+
+    def __init__(self, path: str, data: bytes, future: Future):
+        self.path = path
+        self.data = data
+        self.future = future
+
+
+class _PendingDirs:
+    __slots__ = ("paths", "future")
+
+    def __init__(self, paths: List[str], future: Future):
+        self.paths = paths
+        self.future = future
+
+
+class _PendingRemoval:
+    __slots__ = ("paths", "future")
+
+    def __init__(self, paths: List[str], future: Future):
+        self.paths = paths
+        self.future = future
+
+
+class ProjectFileSink:
+    """
+    Batches (path, bytes) pairs and commits them on a dedicated I/O thread.
+
+    Every file is written to a temporary sibling and renamed into place, so
+    readers (preview, download) never observe a half-written file.
+    """
+
+    def __init__(
+        self,
+        fsync_policy: str = FSYNC_BATCH,
+        max_batch_size: int = 64
+    ):
+        if fsync_policy not in (FSYNC_NEVER, FSYNC_BATCH, FSYNC_ALWAYS):
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        self.fsync_policy = fsync_policy
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, bytes], None]] = []
+
+    def start(self) -> None:
+        """Start the I/O thread if it is not already running"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name="project-file-sink",
+                daemon=True
+            )
+            self._thread.start()
+            logger.info(f"File sink started (fsync={self.fsync_policy})")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Drain pending writes and stop the I/O thread"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        logger.info("File sink stopped")
+
+    def add_listener(self, listener: Callable[[str, bytes], None]) -> None:
+        """Call listener(path, data) on the I/O thread for every committed file"""
+        if listener not in self._listeners:
+            self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener: Callable[[str, bytes], None]) -> None:
+        self._listeners = [item for item in self._listeners if item != listener]
+
+    def submit(self, path: str, data: Union[bytes, str]) -> Future:
+        """Queue a file for writing and return its completion future"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.start()
+        future: Future = Future()
+        self._queue.put(_PendingWrite(os.path.abspath(path), data, future))
+        return future
+
+    async def write(self, path: str, data: Union[bytes, str]) -> str:
+        """Write a single file without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(path, data))
+
+    async def write_many(self, files: Union[Dict[str, Union[bytes, str]], Iterable[Tuple[str, Union[bytes, str]]]]) -> List[str]:
+        """Write several files and wait until all of them are committed"""
+        items = files.items() if isinstance(files, dict) else files
+        futures = [asyncio.wrap_future(self.submit(path, data)) for path, data in items]
+        return list(await asyncio.gather(*futures))
+
+    async def make_dirs(self, *paths: str) -> None:
+        """Create (possibly empty) directories on the I/O thread"""
+        future: Future = Future()
+        self.start()
+        self._queue.put(_PendingDirs([os.path.abspath(p) for p in paths], future))
+        await asyncio.wrap_future(future)
+
+    async def remove(self, *paths: str) -> None:
+        """Delete files on the I/O thread, after any queued writes to them (missing files are ignored)"""
+        future: Future = Future()
+        self.start()
+        self._queue.put(_PendingRemoval([os.path.abspath(p) for p in paths], future))
+        await asyncio.wrap_future(future)
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far has been committed"""
+        barrier: Future = Future()
+        self.start()
+        self._queue.put(barrier)
+        await asyncio.wrap_future(barrier)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = self._commit_batch(batch)
+            if stop:
+                return
+
+    def _commit_batch(self, batch: List) -> bool:
+        stop = False
+        committed: List[_PendingWrite] = []
+        barriers: List[Future] = []
+
+        for item in batch:
+            if item is _STOP:
+                stop = True
+            elif isinstance(item, Future):
+                barriers.append(item)
+            elif isinstance(item, _PendingDirs):
+                try:
+                    for path in item.paths:
+                        os.makedirs(path, exist_ok=True)
+                    barriers.append(item.future)
+                except Exception as e:
+                    logger.error(f"File sink failed to create directories: {e}")
+                    if not item.future.cancelled():
+                        item.future.set_exception(e)
+            elif isinstance(item, _PendingRemoval):
+                for path in item.paths:
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logger.error(f"File sink failed to remove {path}: {e}")
+                barriers.append(item.future)
+            else:
+                try:
+                    self._write_file(item)
+                    committed.append(item)
+                except Exception as e:
+                    logger.error(f"File sink failed to write {item.path}: {e}")
+                    if not item.future.cancelled():
+                        item.future.set_exception(e)
+
+        if committed and self.fsync_policy == FSYNC_BATCH:
+            for directory in {os.path.dirname(item.path) for item in committed}:
+                self._fsync_dir(directory)
+
+        # Listeners hear about a file before its writer resumes
+        listeners = self._listeners
+        for item in committed:
+            for listener in listeners:
+                try:
+                    listener(item.path, item.data)
+                except Exception as e:
+                    logger.error(f"File sink listener failed for {item.path}: {e}")
+
+        for item in committed:
+            if not item.future.cancelled():
+                item.future.set_result(item.path)
+        for barrier in barriers:
+            if not barrier.cancelled():
+                barrier.set_result(None)
+        return stop
+
+    def _write_file(self, item: _PendingWrite) -> None:
+        directory = os.path.dirname(item.path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory,
+            prefix=f".{os.path.basename(item.path)}.",
+            suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(item.data)
+                if self.fsync_policy != FSYNC_NEVER:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, item.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        if self.fsync_policy == FSYNC_ALWAYS:
+            self._fsync_dir(directory)
+
+    def _fsync_dir(self, directory: str) -> None:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+# Global file sink instance
+file_sink = ProjectFileSink(
+    fsync_policy=settings.FILE_SINK_FSYNC_POLICY,
+    max_batch_size=settings.FILE_SINK_MAX_BATCH_SIZE
+)
@@ -0,0 +1,203 @@
+"""
+HTTP Cache Validators
+ETag, Last-Modified and byte-range helpers for conditional requests
+"""
+
+import os
+import uuid
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+RANGE_CHUNK_SIZE = 64 * 1024
+
+
+def make_etag(*parts, weak: bool = False) -> str:
+    """Build a quoted entity tag from a hash of parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    tag = f'"{digest.hexdigest()[:32]}"'
+    return f"W/{tag}" if weak else tag
+
+
+def http_date(timestamp: float) -> str:
+    """Format a POSIX timestamp as an IMF-fixdate"""
+    return formatdate(timestamp, usegmt=True)
+
+
+def parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _split_tags(header: str) -> Iterable[str]:
+    return (tag.strip() for tag in header.split(",") if tag.strip())
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """
+    Check an If-None-Match (weak comparison) or If-Match / If-Range (strong
+    comparison, weak=False) header against etag.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    if not weak:
+        return not etag.startswith("W/") and any(tag == etag for tag in _split_tags(header))
+    return any(_opaque(tag) == _opaque(etag) for tag in _split_tags(header))
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: Optional[float] = None) -> bool:
+    """Decide whether a GET/HEAD can be answered with 304 Not Modified"""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        return etag_matches(if_none_match, etag)
+
+    since = parse_http_date(headers.get("if-modified-since"))
+    return since is not None and last_modified is not None and int(last_modified) <= since
+
+
+def validator_headers(etag: str, last_modified: Optional[float] = None, cache_control: Optional[str] = None) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+class RangeNotSatisfiable(Exception):
+    """The Range header selects no bytes of the representation"""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[list]:
+    """
+    Parse a "bytes=" Range header into inclusive (start, end) pairs.
+
+    Returns None when the header is absent or not a byte range (serve the
+    full body) and raises RangeNotSatisfiable when no range overlaps size.
+    """
+    if not header or not header.strip().lower().startswith("bytes="):
+        return None
+
+    ranges = []
+    for spec in header.split("=", 1)[1].split(","):
+        spec = spec.strip()
+        if "-" not in spec:
+            return None
+        first, last = (part.strip() for part in spec.split("-", 1))
+        try:
+            if not first:
+                # Suffix range: the last N bytes
+                length = int(last)
+                if length <= 0:
+                    continue
+                start, end = max(size - length, 0), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and end < start:
+                    return None
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+        if start < size:
+            ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+    return ranges
+
+
+def if_range_matches(header: Optional[str], etag: str, last_modified: Optional[float]) -> bool:
+    """Whether a Range request may be honoured given its If-Range precondition"""
+    if not header:
+        return True
+    header = header.strip()
+    if header.startswith(('"', "W/")):
+        return etag_matches(header, etag, weak=False)
+    since = parse_http_date(header)
+    return since is not None and last_modified is not None and int(last_modified) == int(since)
+
+
+def _iter_file_ranges(path: str, ranges: List[Tuple[int, int]], parts: Optional[List[bytes]] = None) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        for index, (start, end) in enumerate(ranges):
+            if parts:
+                yield parts[index]
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = f.read(min(RANGE_CHUNK_SIZE, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+        if parts:
+            yield parts[-1]
+
+
+def ranged_file_response(
+    path: str,
+    request_headers: Mapping[str, str],
+    etag: str,
+    last_modified: Optional[float],
+    headers: dict,
+    media_type: str
+) -> Response:
+    """
+    Serve path whole (200), as byte ranges (206) or reject the range (416).
+
+    A Range whose If-Range validator no longer matches gets the full body.
+    """
+    size = os.path.getsize(path)
+    headers = {**headers, "Accept-Ranges": "bytes"}
+
+    range_header = request_headers.get("range")
+    if not range_header or not if_range_matches(request_headers.get("if-range"), etag, last_modified):
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    try:
+        ranges = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    if ranges is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(_iter_file_ranges(path, ranges), status_code=206, media_type=media_type, headers=headers)
+
+    # Several ranges go out as multipart/byteranges
+    boundary = uuid.uuid4().hex
+    parts = []
+    for start, end in ranges:
+        separator = "\r\n" if parts else ""
+        parts.append((
+            f"{separator}--{boundary}\r\nContent-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode("latin-1"))
+    parts.append(f"\r\n--{boundary}--\r\n".encode("latin-1"))
+    headers["Content-Length"] = str(sum(len(part) for part in parts) + sum(end - start + 1 for start, end in ranges))
+    return StreamingResponse(
+        _iter_file_ranges(path, ranges, parts),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers
+    )
@@ -0,0 +1,89 @@
+"""
+Live Preview
+Publishes committed project files to the task channel and injects the live preview client
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.core.file_sink import file_sink
+from app.core.task_store import task_store
+from app.core.websocket_manager import manager
+from app.templates.live_preview import LIVE_PREVIEW_CLIENT
+
+logger = logging.getLogger(__name__)
+
+# Precompressed siblings and sink temp files never reach the browser as-is
+_IGNORED_SUFFIXES = (".gz", ".br", ".tmp")
+
+
+def site_relative_path(path: str) -> Optional[Tuple[str, str]]:
+    """Split an absolute path under the sites dir into (task_id, relative path)"""
+    sites_dir = os.path.join(os.path.abspath(settings.GENERATED_SITES_DIR), "")
+    if not path.startswith(sites_dir):
+        return None
+    task_id, _, relative_path = path[len(sites_dir):].partition(os.sep)
+    if not relative_path:
+        return None
+    return task_id, relative_path.replace(os.sep, "/")
+
+
+def inject_live_client(html: bytes, task_id: str) -> bytes:
+    """Insert the live preview client before </body> (or at the end of the page)"""
+    # The page already reflects every file written so far: only follow newer events
+    client = (
+        LIVE_PREVIEW_CLIENT
+        .replace("__ROOT__", f"/api/preview/{task_id}/")
+        .replace("__TASK_ID__", task_id)
+        .replace("__SINCE__", str(manager.event_logs.last_seq(task_id)))
+        .encode("utf-8")
+    )
+    index = html.lower().rfind(b"</body>")
+    if index == -1:
+        return html + client
+    return html[:index] + client + html[index:]
+
+
+class LivePreviewPublisher:
+    """
+    Listens to the file sink and pushes a file_written event (path, hash,
+    size) for every project file as soon as it is committed. Only running
+    generations of this worker are followed: batch items and finished tasks
+    have no live preview, and their events would only fill replay logs.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        file_sink.add_listener(self._on_commit)
+
+    def detach(self) -> None:
+        file_sink.remove_listener(self._on_commit)
+        self._loop = None
+
+    def _on_commit(self, path: str, data: bytes) -> None:
+        # Runs on the file sink thread
+        loop = self._loop
+        located = site_relative_path(path)
+        if loop is None or located is None or path.endswith(_IGNORED_SUFFIXES):
+            return
+
+        task_id, relative_path = located
+        record = task_store.get(task_id)
+        if record is None or not record.live:
+            return
+        file_hash = hashlib.sha256(data).hexdigest()[:16]
+        asyncio.run_coroutine_threadsafe(
+            manager.send_file_written(task_id, relative_path, file_hash, len(data)),
+            loop
+        )
+
+
+# Global live preview publisher instance
+live_preview = LivePreviewPublisher()
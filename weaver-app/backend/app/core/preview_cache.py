@@ -0,0 +1,128 @@
+"""
+Preview Cache
+Bounded in-memory LRU of small generated-site files served by the preview router
+"""
+
+import os
+import stat as stat_module
+import logging
+import threading
+import mimetypes
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.http_cache import make_etag
+
+logger = logging.getLogger(__name__)
+
+
+class PreviewFile:
+    """Validators and, for small files, the content of one preview file"""
+
+    __slots__ = ("path", "size", "mtime_ns", "etag", "last_modified", "media_type", "content")
+
+    def __init__(self, path: str, stat: os.stat_result, content: Optional[bytes] = None):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.etag = make_etag(path, stat.st_size, stat.st_mtime_ns)
+        self.last_modified = stat.st_mtime
+        self.media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.content = content
+
+
+class PreviewCache:
+    """
+    LRU of preview files keyed by absolute path.
+
+    Each lookup stats the file, so an entry is replaced as soon as its mtime or
+    size changes; generation events can also drop a whole task at once.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024, max_file_size: int = 512 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_file_size = max_file_size
+        self._entries: "OrderedDict[str, PreviewFile]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> Optional[PreviewFile]:
+        """Return the preview file at path, or None if it does not exist (blocking on a miss)"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._drop(path)
+            return None
+        if not stat_module.S_ISREG(stat.st_mode):
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            self._drop(path)
+
+        if stat.st_size > self.max_file_size:
+            # Large files are streamed from disk; only their validators are computed
+            return PreviewFile(path, stat)
+
+        with open(path, "rb") as f:
+            # Validators come from the opened file so they always describe the bytes read
+            stat = os.fstat(f.fileno())
+            content = f.read()
+        entry = PreviewFile(path, stat, content)
+        with self._lock:
+            self._drop(path)
+            self._entries[path] = entry
+            self._bytes += len(content)
+            self._evict()
+        return entry
+
+    def invalidate(self, project_dir: Optional[str] = None) -> int:
+        """Drop every entry under project_dir (or everything); returns the number dropped"""
+        with self._lock:
+            if project_dir is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                return dropped
+
+            prefix = os.path.join(os.path.abspath(project_dir), "")
+            stale = [path for path in self._entries if path.startswith(prefix)]
+            for path in stale:
+                self._drop(path)
+            return len(stale)
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def _drop(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= len(entry.content)
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= len(entry.content)
+
+
+# Global preview cache instance
+preview_cache = PreviewCache(
+    max_entries=settings.PREVIEW_CACHE_MAX_ENTRIES,
+    max_bytes=settings.PREVIEW_CACHE_MAX_BYTES,
+    max_file_size=settings.PREVIEW_CACHE_MAX_FILE_SIZE
+)
@@ -0,0 +1,183 @@
+"""
+Prompt Classifier
+Single-pass keyword scoring of site type and color scheme
+"""
+
+import re
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SITE_TYPE = "landing_page"
+DEFAULT_COLOR_SCHEME = "blue"
+
+# Site type -> keywords and the structure it implies. Order breaks score ties.
+SITE_TYPE_PROFILES = {
+    "portfolio": {
+        "keywords": ["portfolio", "personal", "resume", "cv", "work", "project"],
+        "sections": ["hero", "about", "projects", "skills", "experience", "contact"],
+        "theme": "creative",
+        "label": "📄 Detected: Portfolio website"
+    },
+    "business": {
+        "keywords": ["business", "company", "corporate", "enterprise", "agency"],
+        "sections": ["hero", "services", "about", "team", "testimonials", "contact"],
+        "theme": "professional",
+        "label": "🏢 Detected: Business website"
+    },
+    "blog": {
+        "keywords": ["blog", "news", "article", "writing", "content"],
+        "sections": ["header", "featured", "articles", "categories", "about", "contact"],
+        "theme": "editorial",
+        "label": "📝 Detected: Blog website"
+    },
+    "restaurant": {
+        "keywords": ["restaurant", "cafe", "food", "menu", "dining"],
+        "sections": ["hero", "menu", "about", "gallery", "reservations", "contact"],
+        "theme": "warm",
+        "color_scheme": "orange",
+        "label": "🍽️ Detected: Restaurant website"
+    },
+    "ecommerce": {
+        "keywords": ["shop", "store", "ecommerce", "e-commerce", "sell", "buy", "product"],
+        "sections": ["hero", "products", "categories", "about", "cart", "contact"],
+        "theme": "clean",
+        "label": "🛒 Detected: E-commerce website"
+    },
+}
+
+LANDING_PAGE_PROFILE = {
+    "sections": ["hero", "about", "features", "contact"],
+    "theme": "modern"
+}
+
+# Color scheme -> keywords. Order breaks score ties.
+COLOR_KEYWORDS = {
+    "blue": ["blue", "ocean", "professional", "corporate", "tech"],
+    "green": ["green", "nature", "eco", "organic", "health"],
+    "purple": ["purple", "creative", "artistic", "luxury", "premium"],
+    "orange": ["orange", "energy", "food", "warm", "friendly"],
+    "red": ["red", "bold", "passion", "restaurant", "emergency"],
+    "pink": ["pink", "beauty", "fashion", "feminine", "cosmetic"],
+    "dark": ["dark", "modern", "minimal", "sleek", "tech"],
+}
+
+
+class RankedLabel:
+    __slots__ = ("label", "score", "confidence")
+
+    def __init__(self, label: str, score: float, confidence: float):
+        self.label = label
+        self.score = score
+        self.confidence = confidence
+
+    def to_dict(self) -> Dict:
+        return {"label": self.label, "score": self.score, "confidence": round(self.confidence, 3)}
+
+
+class ClassificationResult:
+    """Ranked site types and color schemes for one prompt"""
+
+    __slots__ = ("site_types", "colors", "matches")
+
+    def __init__(self, site_types: List[RankedLabel], colors: List[RankedLabel], matches: List[str]):
+        self.site_types = site_types
+        self.colors = colors
+        self.matches = matches
+
+    @property
+    def site_type(self) -> str:
+        return self.site_types[0].label if self.site_types else DEFAULT_SITE_TYPE
+
+    @property
+    def color_scheme(self) -> str:
+        if self.colors:
+            return self.colors[0].label
+        return SITE_TYPE_PROFILES.get(self.site_type, {}).get("color_scheme", DEFAULT_COLOR_SCHEME)
+
+    @property
+    def confidence(self) -> float:
+        return self.site_types[0].confidence if self.site_types else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "site_type": self.site_type,
+            "color_scheme": self.color_scheme,
+            "confidence": round(self.confidence, 3),
+            "site_types": [r.to_dict() for r in self.site_types],
+            "colors": [r.to_dict() for r in self.colors],
+            "matches": self.matches
+        }
+
+
+class PromptClassifier:
+    """Classifies prompts with one compiled word-boundary regex over all keywords"""
+
+    def __init__(self, site_profiles: Dict[str, Dict], color_keywords: Dict[str, List[str]]):
+        # keyword -> [(category, label)]
+        self._targets: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        self._order: Dict[Tuple[str, str], int] = {}
+
+        for index, (site_type, profile) in enumerate(site_profiles.items()):
+            self._order[("site", site_type)] = index
+            for keyword in profile["keywords"]:
+                self._targets[keyword.lower()].append(("site", site_type))
+        for index, (color, keywords) in enumerate(color_keywords.items()):
+            self._order[("color", color)] = index
+            for keyword in keywords:
+                self._targets[keyword.lower()].append(("color", color))
+
+        # Longest keywords first so alternation prefers the most specific match
+        alternation = "|".join(
+            re.escape(keyword) for keyword in sorted(self._targets, key=len, reverse=True)
+        )
+        self._pattern = re.compile(rf"\b({alternation})(?:e?s)?\b", re.IGNORECASE)
+
+    def classify(self, prompt: str) -> ClassificationResult:
+        """Score every site type and color in a single pass over the prompt"""
+        scores = {"site": defaultdict(float), "color": defaultdict(float)}
+        matches = []
+
+        for match in self._pattern.finditer(prompt or ""):
+            keyword = match.group(1).lower()
+            matches.append(keyword)
+            for category, label in self._targets[keyword]:
+                scores[category][label] += 1.0
+
+        return ClassificationResult(
+            self._rank("site", scores["site"]),
+            self._rank("color", scores["color"]),
+            matches
+        )
+
+    def classify_many(self, prompts: Iterable[str]) -> List[ClassificationResult]:
+        """Classify a batch of prompts"""
+        return [self.classify(prompt) for prompt in prompts]
+
+    def _rank(self, category: str, scores: Dict[str, float]) -> List[RankedLabel]:
+        total = sum(scores.values())
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self._order[(category, item[0])]))
+        return [RankedLabel(label, score, score / total) for label, score in ranked]
+
+
+def build_site_structure(result: ClassificationResult) -> Dict:
+    """Translate a classification into the site structure used by WebsiteGenerator"""
+    profile: Optional[Dict] = SITE_TYPE_PROFILES.get(result.site_type)
+    if profile is None:
+        profile = LANDING_PAGE_PROFILE
+    return {
+        "site_type": result.site_type,
+        "theme": profile["theme"],
+        "sections": list(profile["sections"]),
+        "color_scheme": result.color_scheme,
+        "has_navigation": True,
+        "is_responsive": True,
+        "has_animations": True,
+        "modern_design": True
+    }
+
+
+# Global classifier instance, compiled at import
+prompt_classifier = PromptClassifier(SITE_TYPE_PROFILES, COLOR_KEYWORDS)
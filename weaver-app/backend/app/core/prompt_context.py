@@ -0,0 +1,236 @@
+"""
+Prompt Context Builder
+Slices the architectural blueprint down to what a single generation call needs
+"""
+
+import re
+import json
+import logging
+from typing import Dict, List, Optional
+
+from app.templates.system_prompts import ROLE_SYSTEM_PROMPTS
+
+logger = logging.getLogger(__name__)
+
+# File path prefix -> (stack side, file role). First match wins.
+FILE_ROLE_PATTERNS = [
+    ("backend", "models/", "model"),
+    ("backend", "controllers/", "controller"),
+    ("backend", "routes/", "route"),
+    ("backend", "middleware/", "middleware"),
+    ("backend", "config/", "config"),
+    ("backend", "utils/", "util"),
+    ("backend", "server.", "server"),
+    ("frontend", "src/components/", "component"),
+    ("frontend", "src/pages/", "page"),
+    ("frontend", "src/store/", "store"),
+    ("frontend", "src/api/", "api_client"),
+    ("frontend", "src/hooks/", "hook"),
+    ("frontend", "src/utils/", "util"),
+    ("frontend", "src/App.", "app"),
+    ("frontend", "src/main.", "entry"),
+]
+
+# Roles whose output is consumed by each role, per stack side
+ROLE_DEPENDENTS = {
+    "model": ["controller", "route"],
+    "controller": ["route"],
+    "middleware": ["route", "server"],
+    "route": ["server", "api_client"],
+    "config": ["server"],
+    "api_client": ["store", "hook", "component", "page"],
+    "store": ["hook", "component", "page", "app"],
+    "hook": ["component", "page"],
+    "component": ["page", "app"],
+    "page": ["app"],
+    "app": ["entry"],
+}
+
+_CRUD_CONTRACTS = [
+    ("GET", "", "list"),
+    ("POST", "", "create"),
+    ("GET", "/:id", "read"),
+    ("PUT", "/:id", "update"),
+    ("DELETE", "/:id", "delete"),
+]
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def load_token_encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+_ENCODER = load_token_encoder()
+
+
+def count_tokens(text: str) -> int:
+    """Count prompt tokens, using tiktoken when it is installed"""
+    if _ENCODER is not None:
+        # Special-token text in a prompt is counted as plain text instead of raising
+        return len(_ENCODER.encode(text, disallowed_special=()))
+    # Words and punctuation are a close stand-in for BPE tokens on code
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def compact_json(data) -> str:
+    """Serialize data without indentation or redundant whitespace"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def classify_file(side: str, file_path: str) -> str:
+    """Return the role of a blueprint file path"""
+    for pattern_side, prefix, role in FILE_ROLE_PATTERNS:
+        if side == pattern_side and file_path.startswith(prefix):
+            return role
+    return "other"
+
+
+class PromptContext:
+    """A single generation call: system prompt, user prompt and token usage"""
+
+    def __init__(self, role: str, file_path: Optional[str], system_prompt: str, prompt: str):
+        self.role = role
+        self.file_path = file_path
+        self.system_prompt = system_prompt
+        self.prompt = prompt
+        self.system_tokens = count_tokens(system_prompt)
+        self.prompt_tokens = count_tokens(prompt)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.system_tokens + self.prompt_tokens
+
+    def to_dict(self) -> Dict:
+        return {
+            "role": self.role,
+            "file_path": self.file_path,
+            "system_tokens": self.system_tokens,
+            "prompt_tokens": self.prompt_tokens,
+            "total_tokens": self.total_tokens
+        }
+
+
+class PromptContextBuilder:
+    """Builds per-file and quality prompts from the relevant blueprint slice"""
+
+    def __init__(self, blueprint: Optional[Dict], user_prompt: str = ""):
+        self.blueprint = blueprint or {}
+        self.user_prompt = user_prompt
+        self.entities: List[str] = list(self.blueprint.get("core_entities") or [])
+        self.files: Dict[str, Dict[str, str]] = {
+            "backend": dict(self.blueprint.get("backend") or {}),
+            "frontend": dict(self.blueprint.get("frontend") or {})
+        }
+
+    def files_for(self, side: str, prefix: str = "") -> List[str]:
+        """List blueprint file paths on one side of the stack"""
+        return [path for path in self.files.get(side, {}) if path.startswith(prefix)]
+
+    def entity_for(self, file_path: str) -> Optional[str]:
+        """Find the core entity a file belongs to, if any"""
+        name = re.split(r"[/.]", file_path.rsplit("/", 1)[-1])[0].lower()
+        for entity in sorted(self.entities, key=len, reverse=True):
+            if entity.lower() in name:
+                return entity
+        return None
+
+    def entity_fields(self, entity: Optional[str]):
+        """Field definitions of an entity, when the blueprint has data models"""
+        models = self.blueprint.get("data_models")
+        if entity is None or not isinstance(models, dict):
+            return None
+        return models.get(entity)
+
+    def api_contracts(self, entity: Optional[str]) -> List[Dict[str, str]]:
+        """API contracts touching an entity (all contracts when entity is None)"""
+        endpoints = self.blueprint.get("api_endpoints")
+        if isinstance(endpoints, list) and endpoints:
+            if entity is None:
+                return endpoints
+            entity_lower = entity.lower()
+            return [
+                endpoint for endpoint in endpoints
+                if isinstance(endpoint, dict) and (
+                    str(endpoint.get("entity", "")).lower() == entity_lower
+                    or entity_lower in str(endpoint.get("path", "")).lower()
+                )
+            ]
+
+        # Blueprints without explicit endpoints get the conventional REST set
+        entities = [entity] if entity else self.entities
+        contracts = []
+        for name in entities:
+            base = f"/api/{name.lower()}s"
+            contracts.extend(
+                {"method": method, "path": f"{base}{suffix}", "action": action}
+                for method, suffix, action in _CRUD_CONTRACTS
+            )
+        return contracts
+
+    def file_slice(self, side: str, file_path: str) -> Dict:
+        """The part of the blueprint that matters for one target file"""
+        role = classify_file(side, file_path)
+        entity = self.entity_for(file_path)
+        dependent_roles = set(ROLE_DEPENDENTS.get(role, []))
+
+        dependents = []
+        for dep_side, paths in self.files.items():
+            for path in paths:
+                if path == file_path or classify_file(dep_side, path) not in dependent_roles:
+                    continue
+                dep_entity = self.entity_for(path)
+                if entity is None or dep_entity in (None, entity):
+                    dependents.append(f"{dep_side}/{path}")
+
+        fragment = {
+            "project": self.blueprint.get("project_name"),
+            "file": f"{side}/{file_path}",
+            "role": role,
+            "purpose": self.files.get(side, {}).get(file_path, ""),
+            "entity": entity,
+            "dependents": sorted(dependents)
+        }
+
+        fields = self.entity_fields(entity)
+        if fields:
+            fragment["fields"] = fields
+
+        # Only files that sit on the HTTP boundary need the API contracts
+        if role in ("controller", "route", "server", "api_client", "store", "hook", "page"):
+            fragment["api"] = self.api_contracts(entity)
+        if role in ("app", "entry", "server"):
+            fragment["siblings"] = sorted(self.files.get(side, {}))
+        return fragment
+
+    def build_file_context(self, side: str, file_path: str) -> PromptContext:
+        """Build the prompt for generating a single project file"""
+        fragment = self.file_slice(side, file_path)
+        prompt = (
+            f"Request: {self.user_prompt}\n"
+            f"Context: {compact_json(fragment)}\n"
+            f"Write the complete content of {side}/{file_path}."
+        )
+        return PromptContext(side, file_path, ROLE_SYSTEM_PROMPTS[side], prompt)
+
+    def build_quality_context(self, checklist: str) -> PromptContext:
+        """Build the quality review prompt from a structural summary of the blueprint"""
+        summary = {
+            "project": self.blueprint.get("project_name"),
+            "entities": self.entities,
+            "backend": sorted(self.files["backend"]),
+            "frontend": sorted(self.files["frontend"])
+        }
+        # Derived REST contracts add nothing a reviewer can't infer from the file list
+        if self.blueprint.get("api_endpoints"):
+            summary["api"] = self.api_contracts(None)
+        prompt = f"Analyze this MERN application: {compact_json(summary)}\n{checklist}"
+        return PromptContext("quality", None, ROLE_SYSTEM_PROMPTS["quality"], prompt)
+
+    def build_architect_context(self, request: str) -> PromptContext:
+        """Build the blueprint design prompt"""
+        return PromptContext("architect", None, ROLE_SYSTEM_PROMPTS["architect"], request)
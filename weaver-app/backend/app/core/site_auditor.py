@@ -0,0 +1,371 @@
+"""
+Site Auditor
+Offline page-weight and render-path audit of a generated static site
+"""
+
+import os
+import re
+import posixpath
+import logging
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_TYPES = {
+    ".html": "html",
+    ".css": "css",
+    ".js": "js",
+    ".mjs": "js",
+    ".png": "image",
+    ".jpg": "image",
+    ".jpeg": "image",
+    ".gif": "image",
+    ".svg": "image",
+    ".webp": "image",
+    ".avif": "image",
+    ".ico": "image",
+    ".woff": "font",
+    ".woff2": "font",
+    ".ttf": "font",
+    ".otf": "font",
+}
+
+# Unused selectors listed per stylesheet; the count is always exact
+MAX_REPORTED_SELECTORS = 50
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_URL = re.compile(r"url\(\s*[\"']?([^\"')]+)[\"']?\s*\)")
+_CSS_IMPORT = re.compile(r"@import\s+[\"']([^\"']+)[\"']")
+_SELECTOR_PSEUDO = re.compile(r"::?[\w-]+(\([^)]*\))?")
+_SELECTOR_ATTRIBUTE = re.compile(r"\[[^\]]*\]")
+_SELECTOR_CLASS = re.compile(r"\.([\w-]+)")
+_SELECTOR_ID = re.compile(r"#([\w-]+)")
+_SELECTOR_TAG = re.compile(r"(?:^|[\s>+~])([a-zA-Z][\w-]*)")
+_JS_STRING = re.compile(r"([\"'`])((?:\\.|(?!\1).)*)\1")
+_JS_TOKEN = re.compile(r"[\w-]+")
+# At-rules whose blocks hold ordinary style rules
+_GROUPING_AT_RULES = ("@media", "@supports", "@layer", "@container", "@document")
+_ALWAYS_PRESENT_TAGS = {"html", "body", "head"}
+
+
+class BudgetExceededError(Exception):
+    """Raised when a generated site exceeds the configured page budget"""
+
+    def __init__(self, violations: List[str]):
+        self.violations = violations
+        super().__init__("Page budget exceeded: " + "; ".join(violations))
+
+
+def resource_type(path: str) -> str:
+    return RESOURCE_TYPES.get(posixpath.splitext(path.split("?", 1)[0])[1].lower(), "other")
+
+
+def _is_remote(url: str) -> bool:
+    return url.startswith(("http://", "https://", "//"))
+
+
+def _resolve(base: str, url: str) -> str:
+    path = url.split("?", 1)[0].split("#", 1)[0]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base), path))
+
+
+class _PageScanner(HTMLParser):
+    """Collects referenced resources, inline assets and the markup vocabulary of one page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.in_head = False
+        self.stylesheets: List[Dict] = []
+        self.scripts: List[Dict] = []
+        self.media: List[str] = []
+        self.inline: List[Dict] = []
+        self.inline_scripts: List[str] = []
+        self.tags: Set[str] = set()
+        self.classes: Set[str] = set()
+        self.ids: Set[str] = set()
+        self._inline_kind: Optional[str] = None
+        self._inline_data: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attributes = {name: (value or "") for name, value in attrs}
+        self.tags.add(tag)
+        self.classes.update(attributes.get("class", "").split())
+        if attributes.get("id"):
+            self.ids.add(attributes["id"])
+
+        for name in ("src", "href"):
+            value = attributes.get(name, "")
+            if value.startswith("data:"):
+                self.inline.append({"kind": "data-uri", "tag": tag, "bytes": len(value)})
+
+        if tag == "head":
+            self.in_head = True
+        elif tag == "link" and "stylesheet" in attributes.get("rel", "").lower().split():
+            self.stylesheets.append({
+                "href": attributes.get("href", ""),
+                "media": attributes.get("media", "all"),
+                "async": "onload" in attributes,
+                "in_head": self.in_head
+            })
+        elif tag == "link" and attributes.get("rel", "").lower() in ("icon", "shortcut icon", "preload"):
+            self.media.append(attributes.get("href", ""))
+        elif tag == "script":
+            if attributes.get("src"):
+                self.scripts.append({
+                    "src": attributes["src"],
+                    "async": "async" in attributes or "defer" in attributes
+                    or attributes.get("type") == "module",
+                    "in_head": self.in_head
+                })
+            else:
+                self._inline_kind = "script"
+                self._inline_data = []
+        elif tag == "style":
+            self._inline_kind = "style"
+            self._inline_data = []
+        elif tag in ("img", "source", "video", "audio"):
+            for name in ("src", "srcset", "poster"):
+                for candidate in attributes.get(name, "").split(","):
+                    url = candidate.strip().split(" ")[0]
+                    if url and not url.startswith("data:"):
+                        self.media.append(url)
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.in_head = False
+        elif tag in ("script", "style") and self._inline_kind == tag:
+            content = "".join(self._inline_data)
+            self.inline.append({"kind": tag, "tag": tag, "bytes": len(content.encode("utf-8"))})
+            if tag == "script":
+                self.inline_scripts.append(content)
+            self._inline_kind = None
+
+    def handle_data(self, data):
+        if self._inline_kind:
+            self._inline_data.append(data)
+
+
+def iter_css_selectors(css: str):
+    """Yield the selectors of every style rule, descending into grouping at-rules"""
+    css = _CSS_COMMENT.sub("", css)
+    depth_skip = 0
+    prelude_start = 0
+    # Depths at which the enclosing block holds style rules
+    rule_depths = [0]
+    depth = 0
+
+    for index, char in enumerate(css):
+        if char == "{":
+            prelude = css[prelude_start:index].strip()
+            depth += 1
+            if depth_skip:
+                depth_skip += 1
+            elif prelude.startswith("@"):
+                if prelude.lower().startswith(_GROUPING_AT_RULES):
+                    rule_depths.append(depth)
+                else:
+                    depth_skip = 1
+            elif depth - 1 == rule_depths[-1]:
+                for selector in prelude.split(","):
+                    if selector.strip():
+                        yield selector.strip()
+                depth_skip = 1
+            prelude_start = index + 1
+        elif char == "}":
+            if depth_skip:
+                depth_skip -= 1
+            elif rule_depths[-1] == depth and depth:
+                rule_depths.pop()
+            depth -= 1
+            prelude_start = index + 1
+        elif char == ";" and not depth_skip:
+            prelude_start = index + 1
+
+
+def selector_matches(selector: str, tags: Set[str], classes: Set[str], ids: Set[str]) -> bool:
+    """Conservative check that every simple selector in selector occurs in the page"""
+    simple = _SELECTOR_ATTRIBUTE.sub("", _SELECTOR_PSEUDO.sub("", selector))
+    if not all(name in classes for name in _SELECTOR_CLASS.findall(simple)):
+        return False
+    if not all(name in ids for name in _SELECTOR_ID.findall(simple)):
+        return False
+    without_names = _SELECTOR_ID.sub("", _SELECTOR_CLASS.sub("", simple))
+    return all(
+        tag.lower() in tags or tag.lower() in _ALWAYS_PRESENT_TAGS
+        for tag in _SELECTOR_TAG.findall(without_names)
+    )
+
+
+def _script_tokens(sources: List[str]) -> Set[str]:
+    """Class and id names a script could add at runtime (words inside string literals)"""
+    tokens = set()
+    for source in sources:
+        for match in _JS_STRING.finditer(source):
+            tokens.update(_JS_TOKEN.findall(match.group(2)))
+    return tokens
+
+
+class SiteAuditor:
+    """Measures page weight and the render path of a site held in memory"""
+
+    def __init__(
+        self,
+        max_transfer_bytes: Optional[int] = None,
+        max_requests: Optional[int] = None,
+        max_render_blocking: Optional[int] = None,
+        max_inline_bytes: Optional[int] = None
+    ):
+        self.max_transfer_bytes = max_transfer_bytes if max_transfer_bytes is not None else settings.AUDIT_MAX_TRANSFER_BYTES
+        self.max_requests = max_requests if max_requests is not None else settings.AUDIT_MAX_REQUESTS
+        self.max_render_blocking = max_render_blocking if max_render_blocking is not None else settings.AUDIT_MAX_RENDER_BLOCKING
+        self.max_inline_bytes = max_inline_bytes if max_inline_bytes is not None else settings.AUDIT_MAX_INLINE_BYTES
+
+    def audit(self, files: Dict[str, bytes], entry: str = "index.html") -> Dict:
+        """Audit the page at entry against the files it references"""
+        scanner = _PageScanner()
+        scanner.feed(files[entry].decode("utf-8", errors="replace"))
+        scanner.close()
+
+        resources: Dict[str, Dict] = {}
+        external: List[str] = []
+        missing: List[str] = []
+
+        def add(url: str, base: str = entry) -> Optional[str]:
+            if not url or url.startswith(("data:", "#", "mailto:", "tel:")):
+                return None
+            if _is_remote(url):
+                if url not in external:
+                    external.append(url)
+                return None
+            path = _resolve(base, url)
+            if path in resources:
+                return path
+            if path not in files:
+                if path not in missing:
+                    missing.append(path)
+                return None
+            raw = len(files[path])
+            encoded = files.get(path + ".gz")
+            resources[path] = {
+                "type": resource_type(path),
+                "bytes": raw,
+                "transfer_bytes": len(encoded) if encoded is not None else raw
+            }
+            return path
+
+        add(entry)
+        stylesheets = [add(sheet["href"]) for sheet in scanner.stylesheets]
+        scripts = [add(script["src"]) for script in scanner.scripts]
+        for url in scanner.media:
+            add(url)
+
+        # Stylesheets pull in fonts, images and further stylesheets
+        css_sources = {}
+        for path in [p for p in stylesheets if p]:
+            css = files[path].decode("utf-8", errors="replace")
+            css_sources[path] = css
+            for url in _CSS_URL.findall(css) + _CSS_IMPORT.findall(css):
+                add(url.strip(), base=path)
+
+        by_type: Dict[str, Dict] = {}
+        for info in resources.values():
+            bucket = by_type.setdefault(info["type"], {"count": 0, "bytes": 0, "transfer_bytes": 0})
+            bucket["count"] += 1
+            bucket["bytes"] += info["bytes"]
+            bucket["transfer_bytes"] += info["transfer_bytes"]
+
+        render_blocking = [
+            sheet["href"] for sheet in scanner.stylesheets
+            if sheet["in_head"] and not sheet["async"] and sheet["media"].lower() in ("all", "screen", "")
+        ] + [
+            script["src"] for script in scanner.scripts
+            if script["in_head"] and not script["async"]
+        ]
+
+        script_sources = scanner.inline_scripts + [
+            files[path].decode("utf-8", errors="replace") for path in scripts if path
+        ]
+        runtime_tokens = _script_tokens(script_sources)
+        classes = scanner.classes | runtime_tokens
+        ids = scanner.ids | runtime_tokens
+        unused_css = {}
+        for path, css in css_sources.items():
+            unused = [
+                selector for selector in iter_css_selectors(css)
+                if not selector_matches(selector, scanner.tags, classes, ids)
+            ]
+            if unused:
+                unused_css[path] = {"count": len(unused), "selectors": unused[:MAX_REPORTED_SELECTORS]}
+
+        oversized_inline = [item for item in scanner.inline if item["bytes"] > self.max_inline_bytes]
+
+        totals = {
+            "requests": len(resources) + len(external),
+            "bytes": sum(info["bytes"] for info in resources.values()),
+            "transfer_bytes": sum(info["transfer_bytes"] for info in resources.values()),
+            "external_requests": len(external),
+            "render_blocking": len(render_blocking),
+            "unused_selectors": sum(item["count"] for item in unused_css.values())
+        }
+
+        budget = {
+            "max_transfer_bytes": self.max_transfer_bytes,
+            "max_requests": self.max_requests,
+            "max_render_blocking": self.max_render_blocking,
+            "max_inline_bytes": self.max_inline_bytes
+        }
+        violations = self._check_budget(totals, oversized_inline)
+
+        return {
+            "entry": entry,
+            "totals": totals,
+            "by_type": by_type,
+            "resources": resources,
+            "external": external,
+            "missing": missing,
+            "render_blocking": render_blocking,
+            "unused_css": unused_css,
+            "oversized_inline": oversized_inline,
+            "budget": budget,
+            "violations": violations,
+            "passed": not violations
+        }
+
+    def _check_budget(self, totals: Dict, oversized_inline: List[Dict]) -> List[str]:
+        violations = []
+        if totals["transfer_bytes"] > self.max_transfer_bytes:
+            violations.append(f"transfer size {totals['transfer_bytes']} B exceeds {self.max_transfer_bytes} B")
+        if totals["requests"] > self.max_requests:
+            violations.append(f"{totals['requests']} requests exceed {self.max_requests}")
+        if totals["render_blocking"] > self.max_render_blocking:
+            violations.append(
+                f"{totals['render_blocking']} render-blocking resources exceed {self.max_render_blocking}"
+            )
+        for item in oversized_inline:
+            violations.append(f"inline {item['kind']} of {item['bytes']} B exceeds {self.max_inline_bytes} B")
+        return violations
+
+
+def load_site_files(project_dir: str) -> Dict[str, bytes]:
+    """Read a generated site from disk, keyed by relative path (blocking)"""
+    files: Dict[str, bytes] = {}
+    for root, dirs, names in os.walk(project_dir):
+        dirs[:] = [d for d in dirs if d != "node_modules" and not d.startswith(".")]
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, project_dir).replace(os.sep, "/")] = f.read()
+    return files
+
+
+def audit_site(files: Dict[str, bytes], entry: str = "index.html") -> Dict:
+    """Audit a site held in memory with the configured budget"""
+    return SiteAuditor().audit(files, entry)
+
+
+def audit_project_dir(project_dir: str, entry: str = "index.html") -> Dict:
+    """Audit a site already written to disk (blocking; run it in an executor)"""
+    return audit_site(load_site_files(project_dir), entry)
@@ -0,0 +1,149 @@
+"""
+Site Bundler
+Builds a single self-contained HTML file from a generated static site
+"""
+
+import os
+import re
+import posixpath
+import logging
+from typing import Dict, Optional, Set
+
+from app.core.asset_fingerprint import strip_fingerprint
+from app.core.config import settings
+from app.templates.icon_sprites import ICON_CSS, ICON_PATHS, ICON_SVG_TEMPLATE
+
+logger = logging.getLogger(__name__)
+
+_STYLESHEET_LINK = re.compile(r"<link\b[^>]*\brel=[\"']stylesheet[\"'][^>]*>\s*", re.IGNORECASE)
+_SCRIPT_TAG = re.compile(r"<script\b[^>]*\bsrc=[\"']([^\"']+)[\"'][^>]*>\s*</script>\s*", re.IGNORECASE)
+_HREF = re.compile(r"\bhref=[\"']([^\"']+)[\"']", re.IGNORECASE)
+_MEDIA = re.compile(r"\bmedia=[\"']([^\"']+)[\"']", re.IGNORECASE)
+_ICON = re.compile(r"<i class=[\"']fa[bsr]? fa-([\w-]+)[\"']\s*></i>")
+_ICON_FONT_HOSTS = ("font-awesome", "fontawesome")
+
+# Flips deferred <style> blocks on once the page has painted
+_DEFERRED_CSS_LOADER = (
+    "<script>requestAnimationFrame(function(){document.querySelectorAll('style[data-deferred]')"
+    ".forEach(function(s){s.media='all'})})</script>"
+)
+
+
+def _is_remote(url: str) -> bool:
+    return url.startswith(("http://", "https://", "//"))
+
+
+def _resolve(base: str, url: str) -> str:
+    path = url.split("?", 1)[0].split("#", 1)[0]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base), path))
+
+
+def _escape_inline_script(source: str) -> str:
+    return re.sub(r"</(script)", r"<\\/\1", source, flags=re.IGNORECASE)
+
+
+def _escape_inline_style(source: str) -> str:
+    return re.sub(r"</(style)", r"<\\/\1", source, flags=re.IGNORECASE)
+
+
+class SiteBundler:
+    """Inlines local CSS and JS, defers non-critical CSS and subsets icons to inline SVG"""
+
+    def __init__(self, deferred_stylesheets: Optional[Set[str]] = None):
+        self.deferred_stylesheets = deferred_stylesheets or set(settings.BUNDLE_DEFERRED_STYLESHEETS)
+
+    def bundle(self, files: Dict[str, bytes], entry: str = "index.html") -> bytes:
+        """Produce one HTML document that paints without further requests"""
+        html = files[entry].decode("utf-8")
+        critical = []
+        deferred = []
+        remote_links = []
+
+        def take_stylesheet(match: re.Match) -> str:
+            tag = match.group(0)
+            href_match = _HREF.search(tag)
+            if not href_match:
+                return tag
+            href = href_match.group(1)
+
+            if _is_remote(href):
+                remote_links.append((href, tag.strip()))
+                return ""
+
+            content = files.get(_resolve(entry, href))
+            if content is None:
+                logger.warning(f"Bundle: stylesheet {href} not found, keeping link")
+                return tag
+
+            css = _escape_inline_style(content.decode("utf-8"))
+            media_match = _MEDIA.search(tag)
+            if media_match and media_match.group(1) != "all":
+                css = f"@media {media_match.group(1)}{{{css}}}"
+            if posixpath.basename(strip_fingerprint(href)) in self.deferred_stylesheets:
+                deferred.append(css)
+            else:
+                critical.append(css)
+            return ""
+
+        def take_script(match: re.Match) -> str:
+            src = match.group(1)
+            if _is_remote(src):
+                return match.group(0)
+            content = files.get(_resolve(entry, src))
+            if content is None:
+                logger.warning(f"Bundle: script {src} not found, keeping tag")
+                return match.group(0)
+            return f"<script>{_escape_inline_script(content.decode('utf-8'))}</script>\n"
+
+        html = _STYLESHEET_LINK.sub(take_stylesheet, html)
+        html = _SCRIPT_TAG.sub(take_script, html)
+
+        # Replace icon font glyphs with the inline SVGs actually used
+        unknown_icons = set()
+
+        def take_icon(match: re.Match) -> str:
+            name = match.group(1)
+            body = ICON_PATHS.get(name)
+            if body is None:
+                unknown_icons.add(name)
+                return match.group(0)
+            return ICON_SVG_TEMPLATE.format(name=name, body=body)
+
+        html, icon_count = _ICON.subn(take_icon, html)
+        if icon_count > len(unknown_icons):
+            critical.append(ICON_CSS)
+
+        head = []
+        if critical:
+            head.append(f"<style>{''.join(critical)}</style>")
+        for href, tag in remote_links:
+            if any(host in href for host in _ICON_FONT_HOSTS) and not unknown_icons:
+                continue
+            # Remaining CDN stylesheets load without blocking first paint
+            head.append(f'<link rel="stylesheet" href="{href}" media="print" onload="this.media=\'all\'">')
+        html = html.replace("</head>", "\n".join(head) + "\n</head>", 1)
+
+        if deferred:
+            tail = f"<style media=\"not all\" data-deferred>{''.join(deferred)}</style>{_DEFERRED_CSS_LOADER}"
+            html = html.replace("</body>", tail + "\n</body>", 1)
+
+        return html.encode("utf-8")
+
+
+def bundle_site(files: Dict[str, bytes], entry: str = "index.html") -> bytes:
+    """Bundle a site held in memory into a single HTML document"""
+    return SiteBundler().bundle(files, entry)
+
+
+def bundle_project_dir(project_dir: str, entry: str = "index.html") -> bytes:
+    """Bundle a site already written to disk (blocking; run it in an executor)"""
+    files: Dict[str, bytes] = {}
+    for root, dirs, names in os.walk(project_dir):
+        dirs[:] = [d for d in dirs if d != "node_modules" and not d.startswith(".")]
+        for name in names:
+            if name.endswith((".html", ".css", ".js")):
+                path = os.path.join(root, name)
+                relative_path = os.path.relpath(path, project_dir).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    files[relative_path] = f.read()
+    return bundle_site(files, entry)
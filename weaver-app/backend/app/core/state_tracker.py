@@ -3,46 +3,22 @@ Generation State Tracker
 Monitors and validates the generation process
 """
 
+import time
 import logging
 from typing import Dict, Optional
-from datetime import datetime
-from enum import Enum
 
-logger = logging.getLogger(__name__)
+from app.core.config import settings
+from app.core.task_store import GenerationStatus, task_store
 
-class GenerationStatus(Enum):
-    INITIALIZED = "initialized"
-    PLANNING = "planning"
-    GENERATING_BACKEND = "generating_backend"
-    GENERATING_FRONTEND = "generating_frontend"
-    ANALYZING = "analyzing"
-    REFINING = "refining"
-    COMPLETED = "completed"
-    FAILED = "failed"
+logger = logging.getLogger(__name__)
 
 class GenerationStateTracker:
     def __init__(self):
-        self.states: Dict[str, Dict] = {}
+        self.store = task_store
     
     def initialize_generation(self, task_id: str, prompt: str) -> None:
         """Initialize a new generation task"""
-        self.states[task_id] = {
-            "task_id": task_id,
-            "prompt": prompt,
-            "status": GenerationStatus.INITIALIZED.value,
-            "start_time": datetime.now(),
-            "last_update": datetime.now(),
-            "progress": 0,
-            "files_generated": 0,
-            "total_files": 0,
-            "current_phase": "initialization",
-            "error": None,
-            "quality_metrics": {
-                "blueprint_quality": None,
-                "code_quality": None,
-                "interconnection_score": None
-            }
-        }
+        self.store.create(task_id, prompt)
         logger.info(f"Generation initialized: {task_id}")
     
     def update_status(
@@ -55,22 +31,20 @@ class GenerationStateTracker:
         error: Optional[str] = None
     ) -> None:
         """Update the status of a generation task"""
-        if task_id not in self.states:
+        fields = {
+            "progress": progress,
+            "current_phase": current_phase,
+            "files_generated": files_generated,
+            "error": error
+        }
+        record = self.store.update(
+            task_id,
+            status.value,
+            **{field: value for field, value in fields.items() if value is not None}
+        )
+        if record is None:
             logger.error(f"Task {task_id} not found")
             return
-        
-        state = self.states[task_id]
-        state["status"] = status.value
-        state["last_update"] = datetime.now()
-        
-        if progress is not None:
-            state["progress"] = progress
-        if current_phase is not None:
-            state["current_phase"] = current_phase
-        if files_generated is not None:
-            state["files_generated"] = files_generated
-        if error is not None:
-            state["error"] = error
             
         logger.info(f"Generation status updated: {task_id} -> {status.value}")
     
@@ -82,31 +56,29 @@ class GenerationStateTracker:
         interconnection_score: Optional[float] = None
     ) -> None:
         """Update quality metrics for a generation task"""
-        if task_id not in self.states:
+        metrics = {
+            "blueprint_quality": blueprint_quality,
+            "code_quality": code_quality,
+            "interconnection_score": interconnection_score
+        }
+        if self.store.update(task_id, **{name: value for name, value in metrics.items() if value is not None}) is None:
             logger.error(f"Task {task_id} not found")
-            return
-            
-        metrics = self.states[task_id]["quality_metrics"]
-        if blueprint_quality is not None:
-            metrics["blueprint_quality"] = blueprint_quality
-        if code_quality is not None:
-            metrics["code_quality"] = code_quality
-        if interconnection_score is not None:
-            metrics["interconnection_score"] = interconnection_score
     
     def get_state(self, task_id: str) -> Optional[Dict]:
         """Get the current state of a generation task"""
-        return self.states.get(task_id)
+        record = self.store.get(task_id)
+        return record.to_dict() if record else None
     
     def validate_generation(self, task_id: str) -> bool:
         """Validate the generation process"""
-        if task_id not in self.states:
+        record = self.store.get(task_id)
+        if record is None:
             return False
-            
-        state = self.states[task_id]
+        
+        now = time.time()
         
         # Check for timeouts
-        if (datetime.now() - state["start_time"]).total_seconds() > 600:  # 10 minutes
+        if now - (record.started_at or record.created_at) > settings.TASK_TIMEOUT_SECONDS:
             self.update_status(
                 task_id,
                 GenerationStatus.FAILED,
@@ -115,7 +87,7 @@ class GenerationStateTracker:
             return False
         
         # Check for progress stalls
-        if (datetime.now() - state["last_update"]).total_seconds() > 120:  # 2 minutes
+        if now - record.updated_at > settings.TASK_STALL_SECONDS:
             self.update_status(
                 task_id,
                 GenerationStatus.FAILED,
@@ -124,9 +96,9 @@ class GenerationStateTracker:
             return False
         
         # Validate quality metrics if complete
-        if state["status"] == GenerationStatus.COMPLETED.value:
-            metrics = state["quality_metrics"]
-            if not all(metrics.values()):
+        if record.status == GenerationStatus.COMPLETED.value:
+            metrics = (record.blueprint_quality, record.code_quality, record.interconnection_score)
+            if not all(metrics):
                 self.update_status(
                     task_id,
                     GenerationStatus.FAILED,
@@ -135,9 +107,7 @@ class GenerationStateTracker:
                 return False
             
             # Check if quality scores are acceptable
-            if (metrics["blueprint_quality"] < 0.7 or
-                metrics["code_quality"] < 0.7 or
-                metrics["interconnection_score"] < 0.7):
+            if min(metrics) < 0.7:
                 self.update_status(
                     task_id,
                     GenerationStatus.FAILED,
@@ -149,12 +119,10 @@ class GenerationStateTracker:
     
     def cleanup_old_states(self, hours: int = 24) -> None:
         """Clean up old generation states"""
-        current_time = datetime.now()
-        self.states = {
-            task_id: state
-            for task_id, state in self.states.items()
-            if (current_time - state["start_time"]).total_seconds() < hours * 3600
-        }
+        cutoff = time.time() - hours * 3600
+        for record in self.store.records():
+            if record.created_at < cutoff:
+                self.store.remove(record.task_id)
 
 # Global state tracker instance
 state_tracker = GenerationStateTracker()
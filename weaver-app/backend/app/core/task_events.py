@@ -0,0 +1,168 @@
+"""
+Task Events
+Typed task channel events and the per-connection encoder that batches them into frames
+"""
+
+import json
+import time
+import logging
+from enum import Enum
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# WebSocket subprotocols a client may offer; without one, frames are JSON text
+JSON_SUBPROTOCOL = "weaver.json.v1"
+MSGPACK_SUBPROTOCOL = "weaver.msgpack.v1"
+
+
+def load_msgpack():
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        return None
+
+
+class EventType(Enum):
+    PROGRESS = "ai_progress"
+    LOG = "ai_log"
+    FILE_WRITTEN = "file_written"
+    COMPLETION = "completion"
+    ERROR = "error"
+
+
+class Stage(Enum):
+    INITIALIZING = "initializing"
+    ANALYSIS = "analysis"
+    PLANNING = "planning"
+    GENERATING = "generating"
+    STYLING = "styling"
+    SCRIPTING = "scripting"
+    QUALITY_REVIEW = "quality_review"
+    REFINEMENT = "refinement"
+    ASSEMBLY = "assembly"
+    COMPLETE = "complete"
+    FAILED = "failed"
+
+
+class TaskEvent:
+    """One task channel event; unset fields are left out of the wire form"""
+
+    __slots__ = ("type", "message", "level", "stage", "component", "progress", "score", "data", "ts", "seq")
+
+    def __init__(
+        self,
+        event_type: EventType,
+        message: Optional[str] = None,
+        level: Optional[str] = None,
+        stage: Optional[Stage] = None,
+        component: Optional[str] = None,
+        progress: Optional[int] = None,
+        score: Optional[float] = None,
+        data: Optional[Dict] = None,
+        ts: Optional[int] = None
+    ):
+        self.type = event_type
+        self.message = message
+        self.level = level
+        self.stage = stage
+        self.component = component
+        self.progress = progress
+        self.score = score
+        self.data = data
+        # Milliseconds since the epoch: shorter than an ISO string and trivial to compare
+        self.ts = int(time.time() * 1000) if ts is None else ts
+        # Assigned when the event is recorded in its task's replay log
+        self.seq: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        payload = {"type": self.type.value, "ts": self.ts}
+        if self.seq is not None:
+            payload["seq"] = self.seq
+        if self.stage is not None:
+            payload["stage"] = self.stage.value
+        for field in ("message", "level", "component", "progress", "score"):
+            value = getattr(self, field)
+            if value is not None:
+                payload[field] = value
+        if self.data:
+            payload.update(self.data)
+        return payload
+
+    @classmethod
+    def from_dict(cls, payload: Dict) -> "TaskEvent":
+        """Rebuild an event from its wire form, keeping its seq"""
+        payload = dict(payload)
+        stage = payload.pop("stage", None)
+        seq = payload.pop("seq", None)
+        event = cls(
+            EventType(payload.pop("type")),
+            message=payload.pop("message", None),
+            level=payload.pop("level", None),
+            stage=Stage(stage) if stage is not None else None,
+            component=payload.pop("component", None),
+            progress=payload.pop("progress", None),
+            score=payload.pop("score", None),
+            ts=payload.pop("ts", None),
+            data=payload or None
+        )
+        event.seq = seq
+        return event
+
+
+def format_sse(event: TaskEvent) -> str:
+    """One Server-Sent Events message; the seq doubles as the Last-Event-ID"""
+    data = json.dumps(event.to_dict(), ensure_ascii=False, separators=(",", ":"))
+    if event.seq is None:
+        return f"data: {data}\n\n"
+    return f"id: {event.seq}\ndata: {data}\n\n"
+
+
+def negotiate_subprotocol(offered: List[str]) -> Optional[str]:
+    """Pick the subprotocol to accept from those the client offered"""
+    if MSGPACK_SUBPROTOCOL in offered and load_msgpack() is not None:
+        return MSGPACK_SUBPROTOCOL
+    if JSON_SUBPROTOCOL in offered:
+        return JSON_SUBPROTOCOL
+    return None
+
+
+def coalesce(events: List[TaskEvent]) -> List[TaskEvent]:
+    """Keep only the latest progress event of a batch: progress is state, not history"""
+    last_progress = None
+    for index, event in enumerate(events):
+        if event.type is EventType.PROGRESS:
+            last_progress = index
+    return [
+        event for index, event in enumerate(events)
+        if event.type is not EventType.PROGRESS or index == last_progress
+    ]
+
+
+class EventEncoder:
+    """
+    Turns the events queued for one connection into a single frame.
+
+    A lone event goes out as itself; several go out as
+    {"type": "batch", "events": [...]}. MessagePack connections get binary
+    frames, everyone else compact JSON text.
+    """
+
+    def __init__(self, subprotocol: Optional[str] = None):
+        self.subprotocol = subprotocol
+        self._msgpack = load_msgpack() if subprotocol == MSGPACK_SUBPROTOCOL else None
+
+    @property
+    def binary(self) -> bool:
+        return self._msgpack is not None
+
+    def encode(self, events: List[TaskEvent]) -> Union[str, bytes]:
+        events = coalesce(events)
+        if len(events) == 1:
+            payload = events[0].to_dict()
+        else:
+            payload = {"type": "batch", "events": [event.to_dict() for event in events]}
+        if self._msgpack is not None:
+            return self._msgpack.packb(payload, use_bin_type=True)
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
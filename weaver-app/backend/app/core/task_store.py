@@ -0,0 +1,284 @@
+"""
+Task Store
+One compact record per generation task, indexed by status, with TTL eviction of finished tasks
+"""
+
+import sys
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Iterator, List, Optional, Set
+
+from app.core.config import settings
+from app.core.event_bus import KIND_STATE, event_bus
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationStatus(Enum):
+    INITIALIZED = "initialized"
+    PLANNING = "planning"
+    GENERATING_BACKEND = "generating_backend"
+    GENERATING_FRONTEND = "generating_frontend"
+    ANALYZING = "analyzing"
+    REFINING = "refining"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+TERMINAL_STATUSES = frozenset((GenerationStatus.COMPLETED.value, GenerationStatus.FAILED.value))
+
+
+class TaskRecord:
+    """
+    State of one task; timestamps are epoch seconds, the prompt is kept as a short preview.
+
+    `local` is True on the worker running the task and False on records
+    mirrored from other workers; it is not part of the packed form.
+    `batch_id` is set on the items of a batch; `started_at` is when the
+    task left the initialized (queued) state.
+    """
+
+    __slots__ = (
+        "task_id", "prompt", "prompt_length", "status", "progress", "current_phase", "current_step",
+        "files_generated", "total_files", "error", "created_at", "updated_at", "started_at", "finished_at",
+        "blueprint_quality", "code_quality", "interconnection_score", "batch_id", "local"
+    )
+    _PACKED = __slots__[:-1]
+
+    def __init__(self, task_id: str, prompt: Optional[str] = None, batch_id: Optional[str] = None):
+        now = time.time()
+        self.task_id = task_id
+        self.prompt = prompt[:settings.TASK_PROMPT_PREVIEW_CHARS] if prompt else None
+        self.prompt_length = len(prompt) if prompt else 0
+        self.status = GenerationStatus.INITIALIZED.value
+        self.progress = 0
+        self.current_phase = "initialization"
+        self.current_step: Optional[str] = None
+        self.files_generated = 0
+        self.total_files = 0
+        self.error: Optional[str] = None
+        self.created_at = now
+        self.updated_at = now
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.blueprint_quality: Optional[float] = None
+        self.code_quality: Optional[float] = None
+        self.interconnection_score: Optional[float] = None
+        self.batch_id = batch_id
+        self.local = True
+
+    @property
+    def terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    @property
+    def queued(self) -> bool:
+        return self.status == GenerationStatus.INITIALIZED.value
+
+    @property
+    def live(self) -> bool:
+        """Whether this worker is running the task as a single, watched generation"""
+        return self.local and self.batch_id is None and not self.terminal
+
+    def to_dict(self) -> Dict:
+        """API view, in the shape the status endpoints have always returned"""
+        return {
+            "task_id": self.task_id,
+            "prompt": self.prompt,
+            "status": self.status,
+            "start_time": datetime.fromtimestamp(self.created_at).isoformat(),
+            "last_update": datetime.fromtimestamp(self.updated_at).isoformat(),
+            "progress": self.progress,
+            "files_generated": self.files_generated,
+            "total_files": self.total_files,
+            "current_phase": self.current_phase,
+            "current_step": self.current_step,
+            "error": self.error,
+            "batch_id": self.batch_id,
+            "quality_metrics": {
+                "blueprint_quality": self.blueprint_quality,
+                "code_quality": self.code_quality,
+                "interconnection_score": self.interconnection_score
+            }
+        }
+
+    def pack(self) -> Dict:
+        return {field: getattr(self, field) for field in self._PACKED}
+
+    @classmethod
+    def unpack(cls, packed: Dict) -> "TaskRecord":
+        """A mirror of a record packed by another worker"""
+        record = cls.__new__(cls)
+        for field in cls._PACKED:
+            setattr(record, field, packed.get(field))
+        record.local = False
+        return record
+
+
+class TaskStore:
+    """
+    Every task's state, shared by the state tracker, the connection manager
+    and the health monitor.
+
+    Records are indexed by status, so counts are O(1). Finished tasks are
+    kept for `ttl` seconds after they finish; evict_expired() drops the rest,
+    oldest first, without scanning running tasks.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = settings.TASK_STATE_TTL if ttl is None else ttl
+        self._records: Dict[str, TaskRecord] = {}
+        self._by_status: Dict[str, Set[str]] = {}
+        # Finished task ids in finishing order, for eviction
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self.totals = {"created": 0, "completed": 0, "failed": 0, "evicted": 0}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._records
+
+    def get(self, task_id: str) -> Optional[TaskRecord]:
+        return self._records.get(task_id)
+
+    def create(self, task_id: str, prompt: Optional[str] = None, batch_id: Optional[str] = None) -> TaskRecord:
+        """Start tracking a task; an existing record is returned as is"""
+        record = self._records.get(task_id)
+        if record is not None:
+            return record
+        record = TaskRecord(task_id, prompt, batch_id)
+        self._insert(record)
+        self.totals["created"] += 1
+        self._publish(record)
+        return record
+
+    def update(self, task_id: str, status: Optional[str] = None, **fields) -> Optional[TaskRecord]:
+        """Set status and/or record fields of a tracked task; unknown tasks are ignored"""
+        record = self._records.get(task_id)
+        if record is None:
+            return None
+        for field, value in fields.items():
+            setattr(record, field, value)
+        if status is not None and status != record.status:
+            self._set_status(record, status)
+        record.updated_at = time.time()
+        self._publish(record)
+        return record
+
+    def remove(self, task_id: str) -> None:
+        record = self._records.pop(task_id, None)
+        if record is None:
+            return
+        self._unindex(record)
+        self._finished.pop(task_id, None)
+
+    def apply_remote(self, task_id: str, packed: Dict) -> None:
+        """Event bus handler: mirror a task tracked by another worker"""
+        current = self._records.get(task_id)
+        if current is not None and current.local:
+            # This worker runs the task; its own record wins
+            return
+        self.remove(task_id)
+        self._insert(TaskRecord.unpack(packed))
+
+    def records(self, status: Optional[str] = None) -> Iterator[TaskRecord]:
+        if status is None:
+            return iter(list(self._records.values()))
+        return iter([self._records[task_id] for task_id in self._by_status.get(status, ())])
+
+    def active(self, local_only: bool = False) -> List[TaskRecord]:
+        """Running tasks; local_only leaves out those mirrored from other workers"""
+        return [
+            record
+            for status, task_ids in self._by_status.items() if status not in TERMINAL_STATUSES
+            for record in (self._records[task_id] for task_id in task_ids)
+            if record.local or not local_only
+        ]
+
+    def count(self, status: Optional[str] = None) -> int:
+        if status is None:
+            return len(self._records)
+        return len(self._by_status.get(status, ()))
+
+    def active_count(self) -> int:
+        return len(self._records) - len(self._finished)
+
+    def counts(self) -> Dict:
+        return {
+            "tracked": len(self._records),
+            "active": self.active_count(),
+            "by_status": {status: len(task_ids) for status, task_ids in self._by_status.items() if task_ids},
+            **self.totals
+        }
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        cutoff = (time.time() if now is None else now) - self.ttl
+        evicted = 0
+        while self._finished:
+            task_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > cutoff:
+                break
+            self.remove(task_id)
+            evicted += 1
+        if evicted:
+            self.totals["evicted"] += evicted
+            logger.info(f"Evicted state of {evicted} finished tasks")
+        return evicted
+
+    def memory_report(self) -> Dict:
+        """Approximate bytes held by records and indexes (walks every record)"""
+        record_bytes = sum(
+            sys.getsizeof(record) + sum(sys.getsizeof(getattr(record, field)) for field in TaskRecord.__slots__)
+            for record in self._records.values()
+        )
+        index_bytes = (
+            sys.getsizeof(self._records)
+            + sys.getsizeof(self._finished)
+            + sum(sys.getsizeof(task_ids) for task_ids in self._by_status.values())
+        )
+        return {
+            "records": len(self._records),
+            "record_bytes": record_bytes,
+            "index_bytes": index_bytes,
+            "bytes_per_record": record_bytes // len(self._records) if self._records else 0
+        }
+
+    def _insert(self, record: TaskRecord) -> None:
+        self._records[record.task_id] = record
+        self._by_status.setdefault(record.status, set()).add(record.task_id)
+        if record.terminal:
+            self._finished[record.task_id] = record.finished_at or record.updated_at
+
+    def _unindex(self, record: TaskRecord) -> None:
+        task_ids = self._by_status.get(record.status)
+        if task_ids is not None:
+            task_ids.discard(record.task_id)
+
+    def _set_status(self, record: TaskRecord, status: str) -> None:
+        self._unindex(record)
+        record.status = status
+        self._by_status.setdefault(status, set()).add(record.task_id)
+        if record.started_at is None and not record.queued:
+            record.started_at = time.time()
+        if status in TERMINAL_STATUSES:
+            record.finished_at = time.time()
+            self._finished.pop(record.task_id, None)
+            self._finished[record.task_id] = record.finished_at
+            self.totals[status] += 1
+        else:
+            record.finished_at = None
+            self._finished.pop(record.task_id, None)
+
+    def _publish(self, record: TaskRecord) -> None:
+        # Any worker can then answer status requests for the task; only the owner speaks for it
+        if not record.local:
+            return
+        event_bus.publish(KIND_STATE, record.task_id, record.pack())
+
+
+# Global task store instance
+task_store = TaskStore()
@@ -0,0 +1,127 @@
+"""
+Template Engine
+Precompiled static site templates with bounded fragment memoization
+"""
+
+import re
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Union
+
+from app.core.config import settings
+from app.templates import static_site_templates
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+Fragment = Union[str, bytes]
+
+
+class CompiledTemplate:
+    """A template split once into encoded literal chunks and placeholder names"""
+
+    __slots__ = ("name", "parts", "placeholders")
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        parts: List[Union[bytes, str]] = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            if match.start() > position:
+                parts.append(source[position:match.start()].encode("utf-8"))
+            parts.append(match.group(1))
+            position = match.end()
+        if position < len(source):
+            parts.append(source[position:].encode("utf-8"))
+
+        # Literal chunks are bytes, placeholders are str
+        self.parts: Tuple[Union[bytes, str], ...] = tuple(parts)
+        self.placeholders = frozenset(p for p in parts if isinstance(p, str))
+
+    def render_bytes(self, context: Dict[str, Fragment]) -> bytes:
+        chunks = []
+        for part in self.parts:
+            if isinstance(part, bytes):
+                chunks.append(part)
+            else:
+                value = context[part]
+                chunks.append(value if isinstance(value, bytes) else str(value).encode("utf-8"))
+        return b"".join(chunks)
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class TemplateEngine:
+    """Registry of compiled templates with an LRU of rendered fragments"""
+
+    def __init__(self, max_fragments: int = 512):
+        self.max_fragments = max_fragments
+        self.templates: Dict[str, CompiledTemplate] = {}
+        self._fragments: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, name: str, source: str) -> CompiledTemplate:
+        """Compile a template and make it available by name"""
+        template = CompiledTemplate(name, source)
+        self.templates[name] = template
+        return template
+
+    def render_bytes(self, name: str, **context: Fragment) -> bytes:
+        """Render a template to bytes, reusing a memoized fragment when possible"""
+        template = self.templates[name]
+        key = (name, _freeze({k: v for k, v in context.items() if k in template.placeholders}))
+
+        with self._lock:
+            cached = self._fragments.get(key)
+            if cached is not None:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        rendered = template.render_bytes(context)
+
+        with self._lock:
+            self.misses += 1
+            self._fragments[key] = rendered
+            if len(self._fragments) > self.max_fragments:
+                self._fragments.popitem(last=False)
+        return rendered
+
+    def render(self, name: str, **context: Fragment) -> str:
+        """Render a template to text"""
+        return self.render_bytes(name, **context).decode("utf-8")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "templates": len(self.templates),
+            "fragments": len(self._fragments),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+def _build_default_engine() -> TemplateEngine:
+    engine = TemplateEngine(max_fragments=settings.TEMPLATE_FRAGMENT_CACHE_SIZE)
+    for attr in dir(static_site_templates):
+        if attr.endswith("_TEMPLATE"):
+            engine.register(attr[:-len("_TEMPLATE")].lower(), getattr(static_site_templates, attr))
+    logger.debug(f"Compiled {len(engine.templates)} static site templates")
+    return engine
+
+
+# Global template engine instance, compiled at import
+template_engine = _build_default_engine()
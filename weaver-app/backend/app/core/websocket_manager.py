@@ -1,102 +1,404 @@
-from typing import Dict, List, Optional
-import json
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Set, Tuple, Union
+from collections import deque
+import time
+import asyncio
 import logging
-from datetime import datetime
 from fastapi import WebSocket
 
+from app.core.config import settings
+from app.core.task_events import (
+    EventEncoder, EventType, Stage, TaskEvent, coalesce, format_sse, negotiate_subprotocol
+)
+from app.core.event_log import EventLogStore
+from app.core.event_bus import KIND_EVENT, event_bus
+from app.core.task_store import GenerationStatus, task_store
+
 logger = logging.getLogger(__name__)
 
+DROP_OLDEST = "drop_oldest"
+NEVER_DROP = "never_drop"
+
+_TERMINAL_EVENTS = (EventType.COMPLETION, EventType.ERROR)
+
+class Subscriber:
+    """One WebSocket watching a task, with its own bounded send queue, encoder and sender task"""
+
+    # Whether the client answers the server's "ping" frames
+    pings = True
+
+    def __init__(self, websocket: WebSocket, task_id: str, max_queue: int, encoder: EventEncoder, batch_window: float):
+        self.websocket = websocket
+        self.task_id = task_id
+        self.max_queue = max_queue
+        self.encoder = encoder
+        self.batch_window = batch_window
+        # Items are TaskEvents, or raw text frames such as "pong"
+        self.queue: Deque[Tuple[Union[TaskEvent, str], bool]] = deque()
+        self.dropped = 0
+        self.frames_sent = 0
+        self.closed = False
+        # Heartbeat state: any inbound message counts as a pong
+        self.awaiting_pong = False
+        self.missed_pongs = 0
+        self.last_seen = time.monotonic()
+        self._ready = asyncio.Event()
+        self._sender: Optional[asyncio.Task] = None
+
+    def start(self, on_failure: Callable[["Subscriber"], None]):
+        self._sender = asyncio.create_task(self._run(on_failure))
+
+    def push(self, item: Union[TaskEvent, str], droppable: bool = True):
+        """Queue an event or raw frame; never waits on the network"""
+        if self.closed:
+            return
+        if len(self.queue) >= self.max_queue and not self._evict_oldest():
+            if droppable:
+                self.dropped += 1
+                return
+            # Only undroppable items are queued: let the queue grow past its bound
+        self.queue.append((item, droppable))
+        self._ready.set()
+
+    def mark_alive(self):
+        self.awaiting_pong = False
+        self.missed_pongs = 0
+        self.last_seen = time.monotonic()
+
+    def stop(self):
+        self.closed = True
+        if self._sender is not None:
+            self._sender.cancel()
+
+    async def close(self):
+        self.stop()
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+    def _evict_oldest(self) -> bool:
+        for index, (_, droppable) in enumerate(self.queue):
+            if droppable:
+                del self.queue[index]
+                self.dropped += 1
+                return True
+        return False
+
+    async def _run(self, on_failure: Callable[["Subscriber"], None]):
+        try:
+            while True:
+                while not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                if self.batch_window > 0:
+                    # Let a burst of logs and progress updates accumulate into one frame
+                    await asyncio.sleep(self.batch_window)
+                await self._send_queued()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Dropping WebSocket subscriber for {self.task_id}: {e}")
+            self.closed = True
+            on_failure(self)
+
+    async def _send_queued(self):
+        events: List[TaskEvent] = []
+        while self.queue:
+            item, _ = self.queue.popleft()
+            if isinstance(item, TaskEvent):
+                events.append(item)
+                continue
+            await self._send_events(events)
+            events = []
+            await self.websocket.send_text(item)
+            self.frames_sent += 1
+        await self._send_events(events)
+
+    async def _send_events(self, events: List[TaskEvent]):
+        if not events:
+            return
+        frame = self.encoder.encode(events)
+        if isinstance(frame, bytes):
+            await self.websocket.send_bytes(frame)
+        else:
+            await self.websocket.send_text(frame)
+        self.frames_sent += 1
+
+class StreamSubscriber(Subscriber):
+    """
+    A Server-Sent Events response watching a task. It shares the WebSocket
+    subscriber's queue and drop policy; the response body drains it
+    instead of a sender task.
+    """
+
+    pings = False
+
+    def __init__(self, task_id: str, max_queue: int, batch_window: float):
+        super().__init__(None, task_id, max_queue, None, batch_window)
+
+    def stop(self):
+        self.closed = True
+        self._ready.set()
+
+    async def close(self):
+        self.stop()
+
+    async def stream(
+        self,
+        keepalive: float,
+        retry_ms: int,
+        finished: Optional[Callable[[], bool]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield SSE chunks until the task finishes or the subscriber is closed.
+
+        A terminal event ends the stream. So does finished() returning True
+        after a quiet keep-alive interval, for tasks whose terminal event was
+        never sent or is no longer in the replay log.
+        """
+        yield f"retry: {retry_ms}\n\n"
+        while not self.closed:
+            if not self.queue:
+                self._ready.clear()
+                try:
+                    await asyncio.wait_for(self._ready.wait(), keepalive)
+                except asyncio.TimeoutError:
+                    if finished is not None and finished():
+                        return
+                    # Comments keep proxies from timing out the idle connection
+                    yield ": keep-alive\n\n"
+                continue
+            if self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+            events = [item for item, _ in self.queue if isinstance(item, TaskEvent)]
+            self.queue.clear()
+            events = coalesce(events)
+            if not events:
+                continue
+            yield "".join(format_sse(event) for event in events)
+            self.frames_sent += 1
+            if any(event.type in _TERMINAL_EVENTS for event in events):
+                return
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.task_status: Dict[str, dict] = {}
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        policies: Optional[Dict[str, str]] = None,
+        default_policy: Optional[str] = None,
+        batch_window_ms: Optional[int] = None
+    ):
+        self.active_connections: Dict[str, Set[Subscriber]] = {}
+        self.max_queue = max_queue or settings.WS_SEND_QUEUE_SIZE
+        self.policies = settings.WS_QUEUE_POLICIES if policies is None else policies
+        self.default_policy = default_policy or settings.WS_DEFAULT_QUEUE_POLICY
+        self.batch_window = (settings.WS_BATCH_WINDOW_MS if batch_window_ms is None else batch_window_ms) / 1000
+        self.event_logs = EventLogStore(
+            settings.WS_REPLAY_BUFFER_SIZE, settings.WS_REPLAY_RETENTION, settings.WS_REPLAY_IDLE_TTL
+        )
+        self.heartbeat_interval = settings.WS_HEARTBEAT_INTERVAL
+        self.max_missed_pongs = settings.WS_MAX_MISSED_PONGS
+        self.terminal_grace = settings.WS_TERMINAL_GRACE
+        self.counters = {
+            "heartbeats_sent": 0,
+            "reaped_unresponsive": 0,
+            "reaped_terminal": 0,
+            "send_failures": 0,
+            "dropped_messages": 0
+        }
 
     async def initialize_task(self, task_id: str):
         """Initialize task status tracking"""
-        self.task_status[task_id] = {
-            "status": "initialized",
-            "progress": 0,
-            "current_step": "initialization",
-            "created_at": datetime.now().isoformat(),
-            "last_update": datetime.now().isoformat(),
-            "error": None
-        }
+        task_store.create(task_id)
         logger.info(f"Task initialized: {task_id}")
 
     async def cleanup_task(self, task_id: str):
         """Clean up task resources"""
-        if task_id in self.active_connections:
-            await self.active_connections[task_id].close()
-            self.disconnect(task_id)
-        if task_id in self.task_status:
-            del self.task_status[task_id]
+        for subscriber in self.active_connections.pop(task_id, set()):
+            await subscriber.close()
+        self.event_logs.drop(task_id)
+        task_store.remove(task_id)
         logger.info(f"Task cleaned up: {task_id}")
 
-    async def connect(self, websocket: WebSocket, task_id: str):
-        await websocket.accept()
-        self.active_connections[task_id] = websocket
-        logger.info(f"WebSocket connected for task: {task_id}")
+    async def connect(self, websocket: WebSocket, task_id: str, since: int = 0) -> Subscriber:
+        """Accept a subscriber and queue the recorded events after since ahead of live ones"""
+        subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=subprotocol)
+        subscriber = Subscriber(websocket, task_id, self.max_queue, EventEncoder(subprotocol), self.batch_window)
+        subscribers = self._subscribe(subscriber, since)
+        subscriber.start(self._on_send_failure)
+        logger.info(f"WebSocket connected for task: {task_id} ({len(subscribers)} subscribers)")
+        return subscriber
 
-    def disconnect(self, task_id: str):
-        if task_id in self.active_connections:
+    def open_stream(self, task_id: str, since: int = 0) -> StreamSubscriber:
+        """Subscribe a Server-Sent Events response; iterate its stream() to send"""
+        subscriber = StreamSubscriber(task_id, self.max_queue, self.batch_window)
+        subscribers = self._subscribe(subscriber, since)
+        logger.info(f"Event stream opened for task: {task_id} ({len(subscribers)} subscribers)")
+        return subscriber
+
+    def _subscribe(self, subscriber: Subscriber, since: int) -> Set[Subscriber]:
+        task_id = subscriber.task_id
+        subscriber.push(TaskEvent(EventType.LOG, message=f"Connected to task {task_id} status stream", level="info"))
+        
+        # No await between replaying and subscribing, so nothing is missed or sent twice
+        events, missed = self.event_logs.replay(task_id, since)
+        if missed:
+            subscriber.push(TaskEvent(
+                EventType.LOG,
+                message=f"{missed} earlier events are no longer available",
+                level="warning"
+            ))
+        for event in events:
+            subscriber.push(event, self.is_droppable(event))
+        subscribers = self.active_connections.setdefault(task_id, set())
+        subscribers.add(subscriber)
+        return subscribers
+
+    def disconnect(self, task_id: str, subscriber: Optional[Subscriber] = None):
+        """Remove one subscriber (or every subscriber of the task) and stop its sender"""
+        subscribers = self.active_connections.get(task_id)
+        if not subscribers:
+            return
+        removed = [subscriber] if subscriber is not None else list(subscribers)
+        for item in removed:
+            if item in subscribers:
+                subscribers.discard(item)
+                item.stop()
+                self.counters["dropped_messages"] += item.dropped
+                if item.dropped:
+                    logger.info(f"WebSocket subscriber for {task_id} dropped {item.dropped} messages")
+        if not subscribers:
             del self.active_connections[task_id]
-            logger.info(f"WebSocket disconnected for task: {task_id}")
+        logger.info(f"WebSocket disconnected for task: {task_id}")
+
+    def _on_send_failure(self, subscriber: Subscriber):
+        self.counters["send_failures"] += 1
+        self.disconnect(subscriber.task_id, subscriber)
 
-    async def send_message(self, task_id: str, message: dict):
-        if task_id in self.active_connections:
+    async def run_heartbeats(self):
+        """Background loop: ping subscribers every WS_HEARTBEAT_INTERVAL seconds and reap dead ones"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
             try:
-                await self.active_connections[task_id].send_text(json.dumps(message))
+                await self.heartbeat()
             except Exception as e:
-                logger.error(f"Error sending message to {task_id}: {e}")
-                await self.cleanup_task(task_id)
+                logger.error(f"WebSocket heartbeat failed: {e}")
+
+    async def heartbeat(self):
+        """
+        Ping every subscriber once. Subscribers that stayed silent through
+        WS_MAX_MISSED_PONGS pings, and all subscribers of tasks finished
+        more than WS_TERMINAL_GRACE seconds ago, are closed.
+        """
+        now = time.monotonic()
+        for task_id, subscribers in list(self.active_connections.items()):
+            finished_at = self.event_logs.finished_at(task_id)
+            terminal = finished_at is not None and now - finished_at > self.terminal_grace
+            for subscriber in list(subscribers):
+                if terminal:
+                    await self._reap(subscriber, "reaped_terminal")
+                    continue
+                if not subscriber.pings:
+                    continue
+                if subscriber.awaiting_pong:
+                    subscriber.missed_pongs += 1
+                    if subscriber.missed_pongs >= self.max_missed_pongs:
+                        await self._reap(subscriber, "reaped_unresponsive")
+                        continue
+                subscriber.awaiting_pong = True
+                subscriber.push("ping", droppable=False)
+                self.counters["heartbeats_sent"] += 1
+
+    async def _reap(self, subscriber: Subscriber, reason: str):
+        self.counters[reason] += 1
+        logger.info(f"Reaping WebSocket subscriber for {subscriber.task_id} ({reason})")
+        self.disconnect(subscriber.task_id, subscriber)
+        await subscriber.close()
+
+    def metrics(self) -> Dict:
+        subscribers = [item for items in self.active_connections.values() for item in items]
+        return {
+            "connections": len(subscribers),
+            "event_streams": sum(1 for item in subscribers if isinstance(item, StreamSubscriber)),
+            "tasks": len(self.active_connections),
+            "queued_frames": sum(len(item.queue) for item in subscribers),
+            **self.counters,
+            "dropped_messages": self.counters["dropped_messages"] + sum(item.dropped for item in subscribers),
+            "replay_logs": self.event_logs.stats()
+        }
+
+    def is_droppable(self, event: TaskEvent) -> bool:
+        return self.policies.get(event.type.value, self.default_policy) != NEVER_DROP
+
+    async def send_event(self, task_id: str, event: TaskEvent):
+        """Record event for replay and queue it for every subscriber without waiting on network I/O"""
+        self._deliver(task_id, event)
+        # Subscribers of this task may be connected to another worker
+        event_bus.publish(KIND_EVENT, task_id, event.to_dict())
+
+    def apply_remote_event(self, task_id: str, payload: Dict):
+        """Event bus handler: an event published by the worker running the task"""
+        self._deliver(task_id, TaskEvent.from_dict(payload))
+
+    def _deliver(self, task_id: str, event: TaskEvent):
+        self.event_logs.record(task_id, event)
+        if event.type in _TERMINAL_EVENTS:
+            self.event_logs.finish(task_id)
+        subscribers = self.active_connections.get(task_id)
+        if not subscribers:
+            return
+        droppable = self.is_droppable(event)
+        for subscriber in list(subscribers):
+            subscriber.push(event, droppable)
 
     async def send_completion(self, task_id: str, preview_url: str, download_url: str):
         """Send completion notification with preview and download URLs"""
-        await self.send_message(task_id, {
-            "type": "completion",
-            "preview_url": preview_url,
-            "download_url": download_url,
-            "timestamp": datetime.now().isoformat()
-        })
+        await self.send_event(task_id, TaskEvent(
+            EventType.COMPLETION,
+            stage=Stage.COMPLETE,
+            progress=100,
+            data={"preview_url": preview_url, "download_url": download_url}
+        ))
 
     async def send_error(self, task_id: str, error: str):
         """Send error message and update task status"""
-        if task_id in self.task_status:
-            self.task_status[task_id].update({
-                "status": "error",
-                "error": error,
-                "last_update": datetime.now().isoformat()
-            })
-        await self.send_message(task_id, {
-            "type": "error",
-            "message": error,
-            "timestamp": datetime.now().isoformat()
-        })
-
-    async def send_progress(self, task_id: str, message: str, progress: int):
+        task_store.update(task_id, GenerationStatus.FAILED.value, error=error)
+        await self.send_event(task_id, TaskEvent(EventType.ERROR, message=error, stage=Stage.FAILED))
+
+    async def send_progress(
+        self,
+        task_id: str,
+        message: str,
+        progress: int,
+        stage: Optional[Stage] = None,
+        component: Optional[str] = None
+    ):
         """Send AI generation progress updates"""
-        if task_id in self.task_status:
-            self.task_status[task_id].update({
-                "status": "in_progress",
-                "progress": progress,
-                "current_step": message,
-                "last_update": datetime.now().isoformat()
-            })
-        await self.send_message(task_id, {
-            "type": "ai_progress",
-            "message": message,
-            "progress": progress,
-            "timestamp": datetime.now().isoformat()
-        })
-
-    async def send_log(self, task_id: str, message: str, level: str = "info"):
+        task_store.update(task_id, progress=progress, current_step=message)
+        await self.send_event(task_id, TaskEvent(
+            EventType.PROGRESS, message=message, progress=progress, stage=stage, component=component
+        ))
+
+    async def send_log(
+        self,
+        task_id: str,
+        message: str,
+        level: str = "info",
+        stage: Optional[Stage] = None,
+        component: Optional[str] = None,
+        score: Optional[float] = None
+    ):
         """Send AI generation log messages"""
-        await self.send_message(task_id, {
-            "type": "ai_log",
-            "level": level,
-            "message": message,
-            "timestamp": datetime.now().isoformat()
-        })
+        await self.send_event(task_id, TaskEvent(
+            EventType.LOG, message=message, level=level, stage=stage, component=component, score=score
+        ))
+
+    async def send_file_written(self, task_id: str, path: str, file_hash: str, size: int):
+        """Announce a committed project file to live previews"""
+        await self.send_event(task_id, TaskEvent(
+            EventType.FILE_WRITTEN, data={"path": path, "hash": file_hash, "size": size}
+        ))
 
 # Global manager instance for use across the application
 manager = ConnectionManager()
\ No newline at end of file
@@ -1,18 +1,26 @@
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 import os
 import logging
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List
+from datetime import datetime
 from contextlib import asynccontextmanager
 import asyncio
 
-from app.routers import generate, preview, websocket
+from app.routers import generate, preview, websocket, audit
 from app.core.config import settings
 from app.core.ai_generator import DigitalArchitectGenerator
+from app.core.file_sink import file_sink
+from app.core.websocket_manager import manager
+from app.core.task_store import GenerationStatus, task_store
+from app.core.event_bus import KIND_EVENT, KIND_STATE, event_bus
+from app.core.component_cache import component_cache
+from app.core.batch_generator import batch_generator
+from app.core.archive import archive_cache
+from app.core.compression import CompressionMiddleware
+from app.core.live_preview import live_preview
+from app.core.asset_fingerprint import SiteStaticFiles
 
 # Configure logging with more detail
 logging.basicConfig(
@@ -25,15 +33,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global state tracking
-GENERATION_STATES: Dict[str, Dict] = {}
+# Task state lives in task_store; these are process-level facts only
 SYSTEM_METRICS = {
-    "total_generations": 0,
-    "successful_generations": 0,
-    "failed_generations": 0,
     "start_time": None,
-    "last_health_check": None,
-    "active_generations": 0
+    "last_health_check": None
 }
 
 async def monitor_generation_health():
@@ -41,26 +44,28 @@ async def monitor_generation_health():
     while True:
         try:
             current_time = datetime.now()
-            stale_threshold = current_time - timedelta(minutes=10)
+            stale_threshold = time.time() - settings.TASK_TIMEOUT_SECONDS
             
-            # Check for stale generations
-            for task_id, state in list(GENERATION_STATES.items()):
-                if state["start_time"] < stale_threshold and state["status"] not in ["completed", "failed"]:
-                    logger.warning(f"Stale generation detected: {task_id}")
-                    GENERATION_STATES[task_id]["status"] = "failed"
-                    GENERATION_STATES[task_id]["error"] = "Generation timeout"
-                    SYSTEM_METRICS["failed_generations"] += 1
+            # Check for stale generations (only running tasks this worker owns are scanned;
+            # mirrored ones are timed out by the worker running them)
+            for record in task_store.active(local_only=True):
+                if record.batch_id is not None and record.queued:
+                    # Waiting for a batch worker, not running yet
+                    continue
+                job = batch_generator.get_job(record.task_id)
+                if job is not None and not job.done:
+                    # A batch takes as long as its items, which are timed one by one
+                    continue
+                if (record.started_at or record.created_at) < stale_threshold:
+                    logger.warning(f"Stale generation detected: {record.task_id}")
+                    task_store.update(record.task_id, GenerationStatus.FAILED.value, error="Generation timeout")
             
-            # Update system metrics
             SYSTEM_METRICS["last_health_check"] = current_time
-            SYSTEM_METRICS["active_generations"] = len([
-                s for s in GENERATION_STATES.values()
-                if s["status"] not in ["completed", "failed"]
-            ])
             
-            # Cleanup old completed tasks
-            cleanup_threshold = current_time - timedelta(hours=24)
-            GENERATION_STATES.clear()
+            # Forget replay logs and state of tasks finished beyond their retention windows
+            manager.event_logs.evict_expired()
+            task_store.evict_expired()
+            await asyncio.get_running_loop().run_in_executor(None, archive_cache.prune)
             
         except Exception as e:
             logger.error(f"Error in health monitor: {e}")
@@ -77,17 +82,37 @@ async def lifespan(app: FastAPI):
     os.makedirs(settings.GENERATED_SITES_DIR, exist_ok=True)
     os.makedirs("logs", exist_ok=True)
     
+    # Drop component library entries built from older templates
+    await asyncio.get_running_loop().run_in_executor(None, component_cache.invalidate, None, True)
+    
     # Start background tasks
+    file_sink.start()
+    event_bus.subscribe(KIND_EVENT, manager.apply_remote_event)
+    event_bus.subscribe(KIND_STATE, task_store.apply_remote)
+    await event_bus.start()
+    if settings.LIVE_PREVIEW_ENABLED:
+        live_preview.attach(asyncio.get_running_loop())
     task = asyncio.create_task(monitor_generation_health())
+    heartbeat_task = asyncio.create_task(manager.run_heartbeats())
     
     yield
     
     # Cleanup on shutdown
-    task.cancel()
-    try:
-        await task
-    except asyncio.CancelledError:
-        pass
+    for background_task in (task, heartbeat_task):
+        background_task.cancel()
+        try:
+            await background_task
+        except asyncio.CancelledError:
+            pass
+    
+    batch_generator.shutdown()
+    archive_cache.shutdown()
+    
+    # Drain pending file writes before exiting
+    await file_sink.flush()
+    await asyncio.get_running_loop().run_in_executor(None, file_sink.stop)
+    live_preview.detach()
+    await event_bus.stop()
     
     logger.info("Shutting down Weaver Backend...")
 
@@ -136,6 +161,9 @@ async def error_handling_middleware(request: Request, call_next):
             content={"detail": "Internal server error"}
         )
 
+# Serve generated sites with negotiated gzip/brotli encoding
+app.add_middleware(CompressionMiddleware, prefixes=("/api/preview/", "/sites/"))
+
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -152,25 +180,27 @@ async def health_check():
         "status": "healthy",
         "uptime": str(datetime.now() - SYSTEM_METRICS["start_time"]),
         "metrics": {
-            "total_generations": SYSTEM_METRICS["total_generations"],
-            "successful_generations": SYSTEM_METRICS["successful_generations"],
-            "failed_generations": SYSTEM_METRICS["failed_generations"],
-            "active_generations": SYSTEM_METRICS["active_generations"]
+            "total_generations": task_store.totals["created"],
+            "successful_generations": task_store.totals["completed"],
+            "failed_generations": task_store.totals["failed"],
+            "active_generations": task_store.active_count()
         },
+        "tasks": task_store.counts(),
+        "websocket": manager.metrics(),
+        "event_bus": event_bus.health(),
         "last_health_check": SYSTEM_METRICS["last_health_check"].isoformat() if SYSTEM_METRICS["last_health_check"] else None
     }
 
-# Generation status endpoint
-@app.get("/api/status/{task_id}")
-async def get_generation_status(task_id: str):
-    if task_id not in GENERATION_STATES:
-        raise HTTPException(status_code=404, content={"detail": "Generation task not found"})
-    return GENERATION_STATES[task_id]
+@app.get("/health/tasks")
+async def task_memory_report():
+    """Memory held by task state (walks every record, unlike /health)"""
+    return task_store.memory_report()
 
 # Include routers
 app.include_router(generate.router, prefix="/api", tags=["generate"])
 app.include_router(preview.router, prefix="/api", tags=["preview"])
+app.include_router(audit.router, prefix="/api", tags=["audit"])
 app.include_router(websocket.router, prefix="/ws", tags=["websocket"])
 
-# Mount static files for serving generated sites
-app.mount("/sites", StaticFiles(directory=settings.GENERATED_SITES_DIR), name="sites")
\ No newline at end of file
+# Mount static files for serving generated sites (fingerprinted assets are immutable)
+app.mount("/sites", SiteStaticFiles(directory=settings.GENERATED_SITES_DIR), name="sites")
\ No newline at end of file
@@ -1,10 +1,26 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, constr
 from typing import Optional, List
 from datetime import datetime
 
+from app.core.config import settings
+
 class GenerateWebsiteRequest(BaseModel):
     prompt: str = Field(..., min_length=1, max_length=2000, description="The prompt describing the website to generate")
     
+class BatchGenerateRequest(BaseModel):
+    prompts: List[constr(strip_whitespace=True, min_length=1, max_length=2000)] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BATCH_MAX_PROMPTS,
+        description="Prompts of the static sites to generate"
+    )
+
+class BatchGenerateResponse(BaseModel):
+    batch_id: str = Field(..., description="Unique identifier for the batch")
+    task_ids: List[str] = Field(..., description="Task identifier per prompt, in request order")
+    results_url: str = Field(..., description="NDJSON feed of per-item results")
+    websocket_url: str = Field(..., description="WebSocket URL for batch progress")
+    
 class GenerateWebsiteResponse(BaseModel):
     task_id: str = Field(..., description="Unique identifier for the generation task")
     message: str = Field(..., description="Status message")
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException
+import os
+import json
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+from app.core.site_auditor import audit_project_dir
+from app.routers.preview import _project_path
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def _load_audit(project_dir: str, refresh: bool) -> Optional[Tuple[str, Dict]]:
+    """(source, audit) of a generated website, or None if there is none; runs in the executor"""
+    if not os.path.exists(os.path.join(project_dir, "index.html")):
+        return None
+    
+    # Use the audit recorded at build time unless asked to re-run it
+    manifest_path = os.path.join(project_dir, "project.json")
+    if not refresh and os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                audit = json.load(f).get("audit")
+            if audit:
+                return "manifest", audit
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read manifest {manifest_path}: {e}")
+    
+    return "live", audit_project_dir(project_dir)
+
+@router.get("/audit/{task_id}")
+async def audit_website(task_id: str, refresh: bool = False):
+    """Return the page-weight and render-path audit of a generated website"""
+    project_dir = _project_path(task_id)
+    
+    loop = asyncio.get_running_loop()
+    loaded = await loop.run_in_executor(None, _load_audit, project_dir, refresh)
+    if loaded is None:
+        raise HTTPException(status_code=404, detail="Generated website not found")
+    source, audit = loaded
+    return {"task_id": task_id, "source": source, **audit}
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request, Response
+from fastapi.responses import StreamingResponse
 import uuid
 import logging
 from typing import Dict
 
 from app.core.ai_generator import DigitalArchitectGenerator
+from app.core.archive import archive_cache
+from app.core.file_sink import file_sink
+from app.core.preview_cache import preview_cache
+from app.core.batch_generator import batch_generator
+from app.core.config import settings
 from app.core.state_tracker import state_tracker, GenerationStatus
+from app.core.task_store import task_store
 from app.core.websocket_manager import manager
+from app.models.request_models import BatchGenerateRequest, BatchGenerateResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -45,6 +53,84 @@ async def generate_website(request: Dict[str, str], background_tasks: Background
         )
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/generate/batch", response_model=BatchGenerateResponse)
+async def generate_batch(request: BatchGenerateRequest):
+    """
+    Render a batch of template-based static sites on the worker process pool
+    """
+    job = await batch_generator.submit(request.prompts)
+    return BatchGenerateResponse(
+        batch_id=job.batch_id,
+        task_ids=job.task_ids,
+        results_url=f"/api/generate/batch/{job.batch_id}/results",
+        websocket_url=f"/ws/status/{job.batch_id}"
+    )
+
+@router.get("/generate/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """
+    Get the progress summary of a batch
+    """
+    job = batch_generator.get_job(batch_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return job.summary()
+
+@router.get("/generate/batch/{batch_id}/results")
+async def stream_batch_results(batch_id: str):
+    """
+    Stream per-item batch results as NDJSON, ending with a summary line
+    """
+    job = batch_generator.get_job(batch_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return StreamingResponse(
+        batch_generator.stream_results(job),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/generate/{task_id}/events")
+async def stream_task_events(task_id: str, request: Request, since: int = 0):
+    """
+    Follow a task (or batch) as Server-Sent Events: the WebSocket channel's
+    events, one-way. Resumes after the Last-Event-ID header, or ?since=<seq>.
+    """
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    
+    known = (
+        task_id in task_store
+        or manager.event_logs.last_seq(task_id) > 0
+        or batch_generator.get_job(task_id) is not None
+    )
+    if not known:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    def finished() -> bool:
+        # The task record outlives the replay log, and is failed on timeout without an event
+        record = task_store.get(task_id)
+        return manager.event_logs.finished_at(task_id) is not None or (record is not None and record.terminal)
+    
+    # A finished task with nothing newer to replay: 204 stops EventSource reconnecting
+    if finished() and manager.event_logs.last_seq(task_id) <= since:
+        return Response(status_code=204)
+    
+    subscriber = manager.open_stream(task_id, since)
+    
+    async def body():
+        try:
+            async for chunk in subscriber.stream(settings.SSE_KEEPALIVE_INTERVAL, settings.SSE_RETRY_MS, finished):
+                yield chunk
+        finally:
+            manager.disconnect(task_id, subscriber)
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 async def handle_generation(task_id: str, prompt: str):
     """
     Handle the website generation process with monitoring
@@ -63,6 +149,10 @@ async def handle_generation(task_id: str, prompt: str):
         # Start generation
         await generator.generate_mern_application()
         
+        # Have the download ready before anyone asks for it; live previews
+        # also follow the last writes only while the task still runs
+        await file_sink.flush()
+        
         # Validate final state
         if not state_tracker.validate_generation(task_id):
             error_state = state_tracker.get_state(task_id)
@@ -77,6 +167,9 @@ async def handle_generation(task_id: str, prompt: str):
             current_phase="completed"
         )
         
+        preview_cache.invalidate(generator.project_dir)
+        archive_cache.schedule_build(task_id, generator.project_dir)
+        
     except Exception as e:
         logger.error(f"Generation failed for task {task_id}: {e}")
         state_tracker.update_status(
@@ -1,66 +1,194 @@
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 import os
+import asyncio
 import logging
+from typing import Optional, Tuple
 
-from app.core.website_generator import WebsiteGenerator
+from app.core.archive import archive_cache, get_profile, profiles
+from app.core.asset_fingerprint import immutable_cache_control, is_fingerprinted
+from app.core.http_cache import is_not_modified, ranged_file_response, validator_headers
+from app.core.site_bundler import bundle_project_dir
+from app.core.preview_cache import PreviewFile, preview_cache
+from app.core.live_preview import inject_live_client
+from app.core.task_store import task_store
 from app.core.config import settings
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def _project_path(task_id: str, file_path: str = "") -> str:
+    """Resolve a path inside a generated project, refusing anything outside it"""
+    sites_dir = os.path.realpath(settings.GENERATED_SITES_DIR)
+    project_dir = os.path.realpath(os.path.join(sites_dir, task_id))
+    full_path = os.path.realpath(os.path.join(project_dir, file_path))
+    
+    # Security check - ensure the file is within the project directory
+    if os.path.dirname(project_dir) != sites_dir or os.path.commonpath([project_dir, full_path]) != project_dir:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return full_path
+
+def _lookup_preview_file(full_path: str) -> Tuple[Optional[PreviewFile], bool]:
+    """The cached preview file and whether it is a fingerprinted asset (blocking)"""
+    entry = preview_cache.get(full_path)
+    return entry, entry is not None and is_fingerprinted(full_path)
+
+def _preview_cache_control(task_id: str, immutable: bool) -> str:
+    if immutable:
+        # A content-hashed name never changes content
+        return immutable_cache_control()
+    record = task_store.get(task_id)
+    if record and not record.terminal:
+        # Files still change while generating: always revalidate
+        return "no-cache"
+    return f"public, max-age={settings.PREVIEW_MAX_AGE}"
+
+async def _serve_preview_file(task_id: str, full_path: str, request: Request, not_found: str = "File not found"):
+    """Serve a preview file from the LRU with ETag/Last-Modified validators"""
+    loop = asyncio.get_running_loop()
+    entry, immutable = await loop.run_in_executor(None, _lookup_preview_file, full_path)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    
+    headers = validator_headers(entry.etag, entry.last_modified, _preview_cache_control(task_id, immutable))
+    if is_not_modified(request.headers, entry.etag, entry.last_modified):
+        return Response(status_code=304, headers=headers)
+    if entry.content is None:
+        return FileResponse(full_path, media_type=entry.media_type, headers=headers)
+    return Response(content=entry.content, media_type=entry.media_type, headers=headers)
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+async def _serve_live_page(task_id: str, page_path: str, not_found: str = "File not found"):
+    """Serve an HTML page with the live preview client injected"""
+    loop = asyncio.get_running_loop()
+    entry = await loop.run_in_executor(None, preview_cache.get, page_path)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    content = entry.content
+    if content is None:
+        content = await loop.run_in_executor(None, _read_file, page_path)
+    return HTMLResponse(content=inject_live_client(content, task_id), headers={"Cache-Control": "no-store"})
+
 @router.get("/preview/{task_id}/")
-async def preview_website_root(task_id: str):
-    """Serve the index.html of the generated website"""
-    project_dir = os.path.join(settings.GENERATED_SITES_DIR, task_id)
-    index_path = os.path.join(project_dir, "index.html")
+async def preview_website_root(task_id: str, request: Request, live: bool = False):
+    """Serve the index.html of the generated website (?live=1 follows generation as it writes files)"""
+    index_path = _project_path(task_id, "index.html")
+    if live and settings.LIVE_PREVIEW_ENABLED:
+        return await _serve_live_page(task_id, index_path, "Generated website not found")
+    return await _serve_preview_file(task_id, index_path, request, "Generated website not found")
+
+@router.get("/preview/{task_id}/bundle")
+async def preview_website_bundle(task_id: str, request: Request):
+    """Serve the single-file bundle of the generated website"""
+    project_dir = _project_path(task_id)
+    bundle_path = os.path.join(project_dir, settings.BUNDLE_FILENAME)
     
-    if not os.path.exists(index_path):
-        raise HTTPException(status_code=404, detail="Generated website not found")
+    if os.path.exists(bundle_path):
+        return await _serve_preview_file(task_id, bundle_path, request)
     
-    with open(index_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    if not os.path.exists(os.path.join(project_dir, "index.html")):
+        raise HTTPException(status_code=404, detail="Generated website not found")
     
-    return HTMLResponse(content=content)
+    # Sites generated without a bundle are bundled on request
+    loop = asyncio.get_running_loop()
+    content = await loop.run_in_executor(None, bundle_project_dir, project_dir)
+    return HTMLResponse(content=content, headers={"Cache-Control": "no-cache"})
 
 @router.get("/preview/{task_id}/{file_path:path}")
-async def preview_website_file(task_id: str, file_path: str):
-    """Serve static files from the generated website"""
-    project_dir = os.path.join(settings.GENERATED_SITES_DIR, task_id)
-    full_path = os.path.join(project_dir, file_path)
+async def preview_website_file(task_id: str, file_path: str, request: Request, live: bool = False):
+    """Serve static files from the generated website (?live=1 on an HTML page follows generation)"""
+    full_path = _project_path(task_id, file_path)
+    if live and settings.LIVE_PREVIEW_ENABLED and full_path.endswith(".html"):
+        return await _serve_live_page(task_id, full_path)
+    return await _serve_preview_file(task_id, full_path, request)
+
+def _is_plain_name(task_id: str) -> bool:
+    return bool(task_id) and task_id not in (".", "..") and not any(c in task_id for c in "/\\\0")
+
+def _resolve_archive(task_id: str, profile_name: Optional[str]):
+    # The task id also names cached archive files: only plain directory names under the sites dir
+    if not _is_plain_name(task_id):
+        raise HTTPException(status_code=404, detail="Generated website not found")
+    try:
+        project_dir = _project_path(task_id)
+    except HTTPException:
+        raise HTTPException(status_code=404, detail="Generated website not found")
     
-    # Security check - ensure the file is within the project directory
-    if not full_path.startswith(project_dir):
-        raise HTTPException(status_code=403, detail="Access denied")
+    if not os.path.isdir(project_dir):
+        raise HTTPException(status_code=404, detail="Generated website not found")
     
-    if not os.path.exists(full_path):
-        raise HTTPException(status_code=404, detail="File not found")
+    try:
+        profile = get_profile(profile_name)
+    except KeyError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown archive profile '{profile_name}'. Options: {', '.join(profiles)}"
+        )
+    return project_dir, profile
+
+def _archive_headers(manifest) -> dict:
+    return {
+        "X-Archive-Profile": manifest.profile.name,
+        "X-Archive-Files": str(manifest.file_count),
+        "X-Archive-Source-Bytes": str(manifest.total_bytes)
+    }
+
+@router.get("/download/{task_id}/info")
+async def download_info(task_id: str, profile: Optional[str] = None):
+    """Report what a download with the given profile will contain"""
+    project_dir, archive_profile = _resolve_archive(task_id, profile)
+    manifest = await archive_cache.inspect(project_dir, archive_profile)
+    cached_path = archive_cache.cached_path(task_id, manifest)
     
-    return FileResponse(full_path)
+    return {
+        "task_id": task_id,
+        "profile": archive_profile.to_dict(),
+        "files": manifest.file_count,
+        "source_bytes": manifest.total_bytes,
+        "archive_bytes": os.path.getsize(cached_path) if cached_path else None,
+        "etag": manifest.etag,
+        "download_url": f"/api/download/{task_id}?profile={archive_profile.name}",
+        "profiles": list(profiles)
+    }
 
 @router.get("/download/{task_id}")
-async def download_website(task_id: str):
+async def download_website(task_id: str, request: Request, profile: Optional[str] = None):
     """Download the generated website as a ZIP file"""
-    project_dir = os.path.join(settings.GENERATED_SITES_DIR, task_id)
+    project_dir, archive_profile = _resolve_archive(task_id, profile)
     
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail="Generated website not found")
+    # The ETag names the manifest of paths, sizes and mtimes the archive is built from
+    manifest = await archive_cache.inspect(project_dir, archive_profile)
+    headers = validator_headers(manifest.etag, manifest.last_modified, "no-cache")
+    if is_not_modified(request.headers, manifest.etag, manifest.last_modified):
+        return Response(status_code=304, headers=headers)
     
-    try:
-        # Create a temporary generator instance to create the ZIP
-        generator = WebsiteGenerator(task_id, "")
-        zip_path = generator.create_zip_archive()
-        
-        if not os.path.exists(zip_path):
-            raise HTTPException(status_code=500, detail="Failed to create ZIP archive")
-        
-        return FileResponse(
-            zip_path,
-            media_type='application/zip',
-            filename=f"website_{task_id}.zip"
+    headers.update(_archive_headers(manifest))
+    suffix = "" if archive_profile.name == settings.ARCHIVE_DEFAULT_PROFILE else f"_{archive_profile.name}"
+    headers["Content-Disposition"] = f'attachment; filename="website_{task_id}{suffix}.zip"'
+    cached_path = archive_cache.cached_path(task_id, manifest)
+    if not cached_path and "range" in request.headers:
+        # Resuming or segmented clients need the finished archive to address bytes in
+        cached_path = await archive_cache.build(task_id, project_dir, archive_profile)
+        if cached_path and archive_cache.archive_path(task_id, manifest) != cached_path:
+            # The tree changed since the manifest was taken: the old ETag no longer applies
+            manifest = await archive_cache.inspect(project_dir, archive_profile)
+            headers.update(validator_headers(manifest.etag, manifest.last_modified, "no-cache"))
+            headers.update(_archive_headers(manifest))
+    if cached_path:
+        return ranged_file_response(
+            cached_path, request.headers, manifest.etag, manifest.last_modified,
+            headers, 'application/zip'
         )
-        
-    except Exception as e:
-        logger.error(f"Error creating ZIP for task {task_id}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to create download archive")
\ No newline at end of file
+    
+    # Not cached yet: stream while compressing off the event loop, caching the result.
+    # The same ETag names the cached copy, so an interrupted stream can be resumed.
+    headers["Accept-Ranges"] = "bytes"
+    return StreamingResponse(
+        archive_cache.stream(task_id, project_dir, manifest),
+        media_type='application/zip',
+        headers=headers
+    )
@@ -7,24 +7,22 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.websocket("/status/{task_id}")
-async def websocket_status(websocket: WebSocket, task_id: str):
-    """WebSocket endpoint for real-time task status updates"""
-    await manager.connect(websocket, task_id)
+async def websocket_status(websocket: WebSocket, task_id: str, since: int = 0):
+    """WebSocket endpoint for real-time task status updates (?since=<seq> resumes after that event)"""
+    subscriber = await manager.connect(websocket, task_id, since)
     
     try:
-        # Send initial connection confirmation
-        await manager.send_log(task_id, f"Connected to task {task_id} status stream", "info")
-        
         # Keep connection alive and handle incoming messages
         while True:
             try:
-                # Wait for any client messages (like ping/pong for keepalive)
+                # Wait for client messages; any of them (usually "pong") answers the server's "ping"
                 data = await websocket.receive_text()
                 logger.debug(f"Received WebSocket message for task {task_id}: {data}")
+                subscriber.mark_alive()
                 
                 # Echo back any ping messages
                 if data == "ping":
-                    await websocket.send_text("pong")
+                    subscriber.push("pong")
                     
             except WebSocketDisconnect:
                 break
@@ -37,4 +35,4 @@ async def websocket_status(websocket: WebSocket, task_id: str):
     except Exception as e:
         logger.error(f"WebSocket connection error for task {task_id}: {e}")
     finally:
-        manager.disconnect(websocket, task_id)
\ No newline at end of file
+        manager.disconnect(task_id, subscriber)
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""Client injected into live previews
+
+Listens for file_written events on the task channel: stylesheets and scripts are
+swapped in place, a changed page reloads the frame.
+"""
+
+LIVE_PREVIEW_CLIENT = """<script data-weaver-live>
+(function () {
+  var root = "__ROOT__";
+  var proto = location.protocol === "https:" ? "wss:" : "ws:";
+  var socket = new WebSocket(proto + "//" + location.host + "/ws/status/__TASK_ID__?since=__SINCE__", "weaver.json.v1");
+  var reloadTimer = null;
+
+  function matches(url, path) {
+    return url && new URL(url, location.href).pathname === root + path;
+  }
+
+  function swapStylesheet(path, hash) {
+    document.querySelectorAll('link[rel="stylesheet"]').forEach(function (link) {
+      if (!matches(link.getAttribute("href"), path)) return;
+      var next = link.cloneNode();
+      next.href = root + path + "?v=" + hash;
+      next.onload = function () { link.remove(); };
+      link.after(next);
+    });
+  }
+
+  function swapScript(path, hash) {
+    document.querySelectorAll("script[src]").forEach(function (script) {
+      if (!matches(script.getAttribute("src"), path)) return;
+      var next = document.createElement("script");
+      next.src = root + path + "?v=" + hash;
+      script.replaceWith(next);
+    });
+  }
+
+  function handle(data) {
+    if (data.type === "completion") { socket.close(); return; }
+    if (data.type !== "file_written") return;
+
+    if (/\\.css$/.test(data.path)) {
+      swapStylesheet(data.path, data.hash);
+    } else if (/\\.js$/.test(data.path)) {
+      swapScript(data.path, data.hash);
+    } else if (/\\.html$/.test(data.path) && matches(location.pathname.replace(/\\/$/, "/index.html"), data.path)) {
+      // Several files usually land together: reload once they have
+      clearTimeout(reloadTimer);
+      reloadTimer = setTimeout(function () { location.reload(); }, 100);
+    }
+  }
+
+  socket.onmessage = function (event) {
+    if (event.data === "ping") { socket.send("pong"); return; }
+    var data;
+    try { data = JSON.parse(event.data); } catch (e) { return; }
+    (data.type === "batch" ? data.events : [data]).forEach(handle);
+  };
+})();
+</script>"""
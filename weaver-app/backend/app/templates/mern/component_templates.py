@@ -3,7 +3,7 @@
 PACKAGE_JSON_TEMPLATE = {
     "name": "${project_name}",
     "version": "1.0.0",
-    "private": true,
+    "private": True,
     "scripts": {
         "dev": "vite",
         "build": "tsc && vite build",
@@ -38,7 +38,7 @@ PACKAGE_JSON_TEMPLATE = {
 BACKEND_PACKAGE_JSON_TEMPLATE = {
     "name": "${project_name}-backend",
     "version": "1.0.0",
-    "private": true,
+    "private": True,
     "scripts": {
         "start": "node dist/server.js",
         "dev": "nodemon src/server.ts",
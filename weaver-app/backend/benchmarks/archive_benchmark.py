@@ -0,0 +1,112 @@
+"""
+Archive Benchmark
+Compares the original create_zip_archive with the streaming and parallel archive builders
+
+Usage (from weaver-app/backend):
+    python -m benchmarks.archive_benchmark [--project-dir DIR] [--files 4000] [--workers 0] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import zipfile
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.archive import archive_workers, get_profile, iter_zip_stream  # noqa: E402
+
+WORDS = (
+    "const import export function return await async React useState props "
+    "module require express router mongoose schema default class extends"
+).split()
+
+
+def make_project(root: str, file_count: int, seed: int = 7) -> int:
+    """Write a synthetic node_modules-heavy project; returns its size in bytes"""
+    rng = random.Random(seed)
+    total = 0
+    for index in range(file_count):
+        package = f"node_modules/pkg{index % 300}/lib"
+        os.makedirs(os.path.join(root, package), exist_ok=True)
+        words = rng.choices(WORDS, k=rng.randint(200, 4000))
+        content = " ".join(words).encode("utf-8")
+        if index % 25 == 0:
+            content += os.urandom(rng.randint(1000, 20000))
+        with open(os.path.join(root, package, f"file{index}.js"), "wb") as f:
+            f.write(content)
+        total += len(content)
+    return total
+
+
+def legacy_zip(project_dir: str, zip_path: str) -> None:
+    """The original create_zip_archive: zipfile.ZipFile.write, one member at a time"""
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for root, dirs, files in os.walk(project_dir):
+            for file in files:
+                file_path = os.path.join(root, file)
+                zipf.write(file_path, os.path.relpath(file_path, project_dir))
+
+
+def stream_zip_to(project_dir: str, zip_path: str, workers: int) -> None:
+    with open(zip_path, "wb") as f:
+        for chunk in iter_zip_stream(project_dir, get_profile("full"), workers=workers):
+            f.write(chunk)
+
+
+def measure(name: str, build, zip_path: str, repeat: int, source_bytes: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(zip_path)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    with zipfile.ZipFile(zip_path) as archive:
+        assert archive.testzip() is None
+    size = os.path.getsize(zip_path)
+    print(f"{name:<22} {best:8.3f} s {source_bytes / best / 1e6:8.1f} MB/s {size:>12} bytes")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--project-dir", help="Archive an existing project instead of a synthetic one")
+    parser.add_argument("--files", type=int, default=4000, help="Files in the synthetic project")
+    parser.add_argument("--workers", type=int, default=0, help="Parallel workers (0 = ARCHIVE_WORKERS or CPU count)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per builder; the best is reported")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="weaver-archive-bench-")
+    try:
+        project_dir = args.project_dir
+        if project_dir:
+            source_bytes = sum(
+                os.path.getsize(os.path.join(root, name))
+                for root, _, names in os.walk(project_dir) for name in names
+            )
+        else:
+            project_dir = os.path.join(work_dir, "project")
+            source_bytes = make_project(project_dir, args.files)
+
+        workers = args.workers or archive_workers()
+        zip_path = os.path.join(work_dir, "archive.zip")
+        print(f"Project: {project_dir} ({source_bytes / 1e6:.1f} MB), {workers} workers\n")
+
+        baseline = measure("create_zip_archive", lambda p: legacy_zip(project_dir, p), zip_path, args.repeat, source_bytes)
+        sequential = measure("stream (1 worker)", lambda p: stream_zip_to(project_dir, p, 1), zip_path, args.repeat, source_bytes)
+        if workers <= 1:
+            # One worker takes the serial path: a "parallel" row would only measure it again
+            print(f"\nSpeedup over create_zip_archive: stream {baseline / sequential:.2f}x (parallel skipped: 1 worker)")
+            return
+        parallel = measure(f"parallel ({workers} workers)", lambda p: stream_zip_to(project_dir, p, workers), zip_path, args.repeat, source_bytes)
+
+        print(f"\nSpeedup over create_zip_archive: stream {baseline / sequential:.2f}x, parallel {baseline / parallel:.2f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import os
+
+from app.core.archive import ArchiveCache
+
+
+def _archive(cache_dir, name, size, mtime):
+    path = os.path.join(cache_dir, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_prune_removes_archives_of_deleted_projects(tmp_path):
+    cache_dir, sites_dir = tmp_path / "cache", tmp_path / "sites"
+    cache_dir.mkdir()
+    (sites_dir / "kept").mkdir(parents=True)
+    kept = _archive(cache_dir, "kept-full-0123456789abcdef.zip", 10, 1000)
+    gone = _archive(cache_dir, "gone-source-only-0123456789abcdef.zip", 10, 1000)
+
+    cache = ArchiveCache(str(cache_dir), sites_dir=str(sites_dir))
+    assert cache.prune(now=1000) == 1
+    assert os.path.exists(kept)
+    assert not os.path.exists(gone)
+
+
+def test_prune_removes_expired_archives_and_stale_temp_files(tmp_path):
+    old = _archive(tmp_path, "a-full-0123456789abcdef.zip", 10, 0)
+    fresh = _archive(tmp_path, "b-full-0123456789abcdef.zip", 10, 950)
+    stale_tmp = _archive(tmp_path, "tmpabc.tmp", 10, 0)
+    fresh_tmp = _archive(tmp_path, "tmpdef.tmp", 10, 950)
+    other = _archive(tmp_path, "notes.txt", 10, 0)
+
+    cache = ArchiveCache(str(tmp_path), max_age=100)
+    assert cache.prune(now=1000) == 2
+    assert not os.path.exists(old) and not os.path.exists(stale_tmp)
+    assert os.path.exists(fresh) and os.path.exists(fresh_tmp) and os.path.exists(other)
+
+
+def test_prune_evicts_oldest_archives_over_the_size_cap(tmp_path):
+    oldest = _archive(tmp_path, "a-full-0123456789abcdef.zip", 40, 100)
+    middle = _archive(tmp_path, "b-full-0123456789abcdef.zip", 40, 200)
+    newest = _archive(tmp_path, "c-static-build-0123456789abcdef.zip", 40, 300)
+
+    cache = ArchiveCache(str(tmp_path), max_bytes=100)
+    assert cache.prune(now=400) == 1
+    assert not os.path.exists(oldest)
+    assert os.path.exists(middle) and os.path.exists(newest)
+
+
+def test_prune_tolerates_a_missing_cache_dir(tmp_path):
+    assert ArchiveCache(str(tmp_path / "missing"), max_bytes=0).prune() == 0
@@ -0,0 +1,28 @@
+import json
+
+from app.core.asset_fingerprint import ASSET_MANIFEST_FILENAME, ManifestIndex
+
+
+def _project(root, name, manifest):
+    project_dir = root / name
+    project_dir.mkdir()
+    (project_dir / ASSET_MANIFEST_FILENAME).write_text(json.dumps(manifest))
+    return str(project_dir)
+
+
+def test_manifest_index_reads_the_hashed_paths(tmp_path):
+    project_dir = _project(tmp_path, "a", {"css/style.css": "css/style.0123456789.css"})
+    index = ManifestIndex()
+    assert index.hashed_paths(project_dir) == {"css/style.0123456789.css"}
+    assert index.hashed_paths(str(tmp_path / "missing")) == frozenset()
+
+
+def test_manifest_index_keeps_only_the_most_recent_projects(tmp_path):
+    first, second, third = (_project(tmp_path, name, {}) for name in ("a", "b", "c"))
+    index = ManifestIndex(max_entries=2)
+    index.hashed_paths(first)
+    index.hashed_paths(second)
+    index.hashed_paths(first)
+    index.hashed_paths(third)
+    assert len(index) == 2
+    assert list(index._entries) == [first, third]
@@ -0,0 +1,119 @@
+import gzip
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from app.core.asset_optimizer import load_brotli, minify_css, minify_html, minify_js, precompress
+
+SCRIPT = r'''
+// Strip quotes from user input
+function clean(s) {
+    /* the quote below lives in a regex, not a string */
+    return s.replace(/"/g, "").replace(/[/\]"']+/g, '');
+}
+
+const ratio = total / count / 2;
+let n = 1;
+n++ / 2;
+
+const card = `
+    <div class="card">
+        ${items.map(item => `<span>${item.name}</span>`).join("")}
+    </div>`;
+
+const url = "http://example.com/path"; // trailing comment
+const re = typeof x === "string" ? /\/\*not a comment\*\//.test(x) : false;
+'''
+
+
+def test_minify_js_keeps_literals_verbatim():
+    minified = minify_js(SCRIPT)
+
+    assert 's.replace(/"/g, "").replace(/[/\\]"\']+/g, \'\')' in minified
+    assert "total / count / 2" in minified
+    assert '"http://example.com/path";' in minified
+    assert "/\\/\\*not a comment\\*\\//.test(x)" in minified
+    # Template literal indentation is part of the string value
+    assert '`\n    <div class="card">\n        ${items.map(item => `<span>${item.name}</span>`).join("")}\n    </div>`' in minified
+    assert "Strip quotes" not in minified
+    assert "lives in a regex" not in minified
+    assert "trailing comment" not in minified
+
+
+def test_minify_js_is_idempotent():
+    minified = minify_js(SCRIPT)
+    assert minify_js(minified) == minified
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_minify_js_round_trip_evaluates_the_same():
+    harness = r'''
+const items = [{name: "a"}, {name: "b"}];
+const total = 12, count = 3, x = "/* c */";
+%s
+console.log(JSON.stringify([clean(`say "hi" / [there]'`), ratio, n, card, url, re]));
+'''
+
+    def evaluate(script):
+        result = subprocess.run(
+            ["node", "-e", harness % script], capture_output=True, text=True, check=True
+        )
+        return json.loads(result.stdout)
+
+    assert evaluate(minify_js(SCRIPT)) == evaluate(SCRIPT)
+
+
+def test_minify_css_keeps_strings_and_urls_verbatim():
+    source = '''
+/* header comment */
+a::after { content: "x  /* not a comment */  y ; }" ; }
+.hero , .card > p {
+    background : url(data:image/png;base64,AA//BB) no-repeat;
+    font-family: 'Open  Sans', sans-serif;  /* trailing */
+}
+'''
+    assert minify_css(source) == (
+        'a::after{content:"x  /* not a comment */  y ; }"}'
+        ".hero,.card>p{background :url(data:image/png;base64,AA//BB) no-repeat;"
+        "font-family:'Open  Sans',sans-serif}"
+    )
+
+
+def test_minify_css_keeps_descendant_pseudo_selector_space():
+    assert minify_css("nav :hover { color: red; }") == "nav :hover{color:red}"
+
+
+def test_minify_html_leaves_raw_blocks_alone():
+    source = """<!DOCTYPE html>
+<html>
+    <!-- layout -->
+    <body>
+        <pre>  keep
+    this  </pre>
+        <script>if (a  <  b) { go(); }</script>
+        <!--[if IE]><p>old</p><![endif]-->
+    </body>
+</html>
+"""
+    minified = minify_html(source)
+    assert "layout" not in minified
+    assert "<pre>  keep\n    this  </pre>" in minified
+    assert "<script>if (a  <  b) { go(); }</script>" in minified
+    assert "<!--[if IE]>" in minified
+    assert "\n    " not in minified.replace("<pre>  keep\n    this  </pre>", "")
+
+
+def test_precompress_round_trips():
+    content = b"body{color:red}" * 100
+    encoded = precompress(content)
+
+    assert gzip.decompress(encoded[".gz"]) == content
+    # mtime=0 keeps the output stable across builds
+    assert precompress(content)[".gz"] == encoded[".gz"]
+    brotli = load_brotli()
+    if brotli is None:
+        assert ".br" not in encoded
+    else:
+        assert brotli.decompress(encoded[".br"]) == content
@@ -0,0 +1,29 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.routers import audit
+
+app = FastAPI()
+app.include_router(audit.router, prefix="/api")
+
+
+def test_audit_reads_manifest_and_stays_inside_the_sites_dir(tmp_path, monkeypatch):
+    sites_dir = tmp_path / "generated_sites"
+    project_dir = sites_dir / "task"
+    project_dir.mkdir(parents=True)
+    (project_dir / "index.html").write_text("<html><body>hi</body></html>")
+    (project_dir / "project.json").write_text(json.dumps({"audit": {"requests": 1}}))
+    (tmp_path / "index.html").write_text("<html></html>")
+    monkeypatch.setattr(settings, "GENERATED_SITES_DIR", str(sites_dir))
+
+    client = TestClient(app)
+    response = client.get("/api/audit/task")
+    assert response.status_code == 200
+    assert response.json() == {"task_id": "task", "source": "manifest", "requests": 1}
+
+    assert client.get("/api/audit/task?refresh=true").json()["source"] == "live"
+    assert client.get("/api/audit/missing").status_code == 404
+    assert client.get("/api/audit/%2E%2E").status_code in (403, 404)
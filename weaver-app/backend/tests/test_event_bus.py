@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+from app.core import event_bus as event_bus_module
+from app.core.event_bus import KIND_STATE, RedisEventBus, UnixSocketEventBus
+
+
+async def until(condition, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def make_bus(path, received=None, **kwargs):
+    bus = UnixSocketEventBus(str(path), retry_interval=0.05, **kwargs)
+    if received is not None:
+        bus.subscribe(KIND_STATE, lambda task_id, payload: received.append((task_id, payload)))
+    return bus
+
+
+def test_one_broker_relays_between_workers_and_skips_own_messages(tmp_path):
+    async def run():
+        path = tmp_path / "bus.sock"
+        received_a, received_b = [], []
+        a, b = make_bus(path, received_a), make_bus(path, received_b)
+        await a.start()
+        await until(lambda: a.connected)
+        await b.start()
+        await until(lambda: b.connected)
+        try:
+            assert [bus._server is not None for bus in (a, b)] == [True, False]
+            a.publish(KIND_STATE, "task", {"status": "planning"})
+            b.publish(KIND_STATE, "other", {"status": "completed"})
+            await until(lambda: received_a and received_b)
+            await asyncio.sleep(0.05)
+            assert received_a == [("other", {"status": "completed"})]
+            assert received_b == [("task", {"status": "planning"})]
+        finally:
+            await b.stop()
+            await a.stop()
+
+    asyncio.run(run())
+
+
+def test_oversized_messages_are_dropped_without_breaking_the_stream(tmp_path):
+    async def run():
+        path = tmp_path / "bus.sock"
+        received = []
+        broker, follower = make_bus(path, max_message_size=1024), make_bus(path, received, max_message_size=1024)
+        await broker.start()
+        await until(lambda: broker.connected)
+        await follower.start()
+        await until(lambda: follower.connected)
+        try:
+            broker.publish(KIND_STATE, "big", {"data": "x" * 5000})
+            assert broker.dropped == 1
+
+            # A peer that ignores the limit: the broker skips its long line and keeps reading
+            reader, writer = await asyncio.open_unix_connection(str(path))
+            message = {"origin": "raw", "kind": KIND_STATE, "task_id": "raw-big", "payload": {"data": "y" * 10000}}
+            writer.write(json.dumps(message).encode() + b"\n")
+            message.update(task_id="after", payload={})
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+
+            await until(lambda: received)
+            assert received == [("after", {})]
+            assert broker.dropped == 2
+            writer.close()
+        finally:
+            await follower.stop()
+            await broker.stop()
+
+    asyncio.run(run())
+
+
+def test_a_follower_takes_over_when_the_broker_exits(tmp_path):
+    async def run():
+        path = tmp_path / "bus.sock"
+        received = []
+        first, second = make_bus(path), make_bus(path, received)
+        await first.start()
+        await until(lambda: first.connected)
+        await second.start()
+        await until(lambda: second.connected)
+
+        await first.stop()
+        await until(lambda: second._server is not None and second.connected)
+        assert second.reconnects == 1
+
+        third = make_bus(path)
+        await third.start()
+        await until(lambda: third.connected)
+        try:
+            third.publish(KIND_STATE, "task", {"status": "failed"})
+            await until(lambda: received)
+            assert received == [("task", {"status": "failed"})]
+        finally:
+            await third.stop()
+            await second.stop()
+
+    asyncio.run(run())
+
+
+class FakePubSub:
+    def __init__(self, sessions):
+        self.sessions = sessions
+
+    async def subscribe(self, channel):
+        pass
+
+    async def listen(self):
+        messages = self.sessions.pop(0)
+        for message in messages:
+            yield message
+        if self.sessions:
+            raise ConnectionError("connection reset")
+        await asyncio.Event().wait()
+
+    async def close(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self, sessions):
+        self.sessions = sessions
+
+    def from_url(self, url):
+        return self
+
+    def pubsub(self):
+        return FakePubSub(self.sessions)
+
+    async def close(self):
+        pass
+
+
+def test_redis_bus_resubscribes_after_the_connection_drops(monkeypatch):
+    def line(task_id):
+        return json.dumps({"origin": "other", "kind": KIND_STATE, "task_id": task_id, "payload": {}})
+
+    sessions = [
+        [{"type": "message", "data": line("before")}],
+        [{"type": "message", "data": line("after")}]
+    ]
+    monkeypatch.setattr(event_bus_module, "load_redis", lambda: FakeRedis(sessions))
+
+    async def run():
+        received = []
+        bus = RedisEventBus("redis://test", "weaver:test", retry_interval=0.01)
+        bus.subscribe(KIND_STATE, lambda task_id, payload: received.append(task_id))
+        await bus.start()
+        try:
+            await until(lambda: len(received) == 2)
+            assert received == ["before", "after"]
+            assert bus.health()["reconnects"] == 1
+            assert bus.connected
+        finally:
+            await bus.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,34 @@
+from app.core.event_log import EventLogStore
+from app.core.task_events import EventType, TaskEvent
+
+
+def test_replay_numbers_events_and_reports_missed():
+    logs = EventLogStore(max_events=3)
+    for index in range(5):
+        logs.record("task", TaskEvent(EventType.LOG, message=str(index)))
+
+    events, missed = logs.replay("task", since=1)
+    assert [event.seq for event in events] == [3, 4, 5]
+    assert missed == 1
+    assert logs.replay("task", since=4)[0][0].message == "4"
+
+
+def test_finished_logs_expire_after_retention():
+    logs = EventLogStore(retention=10, idle_ttl=1000)
+    logs.record("task", TaskEvent(EventType.COMPLETION))
+    logs.finish("task")
+    finished_at = logs.finished_at("task")
+
+    assert logs.evict_expired(now=finished_at + 5) == 0
+    assert logs.evict_expired(now=finished_at + 10) == 1
+    assert logs.last_seq("task") == 0
+
+
+def test_logs_without_terminal_event_expire_when_idle():
+    logs = EventLogStore(retention=10, idle_ttl=100)
+    logs.record("batch-item", TaskEvent(EventType.FILE_WRITTEN, data={"path": "index.html"}))
+    updated_at = logs._logs["batch-item"].updated_at
+
+    assert logs.evict_expired(now=updated_at + 50) == 0
+    assert logs.evict_expired(now=updated_at + 100) == 1
+    assert logs.stats() == {"tasks": 0, "events": 0}
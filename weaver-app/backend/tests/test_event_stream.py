@@ -0,0 +1,68 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.task_events import EventType, TaskEvent
+from app.core.task_store import GenerationStatus, task_store
+from app.core.websocket_manager import ConnectionManager, manager
+from app.routers import generate
+
+app = FastAPI()
+app.include_router(generate.router, prefix="/api")
+
+
+def test_terminal_event_ends_the_stream():
+    async def run():
+        connections = ConnectionManager(batch_window_ms=0)
+        subscriber = connections.open_stream("task")
+        await connections.send_event("task", TaskEvent(EventType.COMPLETION, data={"preview_url": "/p"}))
+        return [chunk async for chunk in subscriber.stream(60, 3000)]
+
+    chunks = asyncio.run(run())
+    assert chunks[0] == "retry: 3000\n\n"
+    assert '"type":"completion"' in chunks[-1]
+
+
+def test_finished_task_without_terminal_event_ends_after_keepalive():
+    async def run():
+        connections = ConnectionManager(batch_window_ms=0)
+        subscriber = connections.open_stream("task")
+        done = {"value": False}
+        chunks = []
+        async for chunk in subscriber.stream(0.05, 3000, lambda: done["value"]):
+            chunks.append(chunk)
+            if chunk.startswith(": keep-alive"):
+                done["value"] = True
+        return chunks
+
+    chunks = asyncio.run(asyncio.wait_for(run(), 5))
+    assert chunks[-1] == ": keep-alive\n\n"
+
+
+def test_terminal_task_without_replay_log_gets_204():
+    task_store.create("sse-evicted")
+    task_store.update("sse-evicted", GenerationStatus.COMPLETED.value)
+    try:
+        with TestClient(app) as client:
+            assert client.get("/api/generate/sse-evicted/events").status_code == 204
+            assert client.get("/api/generate/sse-unknown/events").status_code == 404
+    finally:
+        task_store.remove("sse-evicted")
+        manager.event_logs.drop("sse-evicted")
+
+
+def test_stream_ends_once_task_record_turns_terminal(monkeypatch):
+    monkeypatch.setattr(settings, "SSE_KEEPALIVE_INTERVAL", 0.05)
+    task_store.create("sse-timeout")
+    task_store.update("sse-timeout", GenerationStatus.FAILED.value, error="Generation timeout")
+    manager.event_logs.record("sse-timeout", TaskEvent(EventType.LOG, message="started"))
+    try:
+        with TestClient(app) as client:
+            response = client.get("/api/generate/sse-timeout/events")
+        assert response.status_code == 200
+        assert "started" in response.text
+    finally:
+        task_store.remove("sse-timeout")
+        manager.event_logs.drop("sse-timeout")
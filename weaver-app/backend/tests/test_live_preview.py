@@ -0,0 +1,42 @@
+import asyncio
+import os
+
+from app.core.config import settings
+from app.core.live_preview import LivePreviewPublisher
+from app.core.task_store import GenerationStatus, task_store
+from app.core.websocket_manager import manager
+
+
+def commit(task_id: str, relative_path: str) -> None:
+    async def run():
+        publisher = LivePreviewPublisher()
+        publisher._loop = asyncio.get_running_loop()
+        publisher._on_commit(os.path.join(os.path.abspath(settings.GENERATED_SITES_DIR), task_id, relative_path), b"<html>")
+        # Let the scheduled send_file_written run
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+
+def test_running_generation_gets_file_written_events():
+    task_store.create("live-task", "a site")
+    try:
+        commit("live-task", "frontend/index.html")
+        events, _ = manager.event_logs.replay("live-task")
+        assert [event.data["path"] for event in events] == ["frontend/index.html"]
+    finally:
+        task_store.remove("live-task")
+        manager.event_logs.drop("live-task")
+
+
+def test_batch_items_unknown_and_finished_tasks_are_not_followed():
+    task_store.create("batch-item", "a site", batch_id="batch")
+    task_store.create("done-task", "a site")
+    task_store.update("done-task", GenerationStatus.COMPLETED.value)
+    try:
+        for task_id in ("batch-item", "done-task", "unknown-task"):
+            commit(task_id, "index.html")
+            assert manager.event_logs.last_seq(task_id) == 0
+    finally:
+        task_store.remove("batch-item")
+        task_store.remove("done-task")
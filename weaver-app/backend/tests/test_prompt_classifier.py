@@ -0,0 +1,26 @@
+import pytest
+
+from app.core.prompt_classifier import prompt_classifier
+
+
+@pytest.mark.parametrize("prompt, site_type, matches", [
+    ("a restaurant-style landing page", "restaurant", ["restaurant"]),
+    ("portfolio-site for a photographer", "portfolio", ["portfolio"]),
+    ("an e-commerce store for shoes", "ecommerce", ["e-commerce", "store"]),
+])
+def test_hyphenated_keywords_match(prompt, site_type, matches):
+    result = prompt_classifier.classify(prompt)
+    assert result.site_type == site_type
+    assert result.matches == matches
+
+
+@pytest.mark.parametrize("prompt, matches", [
+    ("restaurants and cafes with menus", ["restaurant", "cafe", "menu"]),
+    ("a site for two businesses", ["business"]),
+])
+def test_plurals_match_their_keyword(prompt, matches):
+    assert prompt_classifier.classify(prompt).matches == matches
+
+
+def test_keywords_inside_longer_words_do_not_match():
+    assert prompt_classifier.classify("a workshop signup for redwood shopping").matches == []
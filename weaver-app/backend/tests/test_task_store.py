@@ -0,0 +1,107 @@
+import pytest
+
+from app.core import task_store as task_store_module
+from app.core.config import settings
+from app.core.state_tracker import GenerationStateTracker
+from app.core.task_store import GenerationStatus, TaskStore
+
+RUNNING = GenerationStatus.PLANNING.value
+COMPLETED = GenerationStatus.COMPLETED.value
+FAILED = GenerationStatus.FAILED.value
+
+
+@pytest.fixture
+def published(monkeypatch):
+    messages = []
+    monkeypatch.setattr(task_store_module.event_bus, "publish", lambda kind, task_id, payload: messages.append(task_id))
+    return messages
+
+
+def test_status_index_tracks_every_transition(published):
+    store = TaskStore()
+    store.create("a", "prompt")
+    store.create("b")
+    store.update("a", RUNNING, progress=10)
+
+    assert [record.task_id for record in store.records(RUNNING)] == ["a"]
+    assert store.count(GenerationStatus.INITIALIZED.value) == 1
+    assert store.active_count() == 2
+
+    store.update("a", COMPLETED)
+    store.update("b", FAILED, error="boom")
+    counts = store.counts()
+    assert counts["by_status"] == {COMPLETED: 1, FAILED: 1}
+    assert (counts["active"], counts["completed"], counts["failed"]) == (0, 1, 1)
+    assert store.update("missing", RUNNING) is None
+    assert published == ["a", "b", "a", "a", "b"]
+
+
+def test_started_at_is_set_when_a_task_leaves_the_queue():
+    store = TaskStore()
+    record = store.create("a")
+    assert record.queued and record.started_at is None
+
+    store.update("a", RUNNING)
+    started_at = record.started_at
+    assert started_at is not None
+    store.update("a", GenerationStatus.REFINING.value)
+    assert record.started_at == started_at
+
+
+def test_finished_tasks_are_evicted_oldest_first_after_the_ttl():
+    store = TaskStore(ttl=100)
+    for task_id in ("first", "second", "running"):
+        store.create(task_id)
+    store.update("first", COMPLETED)
+    store.update("second", FAILED)
+    store.get("first").finished_at = store._finished["first"] = 1000.0
+    store.get("second").finished_at = store._finished["second"] = 1050.0
+
+    assert store.evict_expired(now=1099) == 0
+    assert store.evict_expired(now=1100) == 1
+    assert "first" not in store and "second" in store
+    assert store.evict_expired(now=10_000) == 1
+    assert list(store.records()) == [store.get("running")]
+    assert store.totals["evicted"] == 2
+
+
+def test_mirrored_records_are_not_timed_out_published_or_allowed_to_overwrite(published):
+    owner, mirror = TaskStore(), TaskStore()
+    packed = owner.create("task", "prompt").pack()
+    assert "local" not in packed
+
+    mirror.apply_remote("task", packed)
+    record = mirror.get("task")
+    assert not record.local and not record.live
+    assert mirror.active() == [record]
+    assert mirror.active(local_only=True) == []
+
+    published.clear()
+    mirror.update("task", RUNNING)
+    assert published == []
+
+    # The worker running a task keeps its own record
+    owner.apply_remote("task", dict(packed, status=FAILED))
+    assert owner.get("task").status == GenerationStatus.INITIALIZED.value
+    assert owner.get("task").local
+
+
+def test_validate_generation_uses_the_configured_limits(monkeypatch):
+    tracker = GenerationStateTracker()
+    tracker.store = TaskStore()
+    record = tracker.store.create("task")
+    tracker.store.update("task", RUNNING)
+
+    assert tracker.validate_generation("task")
+
+    monkeypatch.setattr(settings, "TASK_STALL_SECONDS", 5)
+    record.updated_at -= 10
+    assert not tracker.validate_generation("task")
+    assert record.error == "Generation stalled"
+
+    record = tracker.store.create("slow")
+    tracker.store.update("slow", RUNNING)
+    monkeypatch.setattr(settings, "TASK_TIMEOUT_SECONDS", 30)
+    record.started_at -= 60
+    assert not tracker.validate_generation("slow")
+    assert record.error == "Generation timeout"
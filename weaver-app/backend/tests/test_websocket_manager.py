@@ -0,0 +1,154 @@
+import asyncio
+import json
+
+from app.core.task_events import EventEncoder, EventType, TaskEvent
+from app.core.websocket_manager import ConnectionManager, Subscriber
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.scope = {"subprotocols": []}
+        self.frames = []
+        self.closed = False
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text):
+        self.frames.append(text)
+
+    async def send_bytes(self, data):
+        self.frames.append(data)
+
+    async def close(self):
+        self.closed = True
+
+    def events(self):
+        """Every event sent, with batch frames flattened"""
+        events = []
+        for frame in self.frames:
+            if frame == "ping":
+                continue
+            payload = json.loads(frame)
+            events.extend(payload["events"] if payload["type"] == "batch" else [payload])
+        return events
+
+
+def log(message):
+    return TaskEvent(EventType.LOG, message=message)
+
+
+def make_subscriber(max_queue=3):
+    return Subscriber(FakeWebSocket(), "task", max_queue, EventEncoder(), 0)
+
+
+def test_full_queue_drops_the_oldest_droppable_item():
+    subscriber = make_subscriber()
+    for index in range(5):
+        subscriber.push(log(str(index)))
+
+    assert [item.message for item, _ in subscriber.queue] == ["2", "3", "4"]
+    assert subscriber.dropped == 2
+
+
+def test_never_drop_items_evict_droppable_ones_then_grow_past_the_bound():
+    manager = ConnectionManager(max_queue=3, batch_window_ms=0)
+    completion = TaskEvent(EventType.COMPLETION, data={"preview_url": "/p"})
+    assert manager.is_droppable(log("x")) and not manager.is_droppable(completion)
+
+    subscriber = make_subscriber()
+    for index in range(3):
+        subscriber.push(log(str(index)))
+    subscriber.push(completion, droppable=False)
+    assert [item.type for item, _ in subscriber.queue] == [EventType.LOG, EventType.LOG, EventType.COMPLETION]
+
+    for _ in range(3):
+        subscriber.push(TaskEvent(EventType.ERROR, message="boom"), droppable=False)
+    # The two remaining logs make room for two errors; the third grows the queue
+    assert len(subscriber.queue) == 4
+    assert all(not droppable for _, droppable in subscriber.queue)
+
+    # Droppable items never push a full queue of undroppable ones further
+    subscriber.push(log("late"))
+    assert len(subscriber.queue) == 4
+    assert subscriber.dropped == 4
+
+
+def test_connect_replays_after_since_then_follows_live_events():
+    async def run():
+        manager = ConnectionManager(batch_window_ms=0)
+        for index in range(1, 5):
+            await manager.send_event("task", log(f"event {index}"))
+
+        websocket = FakeWebSocket()
+        subscriber = await manager.connect(websocket, "task", since=2)
+        await manager.send_event("task", log("event 5"))
+        await asyncio.sleep(0.05)
+        manager.disconnect("task", subscriber)
+        return websocket.events()
+
+    events = asyncio.run(run())
+    assert events[0]["message"] == "Connected to task task status stream"
+    assert [(event["seq"], event["message"]) for event in events[1:]] == [
+        (3, "event 3"), (4, "event 4"), (5, "event 5")
+    ]
+
+
+def test_connect_reports_events_evicted_from_the_replay_log():
+    async def run():
+        manager = ConnectionManager(batch_window_ms=0)
+        manager.event_logs.max_events = 2
+        for index in range(1, 6):
+            await manager.send_event("task", log(f"event {index}"))
+
+        websocket = FakeWebSocket()
+        subscriber = await manager.connect(websocket, "task", since=1)
+        await asyncio.sleep(0.05)
+        manager.disconnect("task", subscriber)
+        return websocket.events()
+
+    events = asyncio.run(run())
+    assert events[1]["message"] == "2 earlier events are no longer available"
+    assert [event["seq"] for event in events[2:]] == [4, 5]
+
+
+def test_heartbeat_reaps_subscribers_that_miss_pongs():
+    async def run():
+        manager = ConnectionManager(batch_window_ms=0)
+        manager.max_missed_pongs = 2
+        silent, alive = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(silent, "task")
+        answering = await manager.connect(alive, "task")
+
+        for _ in range(3):
+            await manager.heartbeat()
+            await asyncio.sleep(0.01)
+            answering.mark_alive()
+
+        connected = [item.websocket for item in manager.active_connections["task"]]
+        manager.disconnect("task")
+        return silent, alive, connected, manager.counters
+
+    silent, alive, connected, counters = asyncio.run(run())
+    assert silent.closed and not alive.closed
+    assert connected == [alive]
+    assert alive.frames.count("ping") == 3
+    assert counters["reaped_unresponsive"] == 1
+
+
+def test_heartbeat_reaps_watchers_of_tasks_finished_past_the_grace_period():
+    async def run():
+        manager = ConnectionManager(batch_window_ms=0)
+        manager.terminal_grace = 0
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, "task")
+        await manager.send_completion("task", "/preview", "/download")
+        await asyncio.sleep(0.01)
+        await manager.heartbeat()
+        return websocket, manager
+
+    websocket, manager = asyncio.run(run())
+    assert websocket.closed
+    assert "task" not in manager.active_connections
+    assert manager.counters["reaped_terminal"] == 1
+    assert websocket.events()[-1]["type"] == "completion"
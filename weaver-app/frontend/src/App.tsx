@@ -121,7 +121,7 @@ function App() {
                 className="glass-panel rounded-2xl p-6 floating-element flex-1"
               >
                 <PreviewWindow
-                  previewUrl={ollamaState.previewUrl || null}
+                  previewUrl={ollamaState.previewUrl || ollamaState.livePreviewUrl || null}
                   isGenerating={ollamaState.isGenerating}
                 />
               </motion.div>
@@ -20,20 +20,20 @@ const DownloadButton = ({ taskId, isRealAI = false }: DownloadButtonProps) => {
     setDownloadSuccess(false);
 
     try {
-      const response = await fetch(`http://localhost:8000/api/download/${taskId}`);
+      // Check the archive is available, then let the browser's download manager
+      // fetch it so interrupted downloads resume with Range/If-Range requests
+      const response = await fetch(`http://localhost:8000/api/download/${taskId}/info`);
       
       if (!response.ok) {
         throw new Error('Download failed');
       }
 
-      const blob = await response.blob();
-      const url = window.URL.createObjectURL(blob);
+      const info = await response.json();
       const a = document.createElement('a');
-      a.href = url;
+      a.href = `http://localhost:8000${info.download_url}`;
       a.download = `website-${taskId}.zip`;
       document.body.appendChild(a);
       a.click();
-      window.URL.revokeObjectURL(url);
       document.body.removeChild(a);
       
       setDownloadSuccess(true);
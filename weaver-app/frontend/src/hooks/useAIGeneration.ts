@@ -1,4 +1,6 @@
 import { useState, useEffect, useRef, useCallback } from 'react';
+import { JSON_SUBPROTOCOL } from '../types/websocket';
+import type { EventStage, TaskEvent } from '../types/websocket';
 
 interface CognitiveGenerationState {
   status: 'idle' | 'connecting' | 'style_analysis' | 'blueprint_creation' | 'component_generation' | 'quality_review' | 'refinement' | 'advanced_styling' | 'final_assembly' | 'complete' | 'error';
@@ -21,12 +23,35 @@ interface CognitiveGenerationState {
     critiquesCycles: number;
   };
   previewUrl?: string;
+  livePreviewUrl?: string;
+  livePreviewPath?: string;
   downloadUrl?: string;
   error?: string;
   isConnected: boolean;
   isCognitiveAI: boolean;
 }
 
+// Server stage -> the phase shown in the UI
+const STAGE_STATUS: Record<EventStage, CognitiveGenerationState['status']> = {
+  initializing: 'connecting',
+  analysis: 'style_analysis',
+  planning: 'blueprint_creation',
+  generating: 'component_generation',
+  styling: 'advanced_styling',
+  scripting: 'component_generation',
+  quality_review: 'quality_review',
+  refinement: 'refinement',
+  assembly: 'final_assembly',
+  complete: 'complete',
+  failed: 'error'
+};
+
+const STAGE_COMPONENT_STEP: Partial<Record<EventStage, CognitiveGenerationState['currentStage']>> = {
+  generating: 'generating',
+  quality_review: 'critiquing',
+  refinement: 'refining'
+};
+
 export const useAIGeneration = (taskId: string | null) => {
   const [state, setState] = useState<CognitiveGenerationState>({
     status: 'idle',
@@ -48,162 +73,143 @@ export const useAIGeneration = (taskId: string | null) => {
 
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | undefined>(undefined);
+  // Read by the socket handlers, so stage changes don't recreate connect() and reopen the socket
+  const statusRef = useRef(state.status);
+  statusRef.current = state.status;
+  // Highest event sequence seen, so a reconnect resumes instead of starting over
+  const lastSeqRef = useRef<{ taskId: string | null; seq: number }>({ taskId: null, seq: 0 });
 
   const connect = useCallback(() => {
     if (!taskId || wsRef.current?.readyState === WebSocket.OPEN) return;
 
     try {
-      const ws = new WebSocket(`ws://localhost:8000/ws/generate/${taskId}`);
+      const since = lastSeqRef.current.taskId === taskId ? lastSeqRef.current.seq : 0;
+      const ws = new WebSocket(`ws://localhost:8000/ws/status/${taskId}?since=${since}`, [JSON_SUBPROTOCOL]);
       wsRef.current = ws;
 
       ws.onopen = () => {
-        setState(prev => ({ 
-          ...prev, 
+        // A reconnect resumes where it left off: keep the current phase
+        setState(prev => prev.status === 'idle' ? {
+          ...prev,
           isConnected: true,
           status: 'connecting',
           currentPhase: 'Connecting to Cognitive Assembly Line...'
-        }));
+        } : { ...prev, isConnected: true });
       };
 
-      ws.onmessage = (event) => {
-        try {
-          const data = JSON.parse(event.data);
-          
-          switch (data.type) {
-            case 'progress':
-              setState(prev => {
-                let newStatus = prev.status;
-                let newStage = prev.currentStage;
-                let newComponent = prev.currentComponent;
-                
-                // Advanced stage detection for Cognitive Assembly Line
-                if (data.message.includes('Brand Strategist') || data.message.includes('aesthetic vision')) {
-                  newStatus = 'style_analysis';
-                } else if (data.message.includes('Architect') || data.message.includes('blueprint')) {
-                  newStatus = 'blueprint_creation';
-                } else if (data.message.includes('generating') && !data.message.includes('CSS')) {
-                  newStatus = 'component_generation';
-                  newStage = 'generating';
-                  const componentMatch = data.message.match(/generating (\w+)/i);
-                  if (componentMatch) {
-                    newComponent = componentMatch[1];
-                  }
-                } else if (data.message.includes('reviewing') || data.message.includes('quality')) {
-                  newStatus = 'quality_review';
-                  newStage = 'critiquing';
-                } else if (data.message.includes('refining')) {
-                  newStatus = 'refinement';
-                  newStage = 'refining';
-                } else if (data.message.includes('CSS') || data.message.includes('styling')) {
-                  newStatus = 'advanced_styling';
-                } else if (data.message.includes('assembling')) {
-                  newStatus = 'final_assembly';
-                } else if (data.message.includes('complete')) {
-                  newStatus = 'complete';
-                }
-                
-                return {
-                  ...prev,
-                  status: newStatus,
-                  currentPhase: data.message,
-                  currentComponent: newComponent,
-                  currentStage: newStage,
-                  progress: data.progress,
-                  isCognitiveAI: true
-                };
-              });
-              break;
+      const handleEvent = (data: TaskEvent) => {
+        if (data.type !== 'batch' && data.seq) {
+          const seen = lastSeqRef.current.taskId === taskId ? lastSeqRef.current.seq : 0;
+          lastSeqRef.current = { taskId, seq: Math.max(seen, data.seq) };
+        }
 
-            case 'log':
-              setState(prev => {
-                const newLogs = [...prev.aiLogs, data.message];
-                let updates: Partial<CognitiveGenerationState> = {
-                  aiLogs: newLogs
-                };
-                
-                // Extract Cognitive Assembly Line insights
-                if (data.message.includes('Style Guide generated')) {
+        switch (data.type) {
+          case 'batch':
+            data.events.forEach(handleEvent);
+            break;
+
+          case 'ai_progress':
+            setState(prev => ({
+              ...prev,
+              status: data.stage ? STAGE_STATUS[data.stage] : prev.status,
+              currentPhase: data.message,
+              currentComponent: data.component ?? prev.currentComponent,
+              currentStage: data.stage ? STAGE_COMPONENT_STEP[data.stage] ?? prev.currentStage : prev.currentStage,
+              progress: data.progress,
+              blueprintGenerated: prev.blueprintGenerated || (!!data.stage && data.stage !== 'initializing' && data.stage !== 'analysis' && data.stage !== 'planning'),
+              isCognitiveAI: true
+            }));
+            break;
+
+          case 'ai_log':
+            setState(prev => {
+              const updates: Partial<CognitiveGenerationState> = {
+                aiLogs: [...prev.aiLogs, data.message]
+              };
+
+              if (data.stage) {
+                updates.status = STAGE_STATUS[data.stage];
+                updates.currentStage = STAGE_COMPONENT_STEP[data.stage] ?? prev.currentStage;
+                if (data.stage === 'analysis') {
                   updates.styleGuideGenerated = true;
                 }
-                
-                if (data.message.includes('Blueprint created')) {
-                  const componentsMatch = data.message.match(/(\d+) components planned/);
-                  if (componentsMatch) {
-                    updates.blueprintGenerated = true;
-                    updates.totalComponents = parseInt(componentsMatch[1]);
-                  }
-                }
-                
-                // Extract component quality scores
-                if (data.message.includes('passed quality review')) {
-                  const scoreMatch = data.message.match(/Score: (\d+)\/10/);
-                  const componentMatch = data.message.match(/✅ (\w+) passed/);
-                  if (scoreMatch && componentMatch) {
-                    const score = parseInt(scoreMatch[1]);
-                    const componentName = componentMatch[1];
-                    updates.componentsInProgress = prev.componentsInProgress.map(comp =>
-                      comp.name === componentName 
-                        ? { ...comp, stage: 'complete', qualityScore: score }
-                        : comp
-                    );
-                  }
+              }
+
+              if (data.component && data.stage === 'generating' && !prev.componentsInProgress.some(comp => comp.name === data.component)) {
+                updates.currentComponent = data.component;
+                updates.componentsInProgress = [...prev.componentsInProgress, { name: data.component, stage: 'generating' }];
+              }
+
+              // Scores arrive as fields, attached to the component (or the whole run) they rate
+              if (data.score !== undefined) {
+                const score = data.score;
+                if (data.component) {
+                  updates.componentsInProgress = (updates.componentsInProgress ?? prev.componentsInProgress).map(comp =>
+                    comp.name === data.component ? { ...comp, stage: 'complete', qualityScore: score } : comp
+                  );
+                } else {
+                  updates.qualityMetrics = { ...prev.qualityMetrics, averageScore: score };
                 }
-                
-                if (data.message.includes('refined')) {
-                  const scoreMatch = data.message.match(/Score: (\d+)\/10/);
-                  const componentMatch = data.message.match(/🔄 (\w+) refined/);
-                  if (scoreMatch && componentMatch) {
-                    const score = parseInt(scoreMatch[1]);
-                    const componentName = componentMatch[1];
-                    updates.componentsInProgress = prev.componentsInProgress.map(comp =>
-                      comp.name === componentName 
-                        ? { ...comp, stage: 'complete', qualityScore: score }
-                        : comp
-                    );
-                    updates.qualityMetrics = {
-                      ...prev.qualityMetrics,
-                      totalRefinements: prev.qualityMetrics.totalRefinements + 1
-                    };
-                  }
+                if (data.stage === 'refinement') {
+                  updates.qualityMetrics = {
+                    ...(updates.qualityMetrics ?? prev.qualityMetrics),
+                    totalRefinements: prev.qualityMetrics.totalRefinements + 1
+                  };
                 }
-                
-                // Extract final quality metrics
-                if (data.message.includes('Quality metrics:')) {
-                  const refinementsMatch = data.message.match(/(\d+) refinements/);
-                  const scoreMatch = data.message.match(/avg score: ([\d.]+)\/10/);
-                  if (refinementsMatch && scoreMatch) {
-                    updates.qualityMetrics = {
-                      ...prev.qualityMetrics,
-                      totalRefinements: parseInt(refinementsMatch[1]),
-                      averageScore: parseFloat(scoreMatch[1])
-                    };
-                  }
+              }
+
+              return { ...prev, ...updates };
+            });
+            break;
+
+          case 'file_written':
+            // Start the live preview on the first page written (MERN projects write frontend/index.html);
+            // move to an index.html if one shows up later. The preview follows further writes itself.
+            if (data.path.endsWith('.html')) {
+              const isIndex = data.path === 'index.html' || data.path.endsWith('/index.html');
+              setState(prev => {
+                if (prev.livePreviewPath && (prev.livePreviewPath.endsWith('index.html') || !isIndex)) {
+                  return prev;
                 }
-                
-                return { ...prev, ...updates };
+                return {
+                  ...prev,
+                  livePreviewPath: data.path,
+                  livePreviewUrl: `http://localhost:8000/api/preview/${taskId}/${data.path}?live=1`
+                };
               });
-              break;
+            }
+            break;
+
+          case 'completion':
+            setState(prev => ({
+              ...prev,
+              status: 'complete',
+              progress: 100,
+              previewUrl: data.preview_url,
+              downloadUrl: data.download_url,
+              currentPhase: 'Cognitive Assembly Line complete! 🎉'
+            }));
+            break;
 
-            case 'completion':
-              setState(prev => ({
-                ...prev,
-                status: 'complete',
-                progress: 100,
-                previewUrl: data.preview_url,
-                downloadUrl: data.download_url,
-                currentPhase: 'Cognitive Assembly Line complete! 🎉'
-              }));
-              break;
+          case 'error':
+            setState(prev => ({
+              ...prev,
+              status: 'error',
+              error: data.message,
+              currentPhase: 'Cognitive Assembly Line encountered an error'
+            }));
+            break;
+        }
+      };
 
-            case 'error':
-              setState(prev => ({
-                ...prev,
-                status: 'error',
-                error: data.message,
-                currentPhase: 'Cognitive Assembly Line encountered an error'
-              }));
-              break;
-          }
+      ws.onmessage = (event) => {
+        // Server heartbeat: any reply keeps the connection from being reaped
+        if (event.data === 'ping') {
+          ws.send('pong');
+          return;
+        }
+        try {
+          handleEvent(JSON.parse(event.data));
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
         }
@@ -213,7 +219,8 @@ export const useAIGeneration = (taskId: string | null) => {
         setState(prev => ({ ...prev, isConnected: false }));
         
         // Auto-reconnect if generation is still in progress
-        if (state.status !== 'complete' && state.status !== 'error' && state.status !== 'idle') {
+        const status = statusRef.current;
+        if (status !== 'complete' && status !== 'error' && status !== 'idle') {
           reconnectTimeoutRef.current = setTimeout(() => {
             connect();
           }, 2000);
@@ -238,7 +245,7 @@ export const useAIGeneration = (taskId: string | null) => {
         error: 'Failed to connect to Cognitive Assembly Line'
       }));
     }
-  }, [taskId, state.status]);
+  }, [taskId]);
 
   useEffect(() => {
     if (taskId) {
@@ -1,6 +1,6 @@
 // WebSocket Message Types
 export interface WebSocketMessage {
-  type: 'progress' | 'log' | 'error' | 'complete';
+  type: 'progress' | 'log' | 'error' | 'complete' | 'file_written';
   timestamp: string;
 }
 
@@ -28,4 +28,65 @@ export interface CompletionMessage extends WebSocketMessage {
   download_url: string;
 }
 
-export type AnyWebSocketMessage = ProgressMessage | LogMessage | ErrorMessage | CompletionMessage;
\ No newline at end of file
+export interface FileWrittenMessage extends WebSocketMessage {
+  type: 'file_written';
+  path: string;
+  hash: string;
+  size: number;
+}
+
+export type AnyWebSocketMessage = ProgressMessage | LogMessage | ErrorMessage | CompletionMessage | FileWrittenMessage;
+
+// Task channel events (/ws/status/{task_id})
+export const JSON_SUBPROTOCOL = 'weaver.json.v1';
+
+export type EventStage =
+  | 'initializing' | 'analysis' | 'planning' | 'generating' | 'styling' | 'scripting'
+  | 'quality_review' | 'refinement' | 'assembly' | 'complete' | 'failed';
+
+interface TaskEventBase {
+  ts: number;
+  seq?: number;
+  stage?: EventStage;
+  component?: string;
+}
+
+export interface TaskProgressEvent extends TaskEventBase {
+  type: 'ai_progress';
+  message: string;
+  progress: number;
+}
+
+export interface LogEvent extends TaskEventBase {
+  type: 'ai_log';
+  level: 'info' | 'warning' | 'error';
+  message: string;
+  score?: number;
+}
+
+export interface FileWrittenEvent extends TaskEventBase {
+  type: 'file_written';
+  path: string;
+  hash: string;
+  size: number;
+}
+
+export interface CompletionEvent extends TaskEventBase {
+  type: 'completion';
+  progress: number;
+  preview_url: string;
+  download_url: string;
+}
+
+export interface TaskErrorEvent extends TaskEventBase {
+  type: 'error';
+  message: string;
+}
+
+// Events queued within the server's batch window arrive together
+export interface BatchEvent {
+  type: 'batch';
+  events: TaskEvent[];
+}
+
+export type TaskEvent = TaskProgressEvent | LogEvent | FileWrittenEvent | CompletionEvent | TaskErrorEvent | BatchEvent;
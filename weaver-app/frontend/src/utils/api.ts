@@ -24,8 +24,9 @@ export const getTaskStatus = async (taskId: string): Promise<TaskStatus> => {
   return response.data;
 };
 
-export const getPreviewUrl = (taskId: string): string => {
-  return `${API_BASE_URL}/api/preview/${taskId}/`;
+// Static sites preview as their single-file bundle (built on request when the site has none)
+export const getPreviewUrl = (taskId: string, bundle: boolean = true): string => {
+  return `${API_BASE_URL}/api/preview/${taskId}/${bundle ? 'bundle' : ''}`;
 };
 
 export const getDownloadUrl = (taskId: string): string => {